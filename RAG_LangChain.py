@@ -1,5 +1,5 @@
 # main.py
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import ChatOpenAI
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.prompts import MessagesPlaceholder
@@ -7,12 +7,11 @@ from langchain_core.output_parsers import StrOutputParser
 # from example import fewshot_examples
 from langchain_community.cache import SQLiteCache
 from langchain_core.globals import set_llm_cache
-import pickle
-from langchain.storage import LocalFileStore
-from langchain.storage import EncoderBackedStore
 from langchain.retrievers import ParentDocumentRetriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
+from build_vector_db.embedding_cache import get_cached_embeddings
+from build_vector_db.parent_store import SQLiteDocStore
 
 load_dotenv()
 
@@ -21,12 +20,12 @@ database_path = r"C:\Users\82103\Desktop\수업 및 과제\복수전공-산업
 set_llm_cache(SQLiteCache(database_path=database_path))
 #persist_directory(CHROMA_DIR)=.sqlite3 파일이 있는 폴더
 CHROMA_DIR=r"C:\Users\82103\Desktop\수업 및 과제\복수전공-산업데이터공학과\파이썬데이터분석\RAG_LangChain_Project\db_folder_전달\db_folder_전달\chroma_db\chroma_db"
-DOCSTORE_DIR = r"C:\Users\82103\Desktop\수업 및 과제\복수전공-산업데이터공학과\파이썬데이터분석\RAG_LangChain_Project\db_folder_전달\db_folder_전달\docstore"
+DOCSTORE_PATH = r"C:\Users\82103\Desktop\수업 및 과제\복수전공-산업데이터공학과\파이썬데이터분석\RAG_LangChain_Project\db_folder_전달\db_folder_전달\docstore.db"
 
 
 def load_vector_store():
-    # 1. 임베딩 설정 (구축할 때와 똑같은 모델이어야 함)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    # 1. 임베딩 설정 (구축할 때와 똑같은 모델이어야 함, 디스크 캐시 공유)
+    embeddings = get_cached_embeddings("text-embedding-3-large")
 
     # 2. Vector Store (검색용 DB) 불러오기
     vectorstore = Chroma(
@@ -36,14 +35,8 @@ def load_vector_store():
     )
 
     # 3. Doc Store (원본 저장소) 불러오기
-    #    구축할 때 사용한 pickle 방식 그대로 다시 설정해줘야 합니다.
-    fs = LocalFileStore(DOCSTORE_DIR)
-    docstore = EncoderBackedStore(
-        store=fs,
-        key_encoder=lambda x: x,
-        value_serializer=pickle.dumps,
-        value_deserializer=pickle.loads
-    )
+    #    구축할 때와 같은 SQLite 단일 파일 저장소 (기존 폴더는 parent_store.py --migrate로 변환)
+    docstore = SQLiteDocStore(DOCSTORE_PATH)
 
     # 4. Splitter 설정 (구축 때와 동일하게)
     #    PDR 객체를 다시 만들 때 필요합니다.
@@ -1,5 +1,6 @@
 import streamlit as st
 from datetime import datetime
+import os
 import csv
 from pathlib import Path
 from dotenv import load_dotenv
@@ -7,19 +8,11 @@ import uuid
 import json
 import streamlit.components.v1 as components
 from PIL import Image
-import pickle
-import math
-
-# LangChain 관련 import
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
-from langchain.storage import LocalFileStore, EncoderBackedStore
-from langchain.retrievers import ParentDocumentRetriever
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.cache import SQLiteCache
-from langchain_core.globals import set_llm_cache
+
+# RAG 엔진 (Streamlit 비의존, rag_core/) - 앱은 질문을 보내고 이벤트 스트림을 그리기만 함
+from rag_core.engine import RAGEngine
+from rag_core.client import RAGClient
+from rag_core.quick_answers import QUICK_QUESTIONS
 
 # ============================================================================
 # 페이지 설정 (가장 먼저!)
@@ -34,20 +27,11 @@ st.set_page_config(
 # 전역 설정
 # ============================================================================
 BASE_DIR = Path(__file__).parent
-CHROMA_DIR = BASE_DIR / "build_vector_db" / "chroma_db"
-DOCSTORE_DIR = BASE_DIR / "build_vector_db" / "docstore"
-COLLECTION_NAME = "hongik_data"
-
-# LLM 캐시 설정
-LLM_CACHE_DIR = BASE_DIR / "build_vector_db" / "llm_cache"
-LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-LLM_CACHE_DB = LLM_CACHE_DIR / "llm_cache.db"
 
-#  최신성(rencency) 가중치 리랭킹 파라미터
-# - alpha가 클수록 "의미 유사도"를 더 중시
-# - (1-alpha)가 클수록 "최근 문서"를 더 중시
-RECENCY_ALPHA = 0.75
-RECENCY_DECAY_DAYS = 360
+# RAG API 서버(python -m rag_core.server) 주소 - 지정하면 검색/답변을 서버에 맡김, 없으면 앱 프로세스 안에서 실행
+RAG_API_URL = os.environ.get("RAG_API_URL")
+# 가짜 임베딩/LLM + 샘플 문서로 실행 (API 키/인덱스 없이 UI 확인용)
+RAG_FAKE_BACKENDS = os.environ.get("RAG_FAKE_BACKENDS") == "1"
 
 #  assistant(챗봇) 아바타
 try:
@@ -77,20 +61,17 @@ if "feedback_ids" not in st.session_state:
 if "pending_question" not in st.session_state:
     st.session_state.pending_question = None
 
+if "pending_quick" not in st.session_state:
+    st.session_state.pending_quick = False
+
 if "session_id" not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
 
-if "rag_chain" not in st.session_state:
-    st.session_state.rag_chain = None
-
-if "retriever" not in st.session_state:
-    st.session_state.retriever = None
-
 if "selected_category" not in st.session_state:
     st.session_state.selected_category = "전체"
 
-if "last_similarity" not in st.session_state:
-    st.session_state.last_similarity = {}
+if "selected_period" not in st.session_state:
+    st.session_state.selected_period = "전체 기간"
 
 # ============================================================================
 # 카테고리
@@ -102,31 +83,19 @@ CATEGORIES = {
     "교과목/수강": "교과목/수강"
 }
 
+# 검색 기간 (최근 N일, 메타데이터 사이드카의 날짜 인덱스로 필터)
+SEARCH_PERIODS = {
+    "전체 기간": None,
+    "최근 30일": 30,
+    "최근 90일": 90,
+    "최근 180일": 180,
+    "최근 1년": 365
+}
+
 # ============================================================================
 # 빠른 질문
 # ============================================================================
-QUICK_QUESTIONS = {
-    "전체": [
-        "최근 공지사항 알려줘",
-        "이번 학기 주요 일정은?",
-        "장학금 정보 알려줘"
-    ],
-    "대학공지": [
-        "학교 전체 공지사항 최근거 보여줘",
-        "대학원 입학 정보 알려줘",
-        "학사 일정 알려줘"
-    ],
-    "학과공지": [
-        "디자인학부 공지사항 알려줘",
-        "건축학부 최근 소식은?",
-        "컴퓨터공학부 공지 보여줘"
-    ],
-    "교과목/수강": [
-        "이번 학기 개설 과목 알려줘",
-        "수강신청 일정은?",
-        "교양 과목 추천해줘"
-    ]
-}
+# QUICK_QUESTIONS는 rag_core/quick_answers.py에서 관리 (사전계산 답변과 공유)
 
 # ============================================================================
 # UI Helper
@@ -199,46 +168,9 @@ def render_sources_box(sources: list):
 
 
 # ============================================================================
-# Scoring (Recency / Similarity)
+# Scoring (Similarity Badge)
 # ============================================================================
 
-def calculate_recency_weight(date_str: str, decay_days: int = RECENCY_DECAY_DAYS) -> float:
-    """
-    날짜 기반 최신성 가중치 (0.1~1.0)
-    - date_str: "YYYY-MM-DD" 또는 "YYYY.MM.DD" 가정
-    """
-    try:
-        if date_str in ["상시", "날짜미상", None, ""]:
-            return 1
-
-        normalized_date = str(date_str).replace(".", "-").strip()
-        doc_date = datetime.strptime(normalized_date, "%Y-%m-%d")
-        today = datetime.now()
-        days_old = (today - doc_date).days
-
-        weight = math.exp(-days_old / decay_days)
-        return max(0.1, min(1.0, weight))
-    except Exception:
-        return 0.5
-
-
-def _extract_parent_id(metadata: dict):
-    if not metadata:
-        return None
-    for key in ("doc_id", "parent_id", "parent", "document_id"):
-        val = metadata.get(key)
-        if val:
-            return val
-    return None
-
-
-def _score_to_similarity(score):
-    try:
-        return 1 / (1 + float(score))
-    except Exception:
-        return 0.5
-
-
 def get_confidence_level(similarity: float) -> tuple:
     if similarity >= 0.8:
         return "매우 높음 ⭐⭐⭐", "🟢", "success"
@@ -327,233 +259,42 @@ def save_feedback(feedback_data, is_update=False, feedback_id=None):
 # ============================================================================
 
 @st.cache_resource
-def initialize_rag_system():
-    """ParentDocumentRetriever 기반 RAG 시스템 초기화"""
-    try:
-        load_dotenv()
-        set_llm_cache(SQLiteCache(database_path=str(LLM_CACHE_DB)))
-
-        if not CHROMA_DIR.exists():
-            st.error(f"❌ ChromaDB를 찾을 수 없습니다: {CHROMA_DIR}")
-            st.info("💡 먼저 벡터DB 구축 스크립트를 실행해주세요!")
-            return None, None
-
-        if not DOCSTORE_DIR.exists():
-            st.error(f"❌ Docstore를 찾을 수 없습니다: {DOCSTORE_DIR}")
-            return None, None
-
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-
-        vectorstore = Chroma(
-            collection_name=COLLECTION_NAME,
-            embedding_function=embeddings,
-            persist_directory=str(CHROMA_DIR)
-        )
-
-        fs = LocalFileStore(str(DOCSTORE_DIR))
-        docstore = EncoderBackedStore(
-            store=fs,
-            key_encoder=lambda x: x,
-            value_serializer=pickle.dumps,
-            value_deserializer=pickle.loads
-        )
-
-        child_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=400,
-            chunk_overlap=50,
-            separators=["\n\n", "\n", " ", ""]
-        )
-
-        retriever = ParentDocumentRetriever(
-            vectorstore=vectorstore,
-            docstore=docstore,
-            child_splitter=child_splitter,
-            parent_splitter=None
-        )
-
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, streaming=True)
-
-        prompt = ChatPromptTemplate.from_messages([
-            ('system', '''당신은 홍익대학교 학사 정보 안내 챗봇입니다.
-
-역할:
-- 학생들의 질문에 친절하고 정확하게 답변합니다
-- 제공된 참고 문서를 바탕으로 최신 정보를 제공합니다
-- 검색 결과에 URL이 있다면 반드시 포함하여 안내합니다
-
-참고 문서 활용 방법:
-- 각 문서에는 제목, 날짜, 분류, 학과, URL, 내용이 포함되어 있습니다
-- 여러 문서가 있을 때는 날짜가 최근인 정보를 우선적으로 안내하세요
-
-답변 규칙:
-1. 참고 문서의 제목과 날짜를 언급하여 신뢰성을 높입니다
-2. 여러 결과가 있을 경우 각각을 구분하여 간략히 요약합니다
-3. URL은 "자세한 내용: [URL]" 형식으로 반드시 안내합니다
-4. 검색 결과가 없거나 관련 정보가 없으면 솔직하게 알려줍니다
-5. 이전 대화 내용을 참고하여 맥락에 맞는 답변을 제공합니다
-'''),
-            MessagesPlaceholder(variable_name="history"),
-            ('human', '질문: {question}\n\n참고 문서:\n{context}'),
-        ])
-
-        chain = prompt | llm | StrOutputParser()
-        return chain, retriever
-
-    except Exception as e:
-        st.error(f"RAG 시스템 초기화 실패: {str(e)}")
-        return None, None
-
-
-# ============================================================================
-# Retrieval + Recency Re-rank
-# ============================================================================
-
-def get_filtered_documents(retriever, query: str, category_filter: str = None, k: int = 50):
+def get_engine():
     """
-    카테고리 필터를 Chroma 검색에 직접 적용
-    child 검색(score 포함) → parent 복원
-    의미유사도 + 최신성 가중치로 리랭크
-    반환: (docs, avg_semantic_similarity)
+    RAG 엔진 (모든 세션 공유)
+    - RAG_API_URL이 있으면 HTTP(SSE) 클라이언트, 없으면 앱 프로세스 안의 RAGEngine
     """
-    try:
-        vectorstore = retriever.vectorstore
-        docstore = retriever.docstore
-
-        chroma_filter = None
-        if category_filter and category_filter != "전체":
-            chroma_filter = {"notice_type": category_filter}
-
-        # 1) child 검색 (score 포함)
-        child_results = vectorstore.similarity_search_with_score(
-            query,
-            k=k * 5,                 # 리랭크/중복 제거 고려 넉넉히
-            filter=chroma_filter
-        )
-        if not child_results:
-            return [], 0.0
-
-        # 2) parent별 best semantic similarity 수집 + parent id 순서
-        parent_id_to_best_sim = {}
-        parent_ids = []
-        for child_doc, score in child_results:
-            pid = _extract_parent_id(child_doc.metadata)
-            if not pid:
-                # parent id가 아예 없다면 child를 parent 취급 fallback
-                pid = f"__child__:{hash(child_doc.page_content)}"
-
-            sim = _score_to_similarity(score)
-
-            if pid not in parent_id_to_best_sim:
-                parent_id_to_best_sim[pid] = sim
-                parent_ids.append(pid)
-            else:
-                parent_id_to_best_sim[pid] = max(parent_id_to_best_sim[pid], sim)
-
-            if len(parent_ids) >= (k * 3):
-                break
-
-        # 3) parent 로드
-        loaded = docstore.mget(parent_ids)
-        parent_docs = []
-        parent_meta = []  # (doc, semantic_sim)
-        for pid, doc in zip(parent_ids, loaded):
-            if doc is None:
-                continue
-            parent_docs.append(doc)
-            parent_meta.append((doc, parent_id_to_best_sim.get(pid, 0.5)))
-
-        # docstore miss가 많으면 child fallback
-        if not parent_docs:
-            fallback_docs = [d for d, _ in child_results[:k]]
-            avg_sim = sum([_score_to_similarity(s) for _, s in child_results[:k]]) / max(1, len(fallback_docs))
-            return fallback_docs, avg_sim
-
-        # 4) 최신성 가중치로 리랭크
-        scored = []
-        for doc, sem_sim in parent_meta:
-            md = doc.metadata or {}
-            rec = calculate_recency_weight(md.get("date"), decay_days=RECENCY_DECAY_DAYS)
-            final_score = (RECENCY_ALPHA * sem_sim) + ((1 - RECENCY_ALPHA) * rec)
-            scored.append((final_score, sem_sim, rec, doc))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = scored[:k]
-        top_docs = [d for _, _, _, d in top]
-
-        # 신뢰도 배지는 "의미 유사도" 평균으로 유지 (최신성은 정렬에만 반영)
-        avg_semantic_similarity = sum([sem for _, sem, _, _ in top]) / max(1, len(top))
-
-        # (디버그/확장용) 리랭크 점수도 같이 보관 가능
-        st.session_state.last_rerank_debug = [
-            {
-                "title": (doc.metadata or {}).get("title", ""),
-                "date": (doc.metadata or {}).get("date", ""),
-                "semantic": sem,
-                "recency": rec,
-                "final": fin
-            }
-            for fin, sem, rec, doc in top
-        ]
-
-        return top_docs, avg_semantic_similarity
+    if RAG_API_URL:
+        return RAGClient(RAG_API_URL)
+    if RAG_FAKE_BACKENDS:
+        from rag_core.fakes import build_fake_engine
+        return build_fake_engine()
 
+    load_dotenv()
+    try:
+        # 부모 문서 LRU 캐시 크기는 build_vector_db/parent_store.PARENT_CACHE_MAX_BYTES (모든 세션 공유)
+        return RAGEngine.from_index()
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
+        st.info("💡 먼저 벡터DB 구축 스크립트를 실행해주세요!")
+        return None
     except Exception as e:
-        st.error(f"문서 검색 중 오류 발생: {str(e)}")
-        return [], 0.0
-
-
-def get_answer_stream(chain, retriever, query: str, history: list, category_filter: str = None):
-    """스트리밍 방식 답변 생성 (최신성 리랭크 반영)"""
-    context_docs, avg_similarity = get_filtered_documents(retriever, query, category_filter, k=20)
-
-    if not context_docs:
-        yield "검색 결과가 없습니다. 질문을 더 구체적으로 입력해주세요."
-        return
-
-    context_parts = []
-    for idx, doc in enumerate(context_docs, 1):
-        metadata = doc.metadata or {}
-        context_part = f"""[문서 {idx}]
-제목: {metadata.get('title', '제목 없음')}
-날짜: {metadata.get('date', '날짜 없음')}
-분류: {metadata.get('notice_type', '미분류')}
-학과: {metadata.get('department', '해당없음')}
-URL: {metadata.get('url', 'URL 없음')}
-
-내용:
-{doc.page_content}
-"""
-        context_parts.append(context_part)
-
-    context = '\n\n---\n\n'.join(context_parts)
-
-    st.session_state.last_similarity = {
-        "score": avg_similarity,
-        "docs": context_docs
-    }
-
-    for chunk in chain.stream({
-        "question": query,
-        "context": context,
-        "history": history
-    }):
-        yield chunk
+        st.error(f"RAG 시스템 초기화 실패: {str(e)}")
+        return None
 
 
 # ============================================================================
 # Main interaction
 # ============================================================================
 
-def process_question(prompt):
+def process_question(prompt, quick=False):
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    try:
-        if st.session_state.rag_chain is None or st.session_state.retriever is None:
-            chain, retriever = initialize_rag_system()
-            st.session_state.rag_chain = chain
-            st.session_state.retriever = retriever
+    max_age_days = SEARCH_PERIODS.get(st.session_state.selected_period)
 
-        if st.session_state.rag_chain is None:
+    try:
+        engine = get_engine()
+        if engine is None:
             raise Exception("RAG 시스템을 초기화할 수 없습니다.")
 
         # 최근 5개 히스토리
@@ -572,27 +313,31 @@ def process_question(prompt):
 
         response_placeholder = st.empty()
         full_response = ""
-
-        for chunk in get_answer_stream(
-            st.session_state.rag_chain,
-            st.session_state.retriever,
-            prompt,
-            history,
-            category_filter
-        ):
-            full_response += chunk
-            response_placeholder.markdown(full_response + "▌")
+        meta = {}
+
+        # 빠른 질문은 인덱스 구축 때 미리 만들어 둔 답변을 엔진이 바로 반환 (기간 필터가 없을 때만)
+        for event, data in engine.stream_answer(prompt, history, category_filter, max_age_days, quick=quick):
+            if event == "meta":
+                meta = data
+            elif event == "token":
+                full_response += data
+                response_placeholder.markdown(full_response + "▌")
+            elif event == "done":
+                # 단계별 소요 시간(ms) - 사이드바에 첫 토큰까지 시간 표시
+                st.session_state.last_timings = data.get("timings", {})
+                st.session_state.last_context = data.get("context")
 
         response_placeholder.markdown(full_response)
+        st.session_state.pop("engine_stats", None)   # 캐시 적중률 등은 다음 rerun에서 다시 조회
 
-        similarity_score = st.session_state.last_similarity.get("score", 0.0)
-        retrieved_docs = st.session_state.last_similarity.get("docs", [])
+        # (디버그/확장용) 리랭크 점수
+        st.session_state.last_rerank_debug = meta.get("rerank_debug", [])
 
         st.session_state.messages.append({
             "role": "assistant",
             "content": full_response,
-            "similarity": similarity_score,
-            "docs": retrieved_docs
+            "similarity": meta.get("similarity"),
+            "docs": meta.get("docs", [])
         })
 
     except Exception as e:
@@ -624,6 +369,16 @@ with st.sidebar:
         st.session_state.selected_category = selected
         st.rerun()
 
+    selected_period = st.selectbox(
+        "검색 기간",
+        options=list(SEARCH_PERIODS.keys()),
+        index=list(SEARCH_PERIODS.keys()).index(st.session_state.selected_period),
+        key="period_select"
+    )
+    if selected_period != st.session_state.selected_period:
+        st.session_state.selected_period = selected_period
+        st.rerun()
+
     st.markdown("---")
 
     st.subheader("⚡ 빠른 질문")
@@ -631,6 +386,7 @@ with st.sidebar:
     for q in quick_qs:
         if st.button(q, key=f"quick_{q}", use_container_width=True):
             st.session_state.pending_question = q
+            st.session_state.pending_quick = True
             st.rerun()
 
     st.markdown("---")
@@ -639,13 +395,53 @@ with st.sidebar:
         st.session_state.messages = []
         st.session_state.feedback_mode = {}
         st.session_state.feedback_ids = {}
-        st.session_state.last_similarity = {}
         st.session_state.pop("last_rerank_debug", None)
+        st.session_state.pop("last_timings", None)
+        st.session_state.pop("last_context", None)
         st.rerun()
 
     st.markdown("---")
     st.caption(f"세션 ID: {st.session_state.session_id[:8]}...")
-    st.caption("📊 RAG: ParentDocumentRetriever + Recency Re-rank")
+    st.caption("📊 RAG: ParentDocumentRetriever + BM25 Hybrid (RRF) + Recency Re-rank")
+    # 통계는 세션에 보관하고 답변이 끝났을 때만 다시 조회 (rerun마다 /health를 부르면 느린 서버가 UI를 멈춤)
+    if "engine_stats" not in st.session_state:
+        engine = get_engine()
+        try:
+            st.session_state.engine_stats = engine.stats() if engine is not None else {}
+        except Exception:
+            # API 서버가 아직 안 떴거나 응답 없음 → 통계만 생략
+            st.session_state.engine_stats = {}
+    engine_stats = st.session_state.engine_stats
+    emb_stats = engine_stats.get("embedding_cache")
+    if emb_stats:
+        st.caption(
+            f"🧠 임베딩 캐시: hit {emb_stats['hits']} / miss {emb_stats['misses']} "
+            f"({emb_stats['hit_rate']:.0%})"
+        )
+    ans_stats = engine_stats.get("answer_cache")
+    if ans_stats:
+        st.caption(
+            f"💬 답변 캐시: hit {ans_stats['hits']} / miss {ans_stats['misses']} "
+            f"({ans_stats['hit_rate']:.0%})"
+        )
+    doc_stats = engine_stats.get("parent_cache")
+    if doc_stats:
+        st.caption(
+            f"📚 문서 캐시: hit {doc_stats['hits']} / miss {doc_stats['misses']} "
+            f"({doc_stats['hit_rate']:.0%}, {doc_stats['bytes'] / 1024 ** 2:.1f}MB)"
+        )
+    timings = st.session_state.get("last_timings")
+    if timings:
+        st.caption(
+            f"⏱️ 최근 질문: 첫 토큰 {timings.get('first_token', 0):.0f}ms / "
+            f"전체 {timings.get('total', 0):.0f}ms"
+        )
+    context_stats = st.session_state.get("last_context")
+    if context_stats:
+        st.caption(
+            f"📉 컨텍스트: {context_stats['tokens']:,}토큰 "
+            f"(전문 대비 {context_stats['saved_tokens']:,}토큰 절약)"
+        )
 
 
 st.title("💬 홍익대학교 학사정보 챗봇")
@@ -801,8 +597,10 @@ for idx, message in enumerate(st.session_state.messages):
 
 if st.session_state.pending_question:
     question = st.session_state.pending_question
+    quick = st.session_state.pending_quick
     st.session_state.pending_question = None
-    process_question(question)
+    st.session_state.pending_quick = False
+    process_question(question, quick=quick)
     st.rerun()
 
 if prompt := st.chat_input("궁금한 점을 물어보세요..."):
@@ -1,52 +1,160 @@
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import os
 import shutil
-import re
-import ast
-import pickle # 파이썬 객체 압축용
+import sys
+import argparse
+from pathlib import Path
 from dotenv import load_dotenv
 
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
-# PDR 관련
-from langchain.retrievers import ParentDocumentRetriever
-from langchain.storage import LocalFileStore, EncoderBackedStore
+# 스크립트로 실행해도(python build_vector_db/chroma_builder_pdr.py) 패키지 import 가능하도록
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from preprocessing.normalize import normalize_frame
+from build_vector_db.index_manifest import (
+    MANIFEST_PATH,
+    make_parent_key,
+    make_parent_id,
+    content_hash,
+    new_manifest,
+    load_manifest,
+    save_manifest,
+    diff_manifest,
+)
+from build_vector_db.embedding_cache import get_cached_embeddings
+from build_vector_db.parent_store import SQLiteDocStore
+from build_vector_db.metadata_sidecar import write_sidecar, date_to_epoch_day
+from build_vector_db.lexical_index import write_lexical_index, document_text
+from build_vector_db.serving_index import SERVING_DTYPES, export_serving_index
+from build_vector_db.chroma_shards import sync_shards, drop_shards
+from build_vector_db.embedding_pipeline import (
+    EmbeddingPipeline,
+    PipelineResult,
+    tiktoken_counter,
+)
 
 load_dotenv()
 
 CSV_PATH = "build_vector_db/data/df_json_to_csv.csv"
+PARQUET_PATH = "build_vector_db/data/documents.parquet" # 전처리에서 정규화까지 끝낸 문서 테이블
 CHROMA_DIR = "build_vector_db/chroma_db" # 벡터(검색용) 저장경로
-DOCSTORE_DIR = "build_vector_db/docstore" # 원본(참조용) 저장경로
+DOCSTORE_PATH = "build_vector_db/docstore.db" # 원본(참조용) 저장경로 (SQLite 단일 파일)
 COLLECTION_NAME = "hongik_data"
+EMBEDDING_MODEL = "text-embedding-3-large"
 
 
-# 전처리 함수
-def clean_text(t: str):
-    if pd.isna(t): return "" # NaN 처리 추가
-    t = str(t)
-    t = re.sub(r"<[^>]+>", " ", t)
-    t = t.replace("\n", " ").replace("\r", " ").replace("\t", " ")
-    t = " ".join(t.split())
-    return t
+def load_document_frame():
+    """
+    정규화된 문서 테이블 (DataFrame, preprocessing.normalize 컬럼 + parent_id / attachment_name_str)
+    - 전처리가 쓴 Parquet이 CSV보다 새것이면 그대로 사용
+    - 없으면 CSV를 읽고 컬럼 단위로 정규화 (normalize_frame, 첨부파일 파싱은 병렬)
+    """
+    if os.path.exists(PARQUET_PATH) and (
+        not os.path.exists(CSV_PATH) or os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(CSV_PATH)
+    ):
+        frame = pq.read_table(PARQUET_PATH, memory_map=True).to_pandas()
+        print(f"📦 Parquet 로드: {PARQUET_PATH} ({len(frame)}행)")
+    else:
+        df = pd.read_csv(CSV_PATH)
+        df = df.dropna(subset=["content"]).reset_index(drop=True)
+        frame = normalize_frame(df)
+        print(f"📄 CSV 로드: {CSV_PATH} ({len(frame)}행)")
+
+    # parent key: make_parent_key와 같은 규칙 (URL이 있으면 URL, 없으면 분류|학과|제목)
+    url = frame["url"].fillna("").astype(str).str.strip()
+    has_url = ((url != "") & (url.str.lower() != "nan")).to_numpy()
+    fallback_key = frame["notice_type"] + "|" + frame["department"] + "|" + frame["title"]
+    keys = np.where(has_url, url, fallback_key)
+
+    frame = frame.assign(
+        parent_id=[make_parent_id(key) for key in keys],
+        attachment_name_str=frame["attachment_names"]
+            .map(lambda names: ", ".join(names) if len(names) else "없음")
+            .str[:200],
+    )
+    # 같은 게시글이 중복 수집된 경우 첫 번째만 사용
+    return frame.drop_duplicates(subset="parent_id", keep="first").reset_index(drop=True)
+
+# 문서 객체 생성 (메타데이터)
+def iter_parent_docs(frame, parent_ids=None):
+    """
+    문서 테이블 → (parent_id, 부모 Document)를 하나씩 생성 (필요한 만큼만 만들고 버림)
+    - parent_ids를 주면 해당 부모만
+    """
+    if parent_ids is not None:
+        frame = frame[frame["parent_id"].isin(parent_ids)]
+    columns = [
+        "parent_id", "content", "title", "url", "date", "course_id", "department",
+        "notice_type", "has_attachment", "attachment_name_str", "original_id",
+    ]
+    for (pid, content, title, url, date, course_id, department,
+         notice_type, has_attachment, attachment_name_str, original_id) in frame[columns].itertuples(index=False, name=None):
+        # 메타데이터 구성
+        metadata = {
+            "title": title, # 게시글 제목
+            "url": url, # 원본 링크
+            "date": date, # 날짜
+            "course_id": course_id, # 교과목 - 학수번호
+            "department": department, # 학과명
+            "notice_type": notice_type, # 공지구분 (대학공지, 학과공지, 교과목/수강)
+            "has_attachment": bool(has_attachment), # 첨부파일 유무
+            "attachment_name_str": attachment_name_str, # 파일명 목록
+            "original_id": original_id # [관리용] 원본 게시글 id
+        }
+        yield pid, Document(page_content=content, metadata=metadata)
+
+
+def _delete_parents(vectorstore, docstore, parent_ids):
+    """변경/삭제된 게시글의 자식 벡터와 docstore 원본 제거"""
+    for i in range(0, len(parent_ids), 500):
+        chunk = parent_ids[i : i + 500]
+        found = vectorstore.get(where={"doc_id": {"$in": chunk}}, include=[])
+        if found["ids"]:
+            vectorstore.delete(ids=found["ids"])
+        docstore.mdelete(chunk)
 
-def normalize_date(date_str: str):
-    if pd.isna(date_str): return "날짜미상"
-    date_str = str(date_str)
-    date_str = date_str.replace(".", "-")
-    return date_str
 
 # Chroma DB 구축 함수
-def build_chroma_db():
+def build_chroma_db(incremental: bool = False, serving_index_dtype: str = None, shards: bool = None):
+    """
+    incremental=False: 기존 DB 삭제 후 전체 재구축
+    incremental=True : 매니페스트와 비교해 신규/변경 게시글만 임베딩, 삭제된 게시글은 제거
+                       (변경이 없으면 임베딩 호출 0회)
+                       입력 CSV에 없는 게시글 = 삭제로 판단 → 입력은 항상 전체 스냅샷이어야 함
+                       (크롤러 증분 모드는 이전 결과 파일에 합쳐서 저장하므로 그 결과 파일을 그대로 사용)
+    serving_index_dtype: "float16"/"int8"/"pq"이면 구축 후 메모리 맵 서빙 인덱스도 내보냄
+    shards: True면 notice_type별 샤드 컬렉션도 유지, False면 삭제, None이면 이전 빌드 설정 유지
+    """
+
+    previous_manifest = load_manifest(MANIFEST_PATH)
+    if shards is None:
+        shards = bool((previous_manifest or {}).get("shards"))
+
+    manifest = previous_manifest if incremental else None
+    if incremental:
+        if (
+            manifest is None
+            or not os.path.exists(CHROMA_DIR)
+            or not os.path.exists(DOCSTORE_PATH)
+            or manifest.get("embedding_model") != EMBEDDING_MODEL
+            or manifest.get("collection_name") != COLLECTION_NAME
+        ):
+            print("⚠️ 사용할 수 있는 매니페스트/DB가 없어 전체 재구축으로 진행합니다.")
+            incremental = False
+            manifest = None
 
-    # 1. 기존 DB 삭제
-    if os.path.exists(CHROMA_DIR): shutil.rmtree(CHROMA_DIR)
-    if os.path.exists(DOCSTORE_DIR): shutil.rmtree(DOCSTORE_DIR)
+    # 1. 기존 DB 삭제 (전체 재구축일 때만)
+    if not incremental:
+        if os.path.exists(CHROMA_DIR): shutil.rmtree(CHROMA_DIR)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(DOCSTORE_PATH + suffix): os.remove(DOCSTORE_PATH + suffix)
+        manifest = new_manifest(EMBEDDING_MODEL, COLLECTION_NAME, previous=previous_manifest)
 
-    df = pd.read_csv(CSV_PATH)
-    df = df.dropna(subset=["content"]).reset_index(drop=True)
+    frame = load_document_frame()
 
     # 2. Splitter 설정
 
@@ -57,11 +165,10 @@ def build_chroma_db():
         separators=["\n\n", "\n", " ", ""] # 문단 -> 줄 -> 단어 순으로 split
     )
 
-    # [Parent] 원본 저장용
-    parent_splitter = None # 게시글 하나를 통째로 쓰기 위해
+    # [Parent] 원본 저장용: 분리하지 않음 (게시글 하나를 통째로 쓰기 위해)
 
-    # 3. 저장소 설정
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    # 3. 저장소 설정 (임베딩은 디스크 캐시 경유 → 같은 조각은 재임베딩 X)
+    embeddings = get_cached_embeddings(EMBEDDING_MODEL)
 
     # [Vector Store] 자식(벡터) 조각 저장 (Chroma)
     vectorstore = Chroma(
@@ -69,120 +176,179 @@ def build_chroma_db():
         embedding_function=embeddings,
         persist_directory=CHROMA_DIR
     )
-    # [Doc Store] 부모(원본) 저장 (LocalFileStore)
-    fs = LocalFileStore(DOCSTORE_DIR)
-    docstore = EncoderBackedStore(
-        store=fs,
-        key_encoder=lambda x: x,
-        value_serializer=pickle.dumps,
-        value_deserializer=pickle.loads
-    )
+    # [Doc Store] 부모(원본) 저장 (SQLite 단일 파일, ParentDocumentRetriever docstore로 사용)
+    docstore = SQLiteDocStore(DOCSTORE_PATH)
     
-    # 4. PDR 생성
-    retriever = ParentDocumentRetriever(
-        vectorstore=vectorstore,
-        docstore=docstore,
-        child_splitter=child_splitter,
-        parent_splitter=parent_splitter
+    # 4. 부모 문서 해시 (Document는 하나씩 만들어 해시만 남김)
+    current = {
+        pid: content_hash(doc.page_content, doc.metadata)
+        for pid, doc in iter_parent_docs(frame)
+    }
+
+    # 5. 매니페스트와 비교
+    new_ids, changed_ids, removed_ids, unchanged_ids = diff_manifest(manifest, current)
+    print(
+        f"처리할 원본 문서 수: {len(current)} "
+        f"(신규 {len(new_ids)}, 변경 {len(changed_ids)}, "
+        f"삭제 {len(removed_ids)}, 변경없음 {len(unchanged_ids)})"
     )
 
-    # 5. 문서 객체 생성 (전처리 및 메타데이터)
-    parent_docs = []
-    for _, row in df.iterrows():
-        title = clean_text(row["title"])
-        raw_content = clean_text(row["content"])
-        department = str(row["department"])
-        
-        # attachment 파싱
-        has_attachment = False
-        attachment_names = []
-        raw_attachments = str(row["attachments"])
-        if not pd.isna(raw_attachments):
-            try:
-                parsed_data = ast.literal_eval(str(raw_attachments))
-                if isinstance(parsed_data, (dict,tuple)):
-                    parsed_data = [parsed_data] if isinstance(parsed_data,dict) else list(parsed_data)
-
-                seen_names = set()
-                for item in parsed_data:
-                    if isinstance(item, dict) and 'name' in item:
-                        name = item['name']
-                        if name not in seen_names:
-                            attachment_names.append(name)
-                            seen_names.add(name)
-                if attachment_names:
-                    has_attachment = True
-            except (ValueError, SyntaxError):
-                if isinstance(raw_attachments, str) and len(raw_attachments) > 5:
-                    attachment_names.append(raw_attachments[:50] + "...")
-                    has_attachment = True
-        attachment_name_str = ", ".join(attachment_names) if attachment_names else "없음"    
-
-        # index칼럼에서 notice_type 추출하기
-        raw_index = str(row["index"]) # 'univ_notice_100'
-        if "_" in raw_index:
-            notice_type_code = raw_index.rsplit("_", 1)[0]
-        else:
-            notice_type_code = "general"
-        type_mapping = {
-            "course": "교과목/수강",
-            "notice" : "학과공지",
-            "univ_notice": "대학공지"
-        }
-        notice_type_kr = type_mapping.get(notice_type_code, notice_type_code)
-
-        # Date 처리
-        final_date = "날짜미상"
-        course_id = "해당없음"
-        if notice_type_code == "course":
-            course_id = str(row["date"]).strip()
-            final_date = "상시"
-        else:
-            final_date = normalize_date(row["date"])
-            course_id = "해당없음"
-        
-        # 메타데이터 구성
-        metadata = {
-            "title": title, # 게시글 제목
-            "url": row["url"], # 원본 링크
-            "date": final_date, # 날짜
-            "course_id": course_id, # 교과목 - 학수번호
-            "department": department, # 학과명
-            "notice_type": notice_type_kr, # 공지구분 (대학공지, 학과공지, 교과목/수강)
-            "has_attachment": has_attachment, # 첨부파일 유무
-            "attachment_name_str": attachment_name_str[:200], # 파일명 목록
-            "original_id": raw_index # [관리용] 원본 게시글 id
-        }
-        
-        doc = Document(page_content=raw_content, metadata=metadata)
-        parent_docs.append(doc)
-    
+    # 변경/삭제된 게시글의 기존 자식 벡터 + 원본 제거
+    stale_ids = changed_ids + removed_ids
+    if stale_ids:
+        _delete_parents(vectorstore, docstore, stale_ids)
+        for pid in stale_ids:
+            manifest["parents"].pop(pid, None)
+        print(f"🗑️ 기존 문서 {len(stale_ids)}개 제거 완료")
 
-    print(f"처리할 원본 문서 수: {len(parent_docs)}")
-    print("PDR 인덱싱 처리중 (자동으로 자식 쪼개기 및 저장)...")
+    targets = set(new_ids) | set(changed_ids)
+    todo = list(iter_parent_docs(frame, targets)) if targets else []
+
+    if not todo:
+        print("✅ 변경된 문서가 없습니다. (임베딩 호출 0회)")
+    else:
+        print("PDR 인덱싱 처리중 (자식 쪼개기 → 병렬 임베딩 → 저장)...")
+
+    # 6. 병렬 임베딩 파이프라인 (토큰 예산 단위 요청 + TPM 제한 + 재시도, 쓰기는 writer 스레드 하나)
+    result = PipelineResult()
+    if todo:
+        pipeline = EmbeddingPipeline(
+            embeddings=embeddings,
+            vectorstore=vectorstore,
+            docstore=docstore,
+            child_splitter=child_splitter,
+            id_key="doc_id", # ParentDocumentRetriever 기본 id_key와 동일
+            token_counter=tiktoken_counter(EMBEDDING_MODEL),
+        )
 
-    # openai 토큰수 제한 때문에 batch_size를 100으로 설정
-    batch_size = 100 
-    
-    try:
-        from tqdm import tqdm
-        iterator = tqdm(range(0, len(parent_docs), batch_size), desc="Indexing")
-    except ImportError:
-        iterator = range(0, len(parent_docs), batch_size)
-
-    for i in iterator:
-        batch = parent_docs[i : i + batch_size]
         try:
-            retriever.add_documents(batch, ids=None)
-            # tqdm이 없을 때만 로그 출력
-            if not isinstance(iterator, tqdm): 
-                print(f"   - {i} ~ {i+len(batch)} 번째 문서 저장 완료")
-        except Exception as e:
-            print(f"⚠️ {i}번째 배치 처리 중 에러 발생: {e}")
+            from tqdm import tqdm
+            progress = tqdm(total=len(todo), desc="Indexing")
+        except ImportError:
+            progress = None
+
+        result = pipeline.run(todo, progress=progress)
+        if progress is not None:
+            progress.close()
+
+        print(
+            f"⏱️ {result.elapsed:.1f}초 | 문서 {len(result.succeeded_ids)}개, 조각 {result.n_children}개, "
+            f"토큰 {result.n_tokens:,} | {result.docs_per_sec:.1f} docs/sec, "
+            f"{result.tokens_per_sec:,.0f} tokens/sec | 요청 {result.n_requests}회, 재시도 {result.n_retries}회"
+        )
+
+    # 성공한 부모만 매니페스트에 기록 (실패분은 다음 증분 빌드에서 재시도)
+    docs_by_id = dict(todo)
+    for pid in result.succeeded_ids:
+        manifest["parents"][pid] = {
+            "key": make_parent_key(docs_by_id[pid].metadata),
+            "hash": current[pid],
+        }
+    failed = len(result.failed_ids)
+
+    # notice_type별 샤드 컬렉션 (본 컬렉션에서 child 복사, 임베딩 호출 없음)
+    old_layout = manifest.get("shards")
+    if shards:
+        manifest["shards"] = sync_shards(
+            vectorstore, embeddings, CHROMA_DIR, COLLECTION_NAME,
+            layout=old_layout,
+            parent_ids=result.succeeded_ids,
+            removed_ids=stale_ids,
+        )
+        print("🧩 샤드: " + ", ".join(f"{nt} {info['n_children']}개" for nt, info in manifest["shards"].items()))
+    elif old_layout:
+        drop_shards(embeddings, CHROMA_DIR, old_layout)
+        manifest.pop("shards")
+        print("🧩 샤드 컬렉션 삭제 완료")
+    shards_changed = manifest.get("shards") != old_layout
+
+    # 7. 매니페스트 저장 (전체 재구축이거나 인덱스 내용이 바뀐 경우에만 버전 증가)
+    if not incremental or stale_ids or result.succeeded_ids or shards_changed:
+        manifest["build_version"] = manifest.get("build_version", 0) + 1
+    save_manifest(manifest, MANIFEST_PATH)
+
+    # 8. 메타데이터 사이드카 (인덱싱된 부모의 날짜/분류/학과 → 검색 시 docstore 조회 전에 사용)
+    indexed = frame[frame["parent_id"].isin(manifest["parents"].keys())]
+    epoch_day_of = {d: date_to_epoch_day(d) for d in indexed["date"].unique()}
+    sidecar_rows = list(zip(
+        indexed["parent_id"],
+        indexed["date"].map(epoch_day_of),
+        indexed["notice_type"],
+        indexed["department"],
+        indexed["has_attachment"],
+    ))
+    write_sidecar(sidecar_rows, manifest["build_version"])
+
+    # 9. BM25 역색인 (문자 n-gram, 하이브리드 검색용) - 임베딩 없이 전체 재생성
+    lexical_docs = [
+        (pid, doc.metadata["notice_type"], document_text(doc.page_content, doc.metadata))
+        for pid, doc in iter_parent_docs(indexed)
+    ]
+    lexical_meta = write_lexical_index(lexical_docs, manifest["build_version"])
+    print(f"🔤 BM25 색인: 문서 {lexical_meta['n_docs']}개, term {lexical_meta['n_terms']:,}개")
+
+    # 10. (선택) 서빙 인덱스 내보내기 - Chroma 대신 메모리 맵 행렬곱으로 검색
+    if serving_index_dtype:
+        serving_meta = export_serving_index(
+            vectorstore._collection, manifest["build_version"], dtype=serving_index_dtype
+        )
+        print(
+            f"🧮 서빙 인덱스: 행 {serving_meta['n_rows']:,}개, {serving_meta['dtype']}, "
+            f"IVF lists={serving_meta['ivf_lists']}"
+        )
 
     print("✅ PDR 구축 완료!")
+    if failed:
+        print(f"⚠️ 실패한 문서 {failed}개는 다음 --incremental 실행 때 다시 시도됩니다.")
     print(f"📂 벡터DB 위치: {CHROMA_DIR}")
-    print(f"📂 문서저장소 위치: {DOCSTORE_DIR}")
+    print(f"📂 문서저장소 위치: {DOCSTORE_PATH}")
+    cache_stats = embeddings.stats()
+    print(
+        f"🧠 임베딩 캐시: hit {cache_stats['hits']} / miss {cache_stats['misses']} "
+        f"({cache_stats['hit_rate']:.1%})"
+    )
+    print(f"📄 매니페스트: {MANIFEST_PATH} (build_version={manifest['build_version']})")
 
 if __name__ == "__main__":
-    build_chroma_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="홍익대 RAG 벡터DB 구축")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="신규/변경/삭제된 게시글만 반영 (기본: 전체 재구축)"
+    )
+    parser.add_argument(
+        "--skip-quick-answers",
+        action="store_true",
+        help="빠른 질문 답변 사전계산 생략"
+    )
+    parser.add_argument(
+        "--serving-index",
+        choices=SERVING_DTYPES,
+        default=None,
+        help="구축 후 메모리 맵 서빙 인덱스도 내보내기 (float16 / int8 / pq)"
+    )
+    shard_group = parser.add_mutually_exclusive_group()
+    shard_group.add_argument(
+        "--shards",
+        dest="shards",
+        action="store_true",
+        default=None,
+        help="notice_type별 샤드 컬렉션도 구축/유지 (기본: 이전 빌드 설정 유지)"
+    )
+    shard_group.add_argument(
+        "--no-shards",
+        dest="shards",
+        action="store_false",
+        help="샤드 컬렉션 삭제"
+    )
+    args = parser.parse_args()
+    build_chroma_db(
+        incremental=args.incremental,
+        serving_index_dtype=args.serving_index,
+        shards=args.shards
+    )
+
+    # 인덱스가 바뀐 경우에만 빠른 질문 답변 재생성
+    if not args.skip_quick_answers:
+        from rag_core.quick_answers import refresh_quick_answers
+        refresh_quick_answers()
@@ -0,0 +1,173 @@
+"""
+notice_type별 Chroma 샤드 컬렉션
+- 하나의 hongik_data 컬렉션에 {"notice_type": ...} 메타데이터 필터를 거는 대신
+  카테고리별 컬렉션(hongik_data__univ_notice 등)에 child를 따로 저장 → 작은 카테고리도 필터 없이 ANN 검색
+- 샤드는 본 컬렉션에서 child(임베딩 포함)를 복사해 만듦 → 임베딩 API 추가 호출 없음
+- 샤드 구성은 인덱스 매니페스트의 "shards" 항목에 기록
+    {"대학공지": {"collection": "hongik_data__univ_notice", "n_children": 1234}, ...}
+- 검색: 카테고리 선택 시 해당 샤드만, "전체"는 모든 샤드에 병렬 질의 후 거리 기준 k-way merge
+"""
+
+import heapq
+import hashlib
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_chroma import Chroma
+
+from build_vector_db.index_manifest import IndexVersionWatcher, load_manifest
+from build_vector_db.embedding_pipeline import upsert_vectors
+
+# Chroma 컬렉션 이름은 영문/숫자/._- 만 가능 → notice_type별 고정 이름 (전처리 index 접두어와 동일)
+SHARD_SLUGS = {
+    "대학공지": "univ_notice",
+    "학과공지": "notice",
+    "교과목/수강": "course",
+}
+SHARD_COPY_BATCH = 2000
+
+
+def shard_collection_name(base_collection: str, notice_type: str) -> str:
+    slug = SHARD_SLUGS.get(notice_type)
+    if slug is None:
+        slug = "t" + hashlib.sha1(str(notice_type).encode("utf-8")).hexdigest()[:10]
+    return f"{base_collection}__{slug}"
+
+
+def open_shard(embeddings, persist_dir, collection_name):
+    return Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=str(persist_dir)
+    )
+
+
+# ---------------- 구축 ---------------- #
+
+def _copy_children(main_vectorstore, shard_stores, open_store, where=None):
+    """본 컬렉션의 child(임베딩/원문/메타데이터)를 notice_type별 샤드로 upsert"""
+    collection = main_vectorstore._collection
+    offset = 0
+    while True:
+        batch = collection.get(
+            where=where,
+            include=["embeddings", "metadatas", "documents"],
+            limit=SHARD_COPY_BATCH,
+            offset=offset,
+        )
+        if not batch["ids"]:
+            break
+        grouped = {}
+        for i, md in enumerate(batch["metadatas"]):
+            grouped.setdefault((md or {}).get("notice_type", ""), []).append(i)
+        for notice_type, idx in grouped.items():
+            if notice_type not in shard_stores:
+                shard_stores[notice_type] = open_store(notice_type)
+            upsert_vectors(
+                shard_stores[notice_type],
+                ids=[batch["ids"][i] for i in idx],
+                vectors=[batch["embeddings"][i] for i in idx],
+                texts=[batch["documents"][i] for i in idx],
+                metadatas=[batch["metadatas"][i] for i in idx],
+            )
+        offset += len(batch["ids"])
+
+
+def sync_shards(main_vectorstore, embeddings, persist_dir, base_collection, layout=None,
+                parent_ids=None, removed_ids=()):
+    """
+    샤드 갱신 후 새 layout 반환
+    - layout이 없으면(처음 켜는 경우) 본 컬렉션 전체를 복사
+    - layout이 있으면 removed_ids(변경/삭제) 부모의 child를 지우고 parent_ids(신규/변경)만 복사
+    """
+    def open_store(notice_type):
+        return open_shard(embeddings, persist_dir, shard_collection_name(base_collection, notice_type))
+
+    shard_stores = {nt: open_store(nt) for nt in (layout or {})}
+
+    if layout:
+        removed_ids = list(removed_ids)
+        for i in range(0, len(removed_ids), 500):
+            chunk = removed_ids[i:i + 500]
+            for store in shard_stores.values():
+                found = store.get(where={"doc_id": {"$in": chunk}}, include=[])
+                if found["ids"]:
+                    store.delete(ids=found["ids"])
+        parent_ids = list(parent_ids or [])
+        for i in range(0, len(parent_ids), 500):
+            _copy_children(main_vectorstore, shard_stores, open_store,
+                           where={"doc_id": {"$in": parent_ids[i:i + 500]}})
+    else:
+        _copy_children(main_vectorstore, shard_stores, open_store)
+
+    return {
+        nt: {
+            "collection": shard_collection_name(base_collection, nt),
+            "n_children": store._collection.count(),
+        }
+        for nt, store in sorted(shard_stores.items())
+    }
+
+
+def drop_shards(embeddings, persist_dir, layout):
+    """샤드 컬렉션 삭제 (--no-shards)"""
+    for info in (layout or {}).values():
+        open_shard(embeddings, persist_dir, info["collection"]).delete_collection()
+
+
+# ---------------- 검색 ---------------- #
+
+class ShardRouter:
+    """
+    매니페스트의 샤드 구성에 따라 child 검색을 라우팅
+    - notice_type 지정: 해당 샤드만 (메타데이터 필터 없음)
+    - notice_type 없음("전체"): 모든 샤드에 병렬 질의 → 거리 오름차순 k-way merge
+    - 인덱스 build_version이 바뀌면 샤드 구성을 다시 읽음
+    """
+
+    def __init__(self, embeddings, persist_dir, manifest_path, max_workers: int = 4):
+        self.embeddings = embeddings
+        self.persist_dir = persist_dir
+        self.manifest_path = str(manifest_path)
+        self.version_watcher = IndexVersionWatcher(manifest_path)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard")
+        self._version = object()
+        self._stores = {}
+
+    def _refresh(self):
+        version = self.version_watcher.current()
+        if version == self._version:
+            return
+        manifest = load_manifest(self.manifest_path) or {}
+        self._stores = {
+            nt: open_shard(self.embeddings, self.persist_dir, info["collection"])
+            for nt, info in (manifest.get("shards") or {}).items()
+        }
+        self._version = version
+
+    @property
+    def available(self) -> bool:
+        self._refresh()
+        return bool(self._stores)
+
+    def similarity_search_with_score(self, query: str, k: int, notice_type: str = None, filter: dict = None):
+        """반환: [(child Document, distance), ...] 거리 오름차순 (Chroma와 같은 형식)"""
+        # 질문 임베딩은 한 번만 계산해서 모든 샤드에 같은 벡터로 질의
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k, notice_type, filter)
+
+    def similarity_search_by_vector(self, embedding, k: int, notice_type: str = None, filter: dict = None):
+        """이미 계산한 질문 임베딩으로 검색 (반환 형식은 similarity_search_with_score와 같음)"""
+        self._refresh()
+        if notice_type is not None:
+            store = self._stores.get(notice_type)
+            if store is None:
+                return []
+            return store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
+
+        # "전체": 모든 샤드에 병렬 질의 → 거리 오름차순 k-way merge
+        futures = [
+            self._pool.submit(store.similarity_search_by_vector_with_relevance_scores, embedding, k, filter)
+            for store in self._stores.values()
+        ]
+        per_shard = [f.result() for f in futures]
+        return list(islice(heapq.merge(*per_shard, key=lambda hit: hit[1]), k))
@@ -0,0 +1,246 @@
+"""
+디스크 기반 임베딩 캐시
+- key: sha256(모델명 + 텍스트)  → 같은 텍스트는 한 번만 임베딩
+- value: float32 바이너리(BLOB) (pickle/리스트 직렬화 X → 벡터당 3072*4 = 12KB)
+- 전체 크기 상한(max_bytes)을 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+- 빌더(child 조각 임베딩)와 앱(질문 임베딩)이 같은 파일을 공유
+    → 전체 크기는 프로세스 메모리가 아니라 cache_size 테이블(한 행)에 트리거로 유지
+      (저장/삭제와 같은 트랜잭션에서 갱신되므로 여러 프로세스가 써도 실제 크기와 일치)
+- last_access는 ACCESS_UPDATE_INTERVAL보다 오래된 항목만 갱신 (캐시 적중마다 쓰기/fsync X)
+"""
+
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_PATH = Path(__file__).resolve().parent / "embedding_cache" / "embeddings.db"
+EMBEDDING_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2GB
+ACCESS_UPDATE_INTERVAL = 3600              # last_access 갱신 간격 (초) - LRU는 이 정도 해상도면 충분
+
+
+def _text_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> list:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델을 감싸는 캐시 래퍼 (Chroma의 embedding_function으로 그대로 사용)
+    - hits / misses 카운터는 stats()로 확인
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        cache_path=EMBEDDING_CACHE_PATH,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vec BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        # 전체 크기: 한 행짜리 테이블 + 트리거 (처음 한 번만 SUM으로 초기화)
+        self._conn.executescript(
+            """
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS cache_size (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                total_bytes INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings
+            BEGIN
+                UPDATE cache_size SET total_bytes = total_bytes + NEW.nbytes WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings
+            BEGIN
+                UPDATE cache_size SET total_bytes = total_bytes - OLD.nbytes WHERE id = 0;
+            END;
+            INSERT OR IGNORE INTO cache_size (id, total_bytes)
+                SELECT 0, COALESCE(SUM(nbytes), 0) FROM embeddings;
+            COMMIT;
+            """
+        )
+
+    def _total_bytes(self) -> int:
+        """현재 캐시 전체 크기 (다른 프로세스가 저장/삭제한 것까지 반영)"""
+        return self._conn.execute("SELECT total_bytes FROM cache_size WHERE id = 0").fetchone()[0]
+
+    # ---------------- 캐시 조회/저장 ---------------- #
+
+    def _lookup(self, keys):
+        """
+        keys 중 캐시에 있는 것만 {key: vector}로 반환
+        - last_access가 ACCESS_UPDATE_INTERVAL보다 오래된 항목만 갱신 (자주 묻는 질문은 쓰기 없이 읽기만)
+        """
+        found = {}
+        stale = []
+        now = time.time()
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vec, last_access FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob, last_access in rows:
+                    found[key] = _from_blob(blob)
+                    if now - last_access >= ACCESS_UPDATE_INTERVAL:
+                        stale.append((now, key))
+            if stale:
+                self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", stale)
+                self._conn.commit()
+        return found
+
+    def _store(self, items):
+        """items: [(key, vector), ...]"""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = _to_blob(vector)
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            # 실제로 들어간 행만 트리거가 cache_size에 더함 (같은 트랜잭션)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vec, nbytes, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict_if_needed()
+            self._conn.commit()
+
+    def _evict_if_needed(self):
+        """상한 초과 시 오래 안 쓴 항목부터 삭제 (상한의 90%까지 줄임)"""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        while total > target:
+            rows = self._conn.execute(
+                "SELECT key, nbytes FROM embeddings ORDER BY last_access ASC LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, nbytes in rows:
+                if total <= target:
+                    break
+                victims.append((key,))
+                total -= nbytes
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+            total = self._total_bytes()
+
+    # ---------------- Embeddings 인터페이스 ---------------- #
+
+    def embed_documents(self, texts):
+        keys = [_text_key(self.model_name, t) for t in texts]
+        found = self._lookup(keys)
+
+        # 캐시에 없는 텍스트만 (배치 내 중복 제거 후) 실제 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        n_missed = sum(1 for k in keys if k in missing)
+        self.hits += len(texts) - n_missed
+        self.misses += n_missed
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self._store(new_items)
+            found.update(new_items)
+
+        return [found[k] for k in keys]
+
+    def embed_query(self, text):
+        key = _text_key(self.model_name, text)
+        found = self._lookup([key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+
+        self.misses += 1
+        vector = self.underlying.embed_query(text)
+        self._store([(key, vector)])
+        return vector
+
+    async def aembed_query(self, text):
+        """embed_query의 async 버전 (SQLite 조회/저장은 스레드, 임베딩 API는 비동기 클라이언트)"""
+        key = _text_key(self.model_name, text)
+        found = await asyncio.to_thread(self._lookup, [key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+
+        self.misses += 1
+        vector = await self.underlying.aembed_query(text)
+        await asyncio.to_thread(self._store, [(key, vector)])
+        return vector
+
+    # ---------------- 통계 ---------------- #
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total_bytes = self._total_bytes()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+
+
+def get_cached_embeddings(model: str = "text-embedding-3-large", cache_path=EMBEDDING_CACHE_PATH):
+    """OpenAIEmbeddings + 디스크 캐시 (빌더/앱 공통)"""
+    from langchain_openai import OpenAIEmbeddings
+
+    return CachedEmbeddings(
+        OpenAIEmbeddings(model=model),
+        model_name=model,
+        cache_path=cache_path,
+    )
@@ -0,0 +1,270 @@
+"""
+병렬 임베딩 파이프라인 (인덱스 구축용)
+- 부모 → 자식 조각 분리 후, tiktoken 토큰 수 기준으로 임베딩 요청을 묶음
+- 여러 임베딩 요청을 동시에 보내되 분당 토큰(TPM) 제한을 지킴 (재시도 + 지수 백오프)
+- Chroma/docstore 쓰기는 writer 스레드 하나가 전담 (SQLite 동시 쓰기 방지)
+- 실패한 부모는 버리지 않고 failed_ids로 돌려줌 → 다음 증분 빌드에서 재시도
+- embeddings에 가짜 임베딩(DeterministicFakeEmbedding 등)을 넣으면 API 없이 테스트 가능
+"""
+
+import time
+import uuid
+import queue
+import random
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+EMBED_MAX_TOKENS_PER_REQUEST = 100_000  # OpenAI 한도(30만)보다 여유 있게
+EMBED_MAX_INPUTS_PER_REQUEST = 2048
+EMBED_TOKENS_PER_MINUTE = 1_000_000
+
+
+def tiktoken_counter(model: str = "text-embedding-3-large"):
+    """텍스트 → 토큰 수 함수 (tiktoken)"""
+    import tiktoken
+
+    try:
+        enc = tiktoken.encoding_for_model(model)
+    except KeyError:
+        enc = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(enc.encode(text, disallowed_special=()))
+
+
+def upsert_vectors(vectorstore, ids, vectors, texts, metadatas):
+    """
+    미리 계산한 임베딩을 Chroma에 그대로 upsert
+    - langchain Chroma.add_texts/add_documents는 임베딩을 다시 계산하므로 컬렉션에 직접 씀
+    - 구축 단계에서 미리 계산한 벡터를 쓰는 곳(파이프라인 writer, 샤드 복사)은 이 함수를 사용
+    """
+    if not ids:
+        return
+    vectorstore._collection.upsert(
+        ids=list(ids),
+        embeddings=list(vectors),
+        metadatas=list(metadatas),
+        documents=list(texts),
+    )
+
+
+class TokenRateLimiter:
+    """분당 토큰 수 제한 (토큰 버킷, 여러 스레드 공유)"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int):
+        # 한 요청이 버킷보다 크면 버킷 전체만큼만 기다림
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(min(wait, 1.0))
+
+
+@dataclass
+class EmbedJob:
+    parents: list                                  # [(parent_id, Document)]
+    children: list                                 # [Document] (metadata에 doc_id 포함)
+    tokens: int
+    vectors: list = field(default_factory=list)
+
+
+@dataclass
+class PipelineResult:
+    succeeded_ids: list = field(default_factory=list)
+    failed_ids: list = field(default_factory=list)
+    n_children: int = 0
+    n_tokens: int = 0
+    n_requests: int = 0
+    n_retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_sec(self):
+        return len(self.succeeded_ids) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_sec(self):
+        return self.n_tokens / self.elapsed if self.elapsed else 0.0
+
+
+class EmbeddingPipeline:
+    def __init__(
+        self,
+        embeddings,
+        vectorstore,
+        docstore,
+        child_splitter,
+        id_key: str = "doc_id",
+        token_counter=None,
+        max_tokens_per_request: int = EMBED_MAX_TOKENS_PER_REQUEST,
+        max_inputs_per_request: int = EMBED_MAX_INPUTS_PER_REQUEST,
+        tokens_per_minute: int = EMBED_TOKENS_PER_MINUTE,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+    ):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.docstore = docstore
+        self.child_splitter = child_splitter
+        self.id_key = id_key
+        self.count_tokens = token_counter or tiktoken_counter()
+        self.max_tokens_per_request = max_tokens_per_request
+        self.max_inputs_per_request = max_inputs_per_request
+        self.limiter = TokenRateLimiter(tokens_per_minute)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._stats_lock = threading.Lock()
+
+    # ---------------- 1. 분리 + 토큰 예산으로 묶기 ---------------- #
+
+    def _make_jobs(self, parents):
+        """부모 단위로 묶어서(한 부모의 자식은 같은 job) 토큰/입력 수 예산 이내로 job 생성"""
+        jobs = []
+        cur_parents, cur_children, cur_tokens = [], [], 0
+
+        for pid, doc in parents:
+            children = self.child_splitter.split_documents([doc])
+            for child in children:
+                child.metadata[self.id_key] = pid
+            tokens = sum(self.count_tokens(c.page_content) for c in children)
+
+            over_budget = (
+                cur_tokens + tokens > self.max_tokens_per_request
+                or len(cur_children) + len(children) > self.max_inputs_per_request
+            )
+            if cur_parents and over_budget:
+                jobs.append(EmbedJob(cur_parents, cur_children, cur_tokens))
+                cur_parents, cur_children, cur_tokens = [], [], 0
+
+            cur_parents.append((pid, doc))
+            cur_children.extend(children)
+            cur_tokens += tokens
+
+        if cur_parents:
+            jobs.append(EmbedJob(cur_parents, cur_children, cur_tokens))
+        return jobs
+
+    # ---------------- 2. 임베딩 (워커 스레드) ---------------- #
+
+    def _embed_with_retry(self, texts, tokens, result):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(tokens)
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                with self._stats_lock:
+                    result.n_retries += 1
+                wait = self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base)
+                print(f"⚠️ 임베딩 요청 실패 ({attempt + 1}/{self.max_retries}), {wait:.1f}초 후 재시도: {e}")
+                time.sleep(wait)
+
+    def _embed_job(self, job, result):
+        """
+        job 하나의 자식 조각 임베딩
+        - 부모 하나가 예산보다 큰 경우에만 여러 요청으로 나눠 보냄
+        """
+        texts = [c.page_content for c in job.children]
+        vectors = []
+        start = 0
+        while start < len(texts):
+            end, tokens = start, 0
+            while end < len(texts) and end - start < self.max_inputs_per_request:
+                t = self.count_tokens(texts[end])
+                if end > start and tokens + t > self.max_tokens_per_request:
+                    break
+                tokens += t
+                end += 1
+            vectors.extend(self._embed_with_retry(texts[start:end], tokens, result))
+            with self._stats_lock:
+                result.n_requests += 1
+            start = end
+        job.vectors = vectors
+        return job
+
+    # ---------------- 3. 저장 (writer 스레드) ---------------- #
+
+    def _write_job(self, job):
+        """자식 벡터 → 부모 원본 순으로 저장 (부모 저장이 실패하면 방금 넣은 자식도 지움 → 고아 벡터 X)"""
+        child_ids = [str(uuid.uuid4()) for _ in job.children]
+        upsert_vectors(
+            self.vectorstore,
+            ids=child_ids,
+            vectors=job.vectors,
+            texts=[c.page_content for c in job.children],
+            metadatas=[c.metadata for c in job.children],
+        )
+        try:
+            self.docstore.mset(job.parents)
+        except Exception:
+            if child_ids:
+                self.vectorstore.delete(ids=child_ids)
+            raise
+
+    def _writer_loop(self, write_queue, result, progress):
+        while True:
+            job = write_queue.get()
+            if job is None:
+                return
+            pids = [pid for pid, _ in job.parents]
+            try:
+                self._write_job(job)
+                result.succeeded_ids.extend(pids)
+                result.n_children += len(job.children)
+                result.n_tokens += job.tokens
+            except Exception as e:
+                print(f"⚠️ 저장 실패 (부모 {len(pids)}개): {e}")
+                result.failed_ids.extend(pids)
+            if progress is not None:
+                progress.update(len(pids))
+
+    # ---------------- 실행 ---------------- #
+
+    def run(self, parents, progress=None) -> PipelineResult:
+        """
+        parents: [(parent_id, Document), ...]
+        progress: update(n)를 가진 객체(tqdm 등), 없으면 None
+        """
+        result = PipelineResult()
+        started = time.perf_counter()
+
+        jobs = self._make_jobs(parents)
+        write_queue = queue.Queue(maxsize=self.max_workers * 2)
+        writer = threading.Thread(
+            target=self._writer_loop, args=(write_queue, result, progress), daemon=True
+        )
+        writer.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+                futures = {ex.submit(self._embed_job, job, result): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        write_queue.put(future.result())
+                    except Exception as e:
+                        print(f"⚠️ 임베딩 최종 실패 (부모 {len(job.parents)}개): {e}")
+                        result.failed_ids.extend(pid for pid, _ in job.parents)
+                        if progress is not None:
+                            progress.update(len(job.parents))
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        result.elapsed = time.perf_counter() - started
+        return result
@@ -0,0 +1,169 @@
+"""
+서빙 인덱스 압축 설정별 recall@k 평가
+- 정답: Chroma 컬렉션의 원본 float32 벡터 전체를 brute-force로 계산한 정확한 코사인 top-k
+- 비교: 설정마다 임시 폴더에 서빙 인덱스를 내보낸 뒤 같은 질의로 검색
+- recall@k = (정답 top-k child의 parent 집합 ∩ 압축 top-k child의 parent 집합) / 정답 parent 수
+  (검색 결과는 parent 단위로 복원되므로 parent 기준으로 비교)
+- 질의 세트: --queries 파일(한 줄에 질문 하나) 또는 기본값
+    실제 사용자 질문(앱 피드백 로그 data/feedbacks/*.csv의 question) + 빠른 질문
+    --n-titles N: 부모 문서 제목 무작위 샘플 추가 (코퍼스에서 뽑은 질의라 held-out이 아님 → 결과를 따로 표시)
+
+실행:
+    python -m build_vector_db.eval_compression [--queries questions.txt] [--k 10 100] [--n-titles 200]
+"""
+
+import csv
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from build_vector_db.serving_index import (
+    ServingIndex,
+    export_serving_index,
+    index_nbytes,
+    iter_collection,
+)
+
+# 비교할 압축 설정 (ivf_lists="sqrt"는 행 수의 제곱근)
+COMPRESSION_CONFIGS = [
+    {"label": "float16", "dtype": "float16"},
+    {"label": "int8", "dtype": "int8"},
+    {"label": "float16 + IVF(√N)", "dtype": "float16", "ivf_lists": "sqrt"},
+    {"label": "Matryoshka 1024 f16 + rescore", "dtype": "float16", "truncate_dim": 1024},
+    {"label": "Matryoshka 256 int8 + rescore", "dtype": "int8", "truncate_dim": 256},
+    {"label": "PQ 96 + rescore", "dtype": "pq", "pq_subspaces": 96},
+    {"label": "PQ 96 (rescore 없음)", "dtype": "pq", "pq_subspaces": 96, "rescore": False},
+    {"label": "PQ 48 + rescore", "dtype": "pq", "pq_subspaces": 48},
+]
+
+# 앱(app_final.py)이 피드백을 저장하는 위치 (실행 위치 기준)
+FEEDBACK_DIR = Path("data/feedbacks")
+QUERY_SET_LABELS = {
+    "file": "질의 파일",
+    "user": "사용자 질문 (held-out)",
+    "titles": "문서 제목 (코퍼스에서 추출, held-out 아님)",
+}
+
+
+def load_user_questions(feedback_dir=FEEDBACK_DIR):
+    """앱 피드백 로그(app_final.save_feedback)의 실제 사용자 질문 (중복 제거)"""
+    questions = []
+    for path in sorted(Path(feedback_dir).glob("feedback_*.csv")):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            questions.extend((row.get("question") or "").strip() for row in csv.DictReader(f))
+    return list(dict.fromkeys(q for q in questions if q))
+
+
+def load_queries(path=None, n_titles: int = 0, feedback_dir=FEEDBACK_DIR, seed: int = 0):
+    """
+    질의 세트 → {이름: [질의, ...]}
+    - 파일이 있으면 {"file": ...}
+    - 없으면 {"user": 피드백 로그 질문 + 빠른 질문, "titles": 부모 문서 제목 샘플 (n_titles > 0일 때만)}
+    """
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return {"file": [line.strip() for line in f if line.strip()]}
+
+    from rag_core.quick_answers import QUICK_QUESTIONS
+
+    user = load_user_questions(feedback_dir)
+    user += [q for qs in QUICK_QUESTIONS.values() for q in qs if q not in user]
+    query_sets = {"user": user}
+    if n_titles:
+        from rag_core.components import DOCSTORE_PATH
+        from build_vector_db.parent_store import SQLiteDocStore
+
+        docstore = SQLiteDocStore(DOCSTORE_PATH)
+        keys = list(docstore.yield_keys())
+        random.Random(seed).shuffle(keys)
+        query_sets["titles"] = [
+            doc.metadata["title"] for doc in docstore.mget(keys[:n_titles])
+            if doc is not None and doc.metadata.get("title")
+        ]
+        docstore.close()
+    return query_sets
+
+
+def exact_top_parents(matrix, parent_ids, query_vectors, k):
+    """원본 float32 brute-force → 질의별 top-k child의 parent 집합"""
+    results = []
+    for q in query_vectors:
+        sims = matrix @ q
+        top = np.argpartition(-sims, min(k, len(sims)) - 1)[:k]
+        results.append({parent_ids[i] for i in top})
+    return results
+
+
+def evaluate(collection, query_vectors, ks=(10, 100), configs=COMPRESSION_CONFIGS):
+    blocks, parent_ids = [], []
+    for block, pids, _ in iter_collection(collection):
+        blocks.append(block)
+        parent_ids.extend(pids)
+    matrix = np.concatenate(blocks)
+    n_rows = len(matrix)
+    truth = {k: exact_top_parents(matrix, parent_ids, query_vectors, k) for k in ks}
+    print(f"📐 행 {n_rows:,}개, {matrix.shape[1]}차원, 질의 {len(query_vectors)}개 "
+          f"(원본 float32 {matrix.nbytes / 1024 ** 2:.1f}MB, 행당 {matrix.shape[1] * 4:,}B)")
+    del matrix, blocks
+
+    rows = []
+    for config in configs:
+        options = {key: val for key, val in config.items() if key != "label"}
+        options.setdefault("ivf_lists", 0)
+        if options["ivf_lists"] == "sqrt":
+            options["ivf_lists"] = max(1, int(np.sqrt(n_rows)))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_serving_index(collection, None, base_dir=tmp_dir, **options)
+            resident, full = index_nbytes(base_dir=tmp_dir)
+            index = ServingIndex(base_dir=tmp_dir)
+
+            recalls = {k: [] for k in ks}
+            latencies = []
+            for qi, q in enumerate(query_vectors):
+                for k in ks:
+                    t0 = time.perf_counter()
+                    hits = index.search(q, k=k)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    got = {pid for pid, _ in hits}
+                    expected = truth[k][qi]
+                    recalls[k].append(len(expected & got) / max(1, len(expected)))
+            del index
+
+        rows.append((config["label"], {k: float(np.mean(v)) for k, v in recalls.items()},
+                     resident / n_rows, full / 1024 ** 2, float(np.percentile(latencies, 50))))
+
+    header = " | ".join(f"recall@{k:<4d}" for k in ks)
+    print(f"\n{'설정':32s} | {header} | 상주 B/행 | rescore MB | p50 ms")
+    for label, recalls, bytes_per_row, full_mb, p50 in rows:
+        recall_cols = " | ".join(f"{recalls[k]:>10.3f}" for k in ks)
+        print(f"{label:32s} | {recall_cols} | {bytes_per_row:9.0f} | {full_mb:10.1f} | {p50:6.2f}")
+    return rows
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="서빙 인덱스 압축 설정별 recall@k 평가")
+    parser.add_argument("--queries", default=None, help="질의 파일 (한 줄에 하나)")
+    parser.add_argument("--n-titles", type=int, default=0,
+                        help="문서 제목 질의 수 (코퍼스에서 뽑으므로 held-out 아님, 따로 표시)")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 100])
+    args = parser.parse_args()
+
+    from rag_core.components import load_retriever
+
+    vectorstore = load_retriever().vectorstore
+    for name, queries in load_queries(args.queries, args.n_titles).items():
+        if not queries:
+            continue
+        print(f"\n=== {QUERY_SET_LABELS[name]}: {len(queries)}개 ===")
+        # 질의 임베딩도 임베딩 캐시 경유 (재실행 시 API 호출 X)
+        query_vectors = np.asarray(vectorstore.embeddings.embed_documents(queries), dtype=np.float32)
+        query_vectors /= np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+        evaluate(vectorstore._collection, query_vectors, ks=tuple(args.k))
@@ -0,0 +1,140 @@
+"""
+벡터DB 인덱스 매니페스트 관리
+- 어떤 부모 문서(게시글)가 어떤 내용(해시)으로 인덱싱되어 있는지 기록
+- 증분(incremental) 빌드 시 신규/변경/삭제 게시글만 골라내는 데 사용
+- build_version은 인덱스 내용이 바뀔 때만 증가 (캐시 무효화 기준)
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+MANIFEST_PATH = "build_vector_db/index_manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def make_parent_key(metadata: dict) -> str:
+    """
+    게시글의 안정적인 식별 키
+    - original_id(univ_notice_100 등)는 전처리 때마다 순번이 다시 매겨지므로 쓰지 않음
+    - URL이 있으면 URL, 없으면(교과목) 분류+학과+제목 조합
+    """
+    url = str(metadata.get("url") or "").strip()
+    if url and url.lower() != "nan":
+        return url
+    return "|".join([
+        str(metadata.get("notice_type", "")),
+        str(metadata.get("department", "")),
+        str(metadata.get("title", "")),
+    ])
+
+
+def make_parent_id(parent_key: str) -> str:
+    """parent key → docstore/Chroma에서 쓰는 doc_id (파일명으로도 안전한 hex)"""
+    return hashlib.sha1(parent_key.encode("utf-8")).hexdigest()
+
+
+def content_hash(page_content: str, metadata: dict) -> str:
+    """
+    본문 + 메타데이터 해시
+    - original_id는 순번이라 매번 바뀌므로 해시 대상에서 제외
+    """
+    md = {k: v for k, v in metadata.items() if k != "original_id"}
+    payload = json.dumps(
+        {"content": page_content, "metadata": md},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def new_manifest(embedding_model: str, collection_name: str, previous: dict = None) -> dict:
+    """
+    빈 매니페스트
+    - previous: 전체 재구축 전의 매니페스트 → build_version을 이어받음
+      (0부터 다시 세면 재구축 후 버전이 예전 값과 겹쳐 캐시가 무효화되지 않음)
+    """
+    return {
+        "format": MANIFEST_FORMAT,
+        "build_version": int((previous or {}).get("build_version") or 0),
+        "built_at": None,
+        "embedding_model": embedding_model,
+        "collection_name": collection_name,
+        "parents": {},  # parent_id -> {"key": ..., "hash": ...}
+    }
+
+
+def load_manifest(path: str = MANIFEST_PATH):
+    """매니페스트 로드 (없거나 깨졌으면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return None
+    return manifest
+
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH):
+    """임시 파일에 쓴 뒤 교체 (중간에 죽어도 이전 매니페스트 유지)"""
+    manifest["built_at"] = datetime.now().isoformat(timespec="seconds")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def diff_manifest(manifest: dict, current: dict):
+    """
+    current: parent_id -> content_hash
+    반환: (new_ids, changed_ids, removed_ids, unchanged_ids)
+    """
+    old = manifest.get("parents", {}) if manifest else {}
+
+    new_ids, changed_ids, unchanged_ids = [], [], []
+    for pid, h in current.items():
+        if pid not in old:
+            new_ids.append(pid)
+        elif old[pid].get("hash") != h:
+            changed_ids.append(pid)
+        else:
+            unchanged_ids.append(pid)
+
+    removed_ids = [pid for pid in old if pid not in current]
+    return new_ids, changed_ids, removed_ids, unchanged_ids
+
+
+def read_build_version(path: str = MANIFEST_PATH):
+    """현재 인덱스 build_version (매니페스트가 없으면 None)"""
+    manifest = load_manifest(path)
+    if manifest is None:
+        return None
+    return manifest.get("build_version")
+
+
+class IndexVersionWatcher:
+    """
+    매니페스트 파일의 mtime이 바뀔 때만 다시 읽어서 build_version 반환
+    - 질문마다 호출해도 os.stat 한 번이면 끝 (캐시 무효화 기준으로 사용)
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = str(path)
+        self._mtime = None
+        self._version = None
+
+    def current(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._version = read_build_version(self.path) if mtime is not None else None
+        return self._version
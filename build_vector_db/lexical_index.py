@@ -0,0 +1,247 @@
+"""
+부모 문서 BM25 역색인 (한국어 문자 n-gram, 메모리 맵 NumPy)
+- 학수번호(course_id), 학과명, 첨부파일명처럼 "정확히 같은 글자"가 중요한 질의를
+  Chroma 의미 검색이 놓치는 경우를 보완 → retrieval.py에서 RRF로 융합
+- 토큰화: 한글 연속 구간은 2-gram(한 글자면 그대로), 영문/숫자 연속 구간은 단어 그대로
+  (조사/띄어쓰기가 달라도 매칭, 형태소 분석기 의존성 없음)
+- 파일 구성 (build_vector_db/ 아래)
+    lexical_index_terms.npy     term 해시(uint64) 오름차순
+    lexical_index_offsets.npy   term별 posting 시작 위치 (CSR)
+    lexical_index_postings.npy  문서 행 번호 (int32)
+    lexical_index_tf.npy        term frequency (uint16)
+    lexical_index_docs.npy      행별 parent_id / 문서 길이 / notice_type 코드
+    lexical_index.json          build_version, 문서 수, 평균 길이, notice_type 코드표
+- 사이드카와 마찬가지로 임시 파일에 쓴 뒤 교체, JSON을 마지막에 써서 준비 완료 표시
+"""
+
+import os
+import re
+import json
+import math
+import hashlib
+import unicodedata
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+LEXICAL_INDEX_DIR = Path(__file__).resolve().parent
+LEXICAL_INDEX_NAME = "lexical_index"
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 지연시간 상한: 전체 문서의 이 비율보다 많이 등장하는 term은 건너뜀 (idf가 거의 0이라 순위 영향 미미)
+LEXICAL_MAX_DF_RATIO = 0.2
+LEXICAL_MAX_QUERY_TERMS = 64
+MAX_WORD_LEN = 32
+
+DOCS_DTYPE = np.dtype([
+    ("parent_id", "S40"),
+    ("doc_len", np.int32),
+    ("notice_type", np.int8),
+])
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[0-9a-z]+")
+
+
+def tokenize(text: str):
+    """한글 구간 → 문자 2-gram, 영문/숫자 구간 → 단어"""
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    tokens = []
+    for run in _TOKEN_RE.findall(text):
+        if "가" <= run[0] <= "힣":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run[:MAX_WORD_LEN])
+    return tokens
+
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def document_text(page_content: str, metadata: dict) -> str:
+    """색인 대상 텍스트 (제목은 두 번 넣어 가중)"""
+    metadata = metadata or {}
+    fields = [
+        metadata.get("title", ""),
+        metadata.get("title", ""),
+        metadata.get("department", ""),
+        metadata.get("course_id", ""),
+        metadata.get("attachment_name_str", ""),
+        page_content,
+    ]
+    return "\n".join(str(f) for f in fields if f and f not in ("해당없음", "없음"))
+
+
+def _paths(base_dir, name=LEXICAL_INDEX_NAME):
+    base_dir = Path(base_dir)
+    return {
+        "terms": base_dir / f"{name}_terms.npy",
+        "offsets": base_dir / f"{name}_offsets.npy",
+        "postings": base_dir / f"{name}_postings.npy",
+        "tf": base_dir / f"{name}_tf.npy",
+        "docs": base_dir / f"{name}_docs.npy",
+        "meta": base_dir / f"{name}.json",
+    }
+
+
+def _atomic_save_npy(path, arr):
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp_path, path)
+
+
+def write_lexical_index(docs, build_version, base_dir=LEXICAL_INDEX_DIR, name=LEXICAL_INDEX_NAME):
+    """
+    docs: [(parent_id, notice_type, text), ...]
+    """
+    notice_types = sorted({d[1] for d in docs})
+    nt_code = {v: i for i, v in enumerate(notice_types)}
+
+    doc_arr = np.empty(len(docs), dtype=DOCS_DTYPE)
+    term_code = {}
+    term_ids, rows, tfs = array("i"), array("i"), array("i")
+    for row, (pid, notice_type, text) in enumerate(docs):
+        counts = Counter(tokenize(text))
+        doc_arr[row] = (pid.encode("ascii"), sum(counts.values()), nt_code[notice_type])
+        for term, tf in counts.items():
+            term_ids.append(term_code.setdefault(term, len(term_code)))
+            rows.append(row)
+            tfs.append(tf)
+
+    hashes = np.fromiter((_term_hash(t) for t in term_code), dtype=np.uint64, count=len(term_code))
+    posting_hashes = hashes[np.frombuffer(term_ids, dtype=np.int32)]
+    rows = np.frombuffer(rows, dtype=np.int32)
+    order = np.lexsort((rows, posting_hashes))          # term 해시 → 문서 행 순서로 정렬
+    posting_hashes = posting_hashes[order]
+    terms, starts = np.unique(posting_hashes, return_index=True)
+    offsets = np.append(starts, len(order)).astype(np.int64)
+    postings = rows[order]
+    tf = np.minimum(np.frombuffer(tfs, dtype=np.int32)[order], np.iinfo(np.uint16).max).astype(np.uint16)
+
+    paths = _paths(base_dir, name)
+    _atomic_save_npy(paths["terms"], terms)
+    _atomic_save_npy(paths["offsets"], offsets)
+    _atomic_save_npy(paths["postings"], postings)
+    _atomic_save_npy(paths["tf"], tf)
+    _atomic_save_npy(paths["docs"], doc_arr)
+
+    meta = {
+        "build_version": build_version,
+        "n_docs": int(len(doc_arr)),
+        "n_terms": int(len(terms)),
+        "n_postings": int(len(postings)),
+        "avg_doc_len": float(doc_arr["doc_len"].mean()) if len(doc_arr) else 0.0,
+        "notice_types": notice_types,
+    }
+    tmp_path = str(paths["meta"]) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, paths["meta"])
+    return meta
+
+
+class LexicalIndex:
+    """
+    읽기 전용 BM25 색인 (np.load mmap_mode="r")
+    - 메타 JSON의 mtime이 바뀌면(재구축) 다시 연다
+    """
+
+    def __init__(self, base_dir=LEXICAL_INDEX_DIR, name=LEXICAL_INDEX_NAME):
+        self.paths = _paths(base_dir, name)
+        self._meta_mtime = None
+        self.meta = {}
+        self.arrays = None
+        self.refresh()
+
+    @property
+    def available(self) -> bool:
+        return self.arrays is not None and self.meta.get("n_docs", 0) > 0
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.paths["meta"]).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        try:
+            with open(self.paths["meta"], "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            arrays = {
+                key: np.load(path, mmap_mode="r")
+                for key, path in self.paths.items() if key != "meta"
+            }
+        except (OSError, ValueError):
+            return
+        if (
+            len(arrays["docs"]) != meta.get("n_docs")
+            or len(arrays["terms"]) != meta.get("n_terms")
+            or len(arrays["postings"]) != meta.get("n_postings")
+        ):
+            return  # 쓰는 도중이면 다음 호출 때 다시 시도
+        self.meta, self.arrays = meta, arrays
+        self._doc_len = np.asarray(arrays["docs"]["doc_len"], dtype=np.float32)
+        self._doc_nt = np.asarray(arrays["docs"]["notice_type"])
+        self._meta_mtime = mtime
+
+    def search(self, query: str, k: int = 100, notice_type: str = None):
+        """반환: [(parent_id, bm25_score), ...] 점수 내림차순 (최대 k개)"""
+        self.refresh()
+        if not self.available or k <= 0:
+            return []
+        arrays = self.arrays
+        n_docs = self.meta["n_docs"]
+        avg_doc_len = self.meta["avg_doc_len"] or 1.0
+
+        query_terms = list(dict.fromkeys(tokenize(query)))[:LEXICAL_MAX_QUERY_TERMS]
+        if not query_terms:
+            return []
+        hashes = np.fromiter((_term_hash(t) for t in query_terms), dtype=np.uint64, count=len(query_terms))
+        terms = arrays["terms"]
+        pos = np.searchsorted(terms, hashes)
+        in_range = pos < len(terms)
+        pos, hashes = pos[in_range], hashes[in_range]
+        pos = pos[terms[pos] == hashes]
+        if not len(pos):
+            return []
+
+        starts = np.asarray(arrays["offsets"][pos])
+        ends = np.asarray(arrays["offsets"][pos + 1])
+        dfs = ends - starts
+        # 흔한 term은 건너뜀 (모두 흔하면 가장 드문 것 하나만 사용)
+        keep = dfs <= max(1, int(n_docs * LEXICAL_MAX_DF_RATIO))
+        if not keep.any():
+            keep = dfs == dfs.min()
+
+        all_rows, all_scores = [], []
+        for start, end, df in zip(starts[keep], ends[keep], dfs[keep]):
+            rows = np.asarray(arrays["postings"][start:end])
+            tf = np.asarray(arrays["tf"][start:end], dtype=np.float32)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[rows] / avg_doc_len)
+            all_rows.append(rows)
+            all_scores.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+        scores = np.bincount(np.concatenate(all_rows), weights=np.concatenate(all_scores), minlength=n_docs)
+        if notice_type is not None:
+            try:
+                code = self.meta["notice_types"].index(notice_type)
+            except ValueError:
+                return []
+            scores[self._doc_nt != code] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        parent_ids = arrays["docs"]["parent_id"][candidates]
+        return [(pid.decode("ascii"), float(scores[row])) for pid, row in zip(parent_ids, candidates)]
@@ -0,0 +1,166 @@
+"""
+부모 문서 메타데이터 사이드카 (컬럼형, 메모리 맵 NumPy)
+- build_chroma_db가 부모 id → epoch_day / notice_type / department / has_attachment를 저장
+- 검색 시 docstore에서 부모를 꺼내기 전에 최신성 점수 계산, "최근 N일" 필터 가능
+- 파일 구성 (build_vector_db/ 아래)
+    metadata_sidecar.npy            구조화 배열 (parent_id 기준 정렬 → searchsorted로 조회)
+    metadata_sidecar_date_order.npy epoch_day 오름차순 행 번호 (기간 검색용 정렬 인덱스)
+    metadata_sidecar.json           notice_type/department 코드표 + build_version
+- 파일은 임시 파일에 쓴 뒤 교체하므로, 앱이 메모리 맵으로 열고 있어도 안전
+"""
+
+import os
+import json
+from pathlib import Path
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+SIDECAR_DIR = Path(__file__).resolve().parent
+SIDECAR_NAME = "metadata_sidecar"
+
+# epoch-day 특수값 (사이드카에 저장되는 값 - 질의 경로 rag_core/rerank.py도 여기서 가져다 씀)
+EPOCH_DAY_ALWAYS = -1   # "상시", "날짜미상", 빈 값 → 가중치 1.0
+EPOCH_DAY_INVALID = -2  # 파싱 실패 / 사이드카에 없는 부모 → 가중치 0.5
+
+_EPOCH = date(1970, 1, 1)
+
+SIDECAR_DTYPE = np.dtype([
+    ("parent_id", "S40"),        # sha1 hex
+    ("epoch_day", np.int32),
+    ("notice_type", np.int8),
+    ("department", np.int16),
+    ("has_attachment", np.bool_),
+])
+
+
+@lru_cache(maxsize=65536)
+def date_to_epoch_day(date_str) -> int:
+    """'YYYY-MM-DD' / 'YYYY.MM.DD' → 1970-01-01 기준 경과일"""
+    if date_str in ("상시", "날짜미상", None, ""):
+        return EPOCH_DAY_ALWAYS
+    try:
+        normalized_date = str(date_str).replace(".", "-").strip()
+        return (datetime.strptime(normalized_date, "%Y-%m-%d").date() - _EPOCH).days
+    except Exception:
+        return EPOCH_DAY_INVALID
+
+
+def today_epoch_day() -> int:
+    return (date.today() - _EPOCH).days
+
+
+def _paths(base_dir, name=SIDECAR_NAME):
+    base_dir = Path(base_dir)
+    return (
+        base_dir / f"{name}.npy",
+        base_dir / f"{name}_date_order.npy",
+        base_dir / f"{name}.json",
+    )
+
+
+def _atomic_save_npy(path, arr):
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp_path, path)
+
+
+def write_sidecar(rows, build_version, base_dir=SIDECAR_DIR, name=SIDECAR_NAME):
+    """
+    rows: [(parent_id, epoch_day, notice_type, department, has_attachment), ...]
+    """
+    notice_types = sorted({r[2] for r in rows})
+    departments = sorted({r[3] for r in rows})
+    nt_code = {v: i for i, v in enumerate(notice_types)}
+    dept_code = {v: i for i, v in enumerate(departments)}
+
+    arr = np.empty(len(rows), dtype=SIDECAR_DTYPE)
+    for i, (pid, epoch_day, notice_type, department, has_attachment) in enumerate(rows):
+        arr[i] = (pid.encode("ascii"), epoch_day, nt_code[notice_type], dept_code[department], bool(has_attachment))
+    arr.sort(order="parent_id")
+    date_order = np.argsort(arr["epoch_day"], kind="stable").astype(np.int32)
+
+    data_path, order_path, meta_path = _paths(base_dir, name)
+    _atomic_save_npy(data_path, arr)
+    _atomic_save_npy(order_path, date_order)
+
+    meta = {
+        "build_version": build_version,
+        "count": int(len(arr)),
+        "notice_types": notice_types,
+        "departments": departments,
+    }
+    tmp_path = str(meta_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta
+
+
+class MetadataSidecar:
+    """
+    읽기 전용 사이드카 (np.load mmap_mode="r")
+    - 메타 JSON의 mtime이 바뀌면(재구축) 다시 연다
+    """
+
+    def __init__(self, base_dir=SIDECAR_DIR, name=SIDECAR_NAME):
+        self.data_path, self.order_path, self.meta_path = _paths(base_dir, name)
+        self._meta_mtime = None
+        self.meta = {}
+        self.data = np.empty(0, dtype=SIDECAR_DTYPE)
+        self.date_order = np.empty(0, dtype=np.int32)
+        self._sorted_days = np.empty(0, dtype=np.int32)
+        self.refresh()
+
+    @property
+    def available(self) -> bool:
+        return len(self.data) > 0
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            data = np.load(self.data_path, mmap_mode="r")
+            date_order = np.load(self.order_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return
+        if len(data) != meta.get("count") or len(date_order) != len(data):
+            return  # 쓰는 도중이면 다음 호출 때 다시 시도
+        self.meta, self.data, self.date_order = meta, data, date_order
+        self._sorted_days = np.asarray(data["epoch_day"])[np.asarray(date_order)]
+        self._meta_mtime = mtime
+
+    # ---------------- 조회 ---------------- #
+
+    def rows_of(self, parent_ids) -> np.ndarray:
+        """parent_id 목록 → 행 번호 배열 (없으면 -1)"""
+        keys = np.asarray([str(p).encode("ascii", "ignore") for p in parent_ids], dtype="S40")
+        ids = self.data["parent_id"]
+        pos = np.searchsorted(ids, keys)
+        pos_clipped = np.minimum(pos, max(len(ids) - 1, 0))
+        found = (pos < len(ids)) & (ids[pos_clipped] == keys) if len(ids) else np.zeros(len(keys), bool)
+        return np.where(found, pos_clipped, -1)
+
+    def epoch_days(self, parent_ids):
+        """반환: (epoch_day int32 배열, 모두 찾았는지 여부)"""
+        rows = self.rows_of(parent_ids)
+        found = rows >= 0
+        days = np.full(len(rows), EPOCH_DAY_INVALID, dtype=np.int32)
+        days[found] = self.data["epoch_day"][rows[found]]
+        return days, bool(found.all())
+
+    def ids_in_date_range(self, start_day: int, end_day: int = None):
+        """epoch_day가 [start_day, end_day] 범위인 parent_id 목록 (정렬 인덱스 이분 탐색)"""
+        sorted_days = self._sorted_days
+        lo = np.searchsorted(sorted_days, max(start_day, 0), side="left")
+        hi = len(sorted_days) if end_day is None else np.searchsorted(sorted_days, end_day, side="right")
+        rows = self.date_order[lo:hi]
+        return [pid.decode("ascii") for pid in self.data["parent_id"][rows]]
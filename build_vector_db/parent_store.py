@@ -0,0 +1,256 @@
+"""
+부모(원본) 문서 저장소 - SQLite 단일 파일
+- 기존 LocalFileStore + pickle 방식은 부모 1개당 파일 1개 → 질문마다 최대 60개 파일 open + unpickle
+- 여기서는 한 파일(docstore.db) 안에 JSON(zlib 압축)으로 저장, mget은 IN 쿼리 한 번
+- pickle을 쓰지 않으므로 조회 시 임의 코드 실행 위험이 없음
+- ParentDocumentRetriever의 docstore로 그대로 사용 가능 (BaseStore[str, Document])
+- LRUParentCache: 자주 묻는 부모(학사일정, 장학 공지 등)를 메모리에 유지하는 앞단 캐시
+
+기존 docstore 디렉터리 변환:
+    python build_vector_db/parent_store.py --migrate
+"""
+
+import sys
+import json
+import zlib
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from langchain_core.documents import Document
+from langchain_core.stores import BaseStore
+
+PARENT_STORE_PATH = Path(__file__).resolve().parent / "docstore.db"
+PARENT_CACHE_MAX_BYTES = 256 * 1024 ** 2  # 256MB
+LEGACY_DOCSTORE_DIR = Path(__file__).resolve().parent / "docstore"
+
+
+def _encode(doc: Document) -> bytes:
+    payload = json.dumps(
+        {"page_content": doc.page_content, "metadata": doc.metadata},
+        ensure_ascii=False,
+        default=str,
+    )
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def _decode(blob: bytes) -> Document:
+    payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return Document(page_content=payload["page_content"], metadata=payload["metadata"])
+
+
+class SQLiteDocStore(BaseStore):
+    """parent_id → Document 저장소 (여러 스레드/Streamlit 세션에서 공유 가능)"""
+
+    def __init__(self, path=PARENT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parents (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def mget(self, keys):
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM parents WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(rows)
+        return [_decode(found[k]) if k in found else None for k in keys]
+
+    def mset(self, key_value_pairs):
+        rows = [(k, _encode(v)) for k, v in key_value_pairs]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parents (key, value) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def mdelete(self, keys):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM parents WHERE key = ?", [(k,) for k in keys]
+            )
+            self._conn.commit()
+
+    def yield_keys(self, prefix=None):
+        with self._lock:
+            if prefix:
+                rows = self._conn.execute(
+                    "SELECT key FROM parents WHERE key >= ? AND key < ? ORDER BY key",
+                    (prefix, prefix + "\U0010ffff"),
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT key FROM parents ORDER BY key").fetchall()
+        for (key,) in rows:
+            yield key
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _doc_nbytes(doc: Document) -> int:
+    """Document 하나의 대략적인 메모리 크기 (본문 + 메타데이터 문자열 길이 기준)"""
+    size = len(doc.page_content.encode("utf-8"))
+    for k, v in (doc.metadata or {}).items():
+        size += len(str(k)) + len(str(v).encode("utf-8"))
+    return size + 512  # 객체 오버헤드 대략치
+
+
+def _copy_doc(doc: Document):
+    """캐시 항목의 복사본 (metadata dict도 새로)"""
+    if doc is None:
+        return None
+    return Document(page_content=doc.page_content, metadata=dict(doc.metadata or {}))
+
+
+class LRUParentCache(BaseStore):
+    """
+    docstore 앞단의 프로세스 내 LRU 캐시 (복원된 부모 Document 그대로 보관)
+    - @st.cache_resource로 만든 retriever에 붙여서 모든 Streamlit 세션이 공유
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 안 쓴 문서부터 제거
+    - version_watcher.current()가 바뀌면(인덱스 재구축) 캐시 전체 비움
+    - mget은 복사본을 반환 (호출한 쪽이 metadata/page_content를 바꿔도 캐시는 그대로)
+    """
+
+    def __init__(self, store, max_bytes: int = PARENT_CACHE_MAX_BYTES, version_watcher=None):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.version_watcher = version_watcher
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # key -> (Document, nbytes)
+        self._bytes = 0
+        self._version = version_watcher.current() if version_watcher else None
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        if self.version_watcher is None:
+            return
+        version = self.version_watcher.current()
+        if version != self._version:
+            self._cache.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _put(self, key, doc):
+        nbytes = _doc_nbytes(doc)
+        if nbytes > self.max_bytes:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._cache[key] = (doc, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._bytes -= evicted
+
+    def _drop(self, keys):
+        for key in keys:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def mget(self, keys):
+        keys = list(keys)
+        results = {}
+        with self._lock:
+            self._check_version()
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is not None:
+                    self._cache.move_to_end(key)
+                    results[key] = entry[0]
+            missing = [k for k in dict.fromkeys(keys) if k not in results]
+            n_missed = sum(1 for k in keys if k not in results)
+            self.hits += len(keys) - n_missed
+            self.misses += n_missed
+
+        if missing:
+            loaded = self.store.mget(missing)
+            with self._lock:
+                for key, doc in zip(missing, loaded):
+                    if doc is not None:
+                        self._put(key, doc)
+                        results[key] = doc
+
+        return [_copy_doc(results.get(k)) for k in keys]
+
+    def mset(self, key_value_pairs):
+        key_value_pairs = list(key_value_pairs)
+        self.store.mset(key_value_pairs)
+        with self._lock:
+            self._drop([k for k, _ in key_value_pairs])
+
+    def mdelete(self, keys):
+        keys = list(keys)
+        self.store.mdelete(keys)
+        with self._lock:
+            self._drop(keys)
+
+    def yield_keys(self, prefix=None):
+        return self.store.yield_keys(prefix=prefix)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "index_version": self._version,
+            }
+
+
+def migrate_from_local_file_store(src_dir=LEGACY_DOCSTORE_DIR, dst_path=PARENT_STORE_PATH, batch_size=500):
+    """
+    기존 LocalFileStore(pickle) 디렉터리 → SQLiteDocStore 1회 변환
+    - 직접 만든 docstore 디렉터리에만 사용할 것 (pickle을 한 번 읽어야 하므로)
+    """
+    import pickle
+    from langchain.storage import LocalFileStore, EncoderBackedStore
+
+    legacy = EncoderBackedStore(
+        store=LocalFileStore(str(src_dir)),
+        key_encoder=lambda x: x,
+        value_serializer=pickle.dumps,
+        value_deserializer=pickle.loads
+    )
+    store = SQLiteDocStore(dst_path)
+
+    keys = list(legacy.yield_keys())
+    migrated = 0
+    for i in range(0, len(keys), batch_size):
+        chunk = keys[i : i + batch_size]
+        docs = legacy.mget(chunk)
+        store.mset([(k, d) for k, d in zip(chunk, docs) if d is not None])
+        migrated += sum(1 for d in docs if d is not None)
+
+    print(f"✅ docstore 변환 완료: {migrated}개 문서 ({src_dir} → {dst_path})")
+    return store
+
+
+if __name__ == "__main__":
+    if "--migrate" in sys.argv:
+        migrate_from_local_file_store()
+    else:
+        print(__doc__)
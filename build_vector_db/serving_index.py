@@ -0,0 +1,611 @@
+"""
+읽기 전용 서빙 인덱스 (Chroma 컬렉션에서 내보낸 메모리 맵 임베딩 행렬)
+- 질의마다 Chroma(SQLite + HNSW + Document 객체 100개 생성)를 거치지 않고
+  NumPy 행렬곱으로 child top-k를 바로 계산
+- 저장 형식: float16 (행 정규화), int8 (행별 scale, 대칭 양자화), pq (Product Quantization, uint8 code)
+  + 선택적으로 Matryoshka 차원 축소 (vector_compression.py)
+- 압축(pq / 차원 축소)하면 원본 float16 벡터를 별도 파일에 두고 상위 후보만 다시 점수 계산 (rescore)
+  → 메모리에 상주하는 것은 압축 code뿐, 원본은 필요한 행만 디스크에서 읽음
+- 검색 방식
+    brute-force : 블록 단위 행렬곱 + argpartition (작은 코퍼스)
+    IVF         : spherical k-means 중심 n_lists개 → 가까운 n_probe개 리스트만 계산 (큰 코퍼스)
+- 카테고리 필터는 export 때 notice_type별 비트마스크로 미리 계산 (검색 전에 행을 거름)
+- 점수는 Chroma 기본 거리(제곱 L2)와 같은 척도(2 - 2·cos)로 반환 → retrieval.py 점수 변환 그대로 사용
+- 파일 구성 (build_vector_db/ 아래)
+    serving_index_vectors.npy   (N, D) float16 / int8, pq면 (N, M) uint8  (IVF면 리스트 순서로 정렬)
+    serving_index_scales.npy    (N,) float32           (int8일 때만)
+    serving_index_pq.npy        (M, 256, D/M) 코드북   (pq일 때만)
+    serving_index_full.npy      (N, 원본 차원) float16 (rescore일 때만)
+    serving_index_rows.npy      행별 parent_id / notice_type 코드
+    serving_index_masks.npy     (notice_type 수, ceil(N/8)) packbits 비트마스크
+    serving_index_ivf.npz       centroids / list_offsets (IVF일 때만)
+    serving_index.json          build_version, 차원, dtype, 코드표 (마지막에 기록)
+
+실행:
+    python -m build_vector_db.serving_index --export [--dtype int8|pq] [--truncate-dim 1024] [--ivf-lists 256]
+    python -m build_vector_db.serving_index --bench [--k 100] [--repeat 5]
+"""
+
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from build_vector_db.vector_compression import (
+    PQ_DEFAULT_SUBSPACES,
+    truncate_dims,
+    train_pq,
+    pq_encode,
+    pq_lookup_table,
+    pq_scores,
+)
+
+SERVING_INDEX_DIR = Path(__file__).resolve().parent
+SERVING_INDEX_NAME = "serving_index"
+
+SERVING_DTYPES = ("float16", "int8", "pq")
+EXPORT_BATCH = 5000
+SEARCH_BLOCK_ROWS = 65536
+IVF_MIN_ROWS = 50000            # 이보다 작으면 brute-force로 충분
+IVF_DEFAULT_PROBE = 8
+IVF_TRAIN_SAMPLE = 16384
+IVF_TRAIN_ITERS = 10
+RESCORE_FACTOR = 4              # 압축 점수로 k x RESCORE_FACTOR개 후보 → 원본 벡터로 다시 점수
+
+ROWS_DTYPE = np.dtype([
+    ("parent_id", "S40"),
+    ("notice_type", np.int8),
+])
+
+
+def _paths(base_dir, name=SERVING_INDEX_NAME):
+    base_dir = Path(base_dir)
+    return {
+        "vectors": base_dir / f"{name}_vectors.npy",
+        "scales": base_dir / f"{name}_scales.npy",
+        "pq": base_dir / f"{name}_pq.npy",
+        "full": base_dir / f"{name}_full.npy",
+        "rows": base_dir / f"{name}_rows.npy",
+        "masks": base_dir / f"{name}_masks.npy",
+        "ivf": base_dir / f"{name}_ivf.npz",
+        "meta": base_dir / f"{name}.json",
+    }
+
+
+def _atomic_save_npy(path, arr):
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp_path, path)
+
+
+def _normalize(block):
+    block = np.asarray(block, dtype=np.float32)
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.maximum(norms, 1e-12)
+
+
+def _quantize(block, dtype, codebooks=None):
+    """정규화된 float32 블록 → (저장용 배열, int8 scale 또는 None)"""
+    if dtype == "float16":
+        return block.astype(np.float16), None
+    if dtype == "pq":
+        return pq_encode(block, codebooks), None
+    scales = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127.0
+    return np.round(block / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def _spherical_kmeans(sample, n_lists, iters=IVF_TRAIN_ITERS, seed=0):
+    """코사인 기준 k-means (중심도 정규화) - 리스트 수는 샘플 수를 넘지 않음"""
+    n_lists = min(n_lists, len(sample))
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        # 빈 리스트는 임의 샘플로 다시 시작
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def iter_collection(collection):
+    """Chroma 컬렉션 → (정규화 float32 블록, parent_id 목록, notice_type 목록) 배치 단위"""
+    total = collection.count()
+    for offset in range(0, total, EXPORT_BATCH):
+        batch = collection.get(include=["embeddings", "metadatas"], limit=EXPORT_BATCH, offset=offset)
+        metadatas = batch["metadatas"]
+        yield (
+            _normalize(batch["embeddings"]),
+            [str((md or {}).get("doc_id", "")) for md in metadatas],
+            [(md or {}).get("notice_type", "") for md in metadatas],
+        )
+
+
+def _reorder_into(src_path, dst_path, order):
+    """메모리 맵 행렬을 order 순서로 새 파일에 복사"""
+    src = np.load(src_path, mmap_mode="r")
+    dst = np.lib.format.open_memmap(dst_path, mode="w+", dtype=src.dtype, shape=src.shape)
+    for start in range(0, len(order), SEARCH_BLOCK_ROWS):
+        idx = order[start:start + SEARCH_BLOCK_ROWS]
+        dst[start:start + len(idx)] = src[idx]
+    dst.flush()
+    del src, dst
+    os.remove(src_path)
+
+
+def export_serving_index(collection, build_version, dtype="float16", ivf_lists=None,
+                         truncate_dim: int = None, pq_subspaces: int = PQ_DEFAULT_SUBSPACES,
+                         rescore: bool = None, base_dir=SERVING_INDEX_DIR, name=SERVING_INDEX_NAME):
+    """
+    Chroma 컬렉션(vectorstore._collection)의 child 임베딩을 서빙 인덱스로 내보내기
+    - ivf_lists=None이면 행 수가 IVF_MIN_ROWS 이상일 때 sqrt(N)개 리스트로 IVF 구성, 0이면 brute-force
+    - truncate_dim: Matryoshka 차원 축소 (None이면 원본 차원)
+    - rescore=None이면 pq 또는 차원 축소일 때 자동으로 원본 float16 벡터 파일을 같이 저장
+    - 배치 단위로 메모리 맵 파일에 바로 기록 (전체 float32 행렬을 메모리에 만들지 않음)
+    """
+    if dtype not in SERVING_DTYPES:
+        raise ValueError(f"dtype은 {SERVING_DTYPES} 중 하나여야 합니다: {dtype}")
+    if rescore is None:
+        rescore = dtype == "pq" or truncate_dim is not None
+    paths = _paths(base_dir, name)
+
+    n_rows = collection.count()
+    if n_rows == 0:
+        raise ValueError("내보낼 임베딩이 없습니다.")
+    if ivf_lists is None:
+        ivf_lists = int(np.sqrt(n_rows)) if n_rows >= IVF_MIN_ROWS else 0
+    ivf_lists = min(ivf_lists, n_rows)
+
+    need_sample = bool(ivf_lists) or dtype == "pq"
+    rng = np.random.default_rng(0)
+    sample_rows = np.sort(rng.choice(n_rows, min(n_rows, IVF_TRAIN_SAMPLE), replace=False)) if need_sample else None
+
+    # 1) 원래 순서로 (차원 축소된) float16 기록 + rescore용 원본 float16 기록 + 학습 샘플 보관
+    raw_path = str(paths["vectors"]) + ".raw.tmp"
+    full_path = str(paths["full"]) + ".raw.tmp"
+    raw, full, samples = None, None, []
+    parent_ids, notice_types = [], []
+    offset = 0
+    for block, pids, nts in iter_collection(collection):
+        primary = truncate_dims(block, truncate_dim)
+        if raw is None:
+            raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float16, shape=(n_rows, primary.shape[1]))
+            if rescore:
+                full = np.lib.format.open_memmap(full_path, mode="w+", dtype=np.float16, shape=(n_rows, block.shape[1]))
+        raw[offset:offset + len(block)] = primary.astype(np.float16)
+        if full is not None:
+            full[offset:offset + len(block)] = block.astype(np.float16)
+        if sample_rows is not None:
+            in_block = sample_rows[(sample_rows >= offset) & (sample_rows < offset + len(block))]
+            samples.append(primary[in_block - offset])
+        parent_ids.extend(pids)
+        notice_types.extend(nts)
+        offset += len(block)
+    raw.flush()
+    dim = raw.shape[1]
+    full_dim = full.shape[1] if full is not None else dim
+    if full is not None:
+        full.flush()
+        del full
+    sample = np.concatenate(samples) if samples else None
+
+    # 2) IVF: 샘플로 중심 학습 → 전체 행 배정 → 리스트 순서
+    order = np.arange(n_rows)
+    centroids, list_offsets = None, None
+    if ivf_lists:
+        centroids = _spherical_kmeans(sample, ivf_lists)
+        ivf_lists = len(centroids)
+        assign = np.concatenate([
+            np.argmax(np.asarray(raw[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+            for start in range(0, n_rows, SEARCH_BLOCK_ROWS)
+        ])
+        order = np.argsort(assign, kind="stable")
+        list_offsets = np.searchsorted(assign[order], np.arange(ivf_lists + 1)).astype(np.int64)
+
+    # 3) PQ 코드북 학습
+    codebooks = train_pq(sample, pq_subspaces) if dtype == "pq" else None
+
+    # 4) 최종 순서로 양자화해서 기록
+    if dtype == "float16" and not ivf_lists:
+        del raw
+        os.replace(raw_path, paths["vectors"])
+        scales = None
+    else:
+        n_cols = pq_subspaces if dtype == "pq" else dim
+        store_dtype = {"float16": np.float16, "int8": np.int8, "pq": np.uint8}[dtype]
+        tmp_vectors = str(paths["vectors"]) + ".tmp"
+        out = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=store_dtype, shape=(n_rows, n_cols))
+        scales = np.empty(n_rows, dtype=np.float32) if dtype == "int8" else None
+        for start in range(0, n_rows, SEARCH_BLOCK_ROWS):
+            idx = order[start:start + SEARCH_BLOCK_ROWS]
+            quantized, block_scales = _quantize(np.asarray(raw[idx], dtype=np.float32), dtype, codebooks)
+            out[start:start + len(idx)] = quantized
+            if scales is not None:
+                scales[start:start + len(idx)] = block_scales
+        out.flush()
+        del out, raw
+        os.remove(raw_path)
+        os.replace(tmp_vectors, paths["vectors"])
+
+    if rescore:
+        if ivf_lists:
+            tmp_full = str(paths["full"]) + ".tmp"
+            _reorder_into(full_path, tmp_full, order)
+            os.replace(tmp_full, paths["full"])
+        else:
+            os.replace(full_path, paths["full"])
+
+    type_names = sorted(set(notice_types))
+    nt_code = {v: i for i, v in enumerate(type_names)}
+    rows = np.empty(n_rows, dtype=ROWS_DTYPE)
+    rows["parent_id"] = np.asarray(parent_ids, dtype="S40")[order]
+    rows["notice_type"] = np.asarray([nt_code[v] for v in notice_types], dtype=np.int8)[order]
+    masks = np.stack([np.packbits(rows["notice_type"] == i) for i in range(len(type_names))])
+
+    _atomic_save_npy(paths["rows"], rows)
+    _atomic_save_npy(paths["masks"], masks)
+    if scales is not None:
+        _atomic_save_npy(paths["scales"], scales)
+    if codebooks is not None:
+        _atomic_save_npy(paths["pq"], codebooks)
+    if ivf_lists:
+        tmp_ivf = str(paths["ivf"]) + ".tmp.npz"
+        np.savez(tmp_ivf, centroids=centroids.astype(np.float32), list_offsets=list_offsets)
+        os.replace(tmp_ivf, paths["ivf"])
+
+    meta = {
+        "build_version": build_version,
+        "n_rows": int(n_rows),
+        "dim": int(dim),
+        "full_dim": int(full_dim),
+        "dtype": dtype,
+        "pq_subspaces": int(pq_subspaces) if dtype == "pq" else 0,
+        "rescore": bool(rescore),
+        "ivf_lists": int(ivf_lists),
+        "notice_types": type_names,
+    }
+    tmp_path = str(paths["meta"]) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, paths["meta"])
+    return meta
+
+
+def index_nbytes(base_dir=SERVING_INDEX_DIR, name=SERVING_INDEX_NAME):
+    """반환: (메모리 상주 파일 바이트, rescore용 원본 파일 바이트)"""
+    resident = 0
+    full = 0
+    for key, path in _paths(base_dir, name).items():
+        if not path.exists():
+            continue
+        if key == "full":
+            full = path.stat().st_size
+        else:
+            resident += path.stat().st_size
+    return resident, full
+
+
+class ServingIndex:
+    """
+    메모리 맵 서빙 인덱스 (np.load mmap_mode="r")
+    - 메타 JSON의 mtime이 바뀌면 다시 연다
+    - version_watcher가 있으면 build_version이 현재 인덱스와 같을 때만 usable
+    """
+
+    def __init__(self, base_dir=SERVING_INDEX_DIR, name=SERVING_INDEX_NAME,
+                 version_watcher=None, n_probe: int = IVF_DEFAULT_PROBE):
+        self.paths = _paths(base_dir, name)
+        self.version_watcher = version_watcher
+        self.n_probe = n_probe
+        self._meta_mtime = None
+        self.meta = {}
+        self.vectors = None
+        self.refresh()
+
+    @property
+    def available(self) -> bool:
+        return self.vectors is not None and self.meta.get("n_rows", 0) > 0
+
+    @property
+    def usable(self) -> bool:
+        self.refresh()
+        if not self.available:
+            return False
+        if self.version_watcher is not None:
+            return self.meta.get("build_version") == self.version_watcher.current()
+        return True
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.paths["meta"]).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        try:
+            with open(self.paths["meta"], "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(self.paths["vectors"], mmap_mode="r")
+            rows = np.load(self.paths["rows"], mmap_mode="r")
+            masks = np.load(self.paths["masks"])
+            scales = np.load(self.paths["scales"], mmap_mode="r") if meta["dtype"] == "int8" else None
+            codebooks = np.load(self.paths["pq"]) if meta["dtype"] == "pq" else None
+            full = np.load(self.paths["full"], mmap_mode="r") if meta.get("rescore") else None
+            ivf = None
+            if meta.get("ivf_lists"):
+                with np.load(self.paths["ivf"]) as f:
+                    ivf = (f["centroids"], f["list_offsets"])
+        except (OSError, ValueError, KeyError):
+            return
+        n_cols = meta.get("pq_subspaces") if meta.get("dtype") == "pq" else meta.get("dim")
+        if vectors.shape != (meta.get("n_rows"), n_cols) or len(rows) != len(vectors):
+            return  # 쓰는 도중이면 다음 호출 때 다시 시도
+        if full is not None and full.shape != (meta["n_rows"], meta["full_dim"]):
+            return
+        self.meta, self.vectors, self.rows, self.scales, self.ivf = meta, vectors, rows, scales, ivf
+        self.codebooks, self.full = codebooks, full
+        n_rows = meta["n_rows"]
+        self._category_masks = {
+            nt: np.unpackbits(masks[i], count=n_rows).astype(bool)
+            for i, nt in enumerate(meta["notice_types"])
+        }
+        self._meta_mtime = mtime
+
+    # ---------------- 검색 ---------------- #
+
+    def _candidate_rows(self, query, notice_type=None, allowed_ids=None):
+        """검색할 행 번호 (None이면 전체). IVF → 카테고리 비트마스크 → 허용 parent 순서로 거름"""
+        mask = None
+        if notice_type is not None:
+            mask = self._category_masks.get(notice_type)
+            if mask is None:
+                return np.empty(0, dtype=np.int64)
+        if allowed_ids is not None:
+            allowed = np.isin(self.rows["parent_id"], np.asarray(list(allowed_ids), dtype="S40"))
+            mask = allowed if mask is None else (mask & allowed)
+
+        if self.ivf is None:
+            return None if mask is None else np.flatnonzero(mask)
+
+        centroids, list_offsets = self.ivf
+        n_probe = min(self.n_probe, len(centroids))
+        probe = np.argpartition(-(centroids @ query), n_probe - 1)[:n_probe]
+        rows = np.concatenate([np.arange(list_offsets[i], list_offsets[i + 1]) for i in np.sort(probe)])
+        return rows if mask is None else rows[mask[rows]]
+
+    def _score_block(self, block_rows, query, lookup_table=None):
+        """block_rows: slice(연속 구간, 메모리 맵 그대로) 또는 행 번호 배열"""
+        if lookup_table is not None:
+            return pq_scores(self.vectors[block_rows], lookup_table)
+        sims = np.asarray(self.vectors[block_rows], dtype=np.float32) @ query
+        if self.scales is not None:
+            sims *= self.scales[block_rows]
+        return sims
+
+    def search(self, query_embedding, k: int = 100, notice_type: str = None, allowed_ids=None):
+        """
+        반환: [(parent_id, distance), ...] child 단위, 거리 오름차순 (distance = 2 - 2·cos)
+        - rescore 인덱스면 압축 점수로 k x RESCORE_FACTOR개를 뽑은 뒤 원본 float16 벡터로 다시 정렬
+        """
+        self.refresh()
+        if not self.available or k <= 0:
+            return []
+        full_query = _normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+        query = truncate_dims(full_query, self.meta["dim"])
+        lookup_table = pq_lookup_table(query, self.codebooks) if self.codebooks is not None else None
+        final_k = k
+        if self.full is not None:
+            k = k * RESCORE_FACTOR
+
+        candidates = self._candidate_rows(query, notice_type, allowed_ids)
+        n = self.meta["n_rows"] if candidates is None else len(candidates)
+        if n == 0:
+            return []
+
+        best_rows, best_sims = [], []
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            if candidates is None:
+                block_rows = np.arange(start, min(start + SEARCH_BLOCK_ROWS, n))
+                sims = self._score_block(slice(start, start + len(block_rows)), query, lookup_table)
+            else:
+                block_rows = candidates[start:start + SEARCH_BLOCK_ROWS]
+                sims = self._score_block(block_rows, query, lookup_table)
+            if len(sims) > k:
+                top = np.argpartition(-sims, k - 1)[:k]
+                block_rows, sims = block_rows[top], sims[top]
+            best_rows.append(block_rows)
+            best_sims.append(sims)
+
+        rows = np.concatenate(best_rows)
+        sims = np.concatenate(best_sims)
+        if len(sims) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            rows, sims = rows[top], sims[top]
+
+        return self._finalize(rows, sims, full_query, final_k)
+
+    def _finalize(self, rows, sims, full_query, final_k):
+        """후보 행 → (rescore) → 거리 오름차순 [(parent_id, distance), ...]"""
+        # rescore: 후보 행만 원본 벡터를 읽어 정확한 코사인으로 다시 계산
+        if self.full is not None:
+            read_order = np.argsort(rows)  # 디스크를 순서대로 읽도록
+            rows = rows[read_order]
+            sims = np.asarray(self.full[rows], dtype=np.float32) @ full_query
+            if len(sims) > final_k:
+                top = np.argpartition(-sims, final_k - 1)[:final_k]
+                rows, sims = rows[top], sims[top]
+        order = np.argsort(-sims, kind="stable")
+        parent_ids = self.rows["parent_id"][rows[order]]
+        return [(pid.decode("ascii"), float(2.0 - 2.0 * s)) for pid, s in zip(parent_ids, sims[order])]
+
+    def search_batch(self, query_embeddings, k: int = 100, notice_type: str = None):
+        """
+        여러 질문을 한 번에 검색 (결과는 질문별 search와 동일)
+        - brute-force 인덱스: 블록마다 (행 x 질문) 행렬곱 한 번 → 메모리 맵 블록을 질문 수만큼 다시 읽지 않음
+        - IVF / pq는 질문마다 후보 리스트/룩업 테이블이 달라서 질문별 search
+        """
+        self.refresh()
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if not self.available or k <= 0 or len(queries) == 0:
+            return [[] for _ in range(len(queries))]
+        if self.ivf is not None or self.codebooks is not None or len(queries) == 1:
+            return [self.search(q, k, notice_type) for q in queries]
+
+        full_queries = _normalize(queries)
+        query_matrix = truncate_dims(full_queries, self.meta["dim"]).T     # (D, B)
+        final_k = k
+        if self.full is not None:
+            k = k * RESCORE_FACTOR
+
+        candidates = self._candidate_rows(None, notice_type)
+        n = self.meta["n_rows"] if candidates is None else len(candidates)
+        if n == 0:
+            return [[] for _ in range(len(queries))]
+
+        best_rows = [[] for _ in range(len(queries))]
+        best_sims = [[] for _ in range(len(queries))]
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            if candidates is None:
+                block_rows = np.arange(start, min(start + SEARCH_BLOCK_ROWS, n))
+                block = self.vectors[start:start + len(block_rows)]
+            else:
+                block_rows = candidates[start:start + SEARCH_BLOCK_ROWS]
+                block = self.vectors[block_rows]
+            sims = np.asarray(block, dtype=np.float32) @ query_matrix          # (n_block, B)
+            if self.scales is not None:
+                sims *= np.asarray(self.scales[block_rows], dtype=np.float32)[:, None]
+            for j in range(sims.shape[1]):
+                col = sims[:, j]
+                if len(col) > k:
+                    top = np.argpartition(-col, k - 1)[:k]
+                    best_rows[j].append(block_rows[top])
+                    best_sims[j].append(col[top])
+                else:
+                    best_rows[j].append(block_rows)
+                    best_sims[j].append(col)
+
+        results = []
+        for j in range(len(queries)):
+            rows = np.concatenate(best_rows[j])
+            sims = np.concatenate(best_sims[j])
+            if len(sims) > k:
+                top = np.argpartition(-sims, k - 1)[:k]
+                rows, sims = rows[top], sims[top]
+            results.append(self._finalize(rows, sims, full_queries[j], final_k))
+        return results
+
+
+def chroma_search_batch(vectorstore, query_embeddings, k: int = 100, filter: dict = None):
+    """
+    서빙 인덱스가 없을 때: Chroma 컬렉션에 여러 질문 벡터를 한 번에 질의
+    - 반환: 질문별 [(child Document, distance)] (similarity_search_by_vector_with_relevance_scores와 동일)
+    - langchain Chroma에는 벡터 여러 개를 받는 공개 API가 없어 vectorstore._collection.query를 직접 호출
+      (검색 경로에서 컬렉션을 직접 질의하는 곳은 여기뿐, 내보내기/샤드 복사 등 구축 단계는 별도)
+    """
+    from langchain_core.documents import Document
+
+    query_embeddings = [list(map(float, q)) for q in query_embeddings]
+    if not query_embeddings or k <= 0:
+        return [[] for _ in query_embeddings]
+    results = vectorstore._collection.query(
+        query_embeddings=query_embeddings,
+        n_results=k,
+        where=filter or None,
+        include=["documents", "metadatas", "distances"],
+    )
+    return [
+        [
+            (Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+            for doc_id, text, metadata, distance in zip(
+                results["ids"][j], results["documents"][j], results["metadatas"][j], results["distances"][j]
+            )
+        ]
+        for j in range(len(query_embeddings))
+    ]
+
+
+# ---------------- CLI: 내보내기 / 벤치마크 ---------------- #
+
+def _bench(k: int, repeat: int):
+    """현재 Chroma 경로 vs 서빙 인덱스: 질의 지연시간(p50/p95)과 parent 겹침 비율"""
+    from rag_core.components import load_retriever, INDEX_MANIFEST_PATH
+    from rag_core.quick_answers import QUICK_QUESTIONS
+    from build_vector_db.index_manifest import IndexVersionWatcher
+
+    retriever = load_retriever()
+    vectorstore = retriever.vectorstore
+    index = ServingIndex(version_watcher=IndexVersionWatcher(INDEX_MANIFEST_PATH))
+    if not index.usable:
+        print("❌ 서빙 인덱스가 없거나 현재 인덱스 버전과 다릅니다. --export를 먼저 실행해주세요.")
+        return
+
+    queries = [(cat, q) for cat, qs in QUICK_QUESTIONS.items() for q in qs]
+    # 질의 임베딩은 캐시에 미리 올려 두고 검색 시간만 비교
+    embeddings = {q: vectorstore.embeddings.embed_query(q) for _, q in queries}
+
+    chroma_ms, serving_ms, overlaps = [], [], []
+    for category, question in queries:
+        notice_type = None if category == "전체" else category
+        chroma_filter = {"notice_type": notice_type} if notice_type else None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            chroma_hits = vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embeddings[question], k=k, filter=chroma_filter
+            )
+            chroma_ms.append((time.perf_counter() - t0) * 1000)
+
+            t0 = time.perf_counter()
+            serving_hits = index.search(embeddings[question], k=k, notice_type=notice_type)
+            serving_ms.append((time.perf_counter() - t0) * 1000)
+
+        chroma_parents = {d.metadata.get("doc_id") for d, _ in chroma_hits}
+        serving_parents = {pid for pid, _ in serving_hits}
+        overlaps.append(len(chroma_parents & serving_parents) / max(1, len(chroma_parents)))
+
+    meta = index.meta
+    print(f"📊 k={k}, 질의 {len(queries)}개 x {repeat}회 | 행 {meta['n_rows']:,}개, "
+          f"{meta['dtype']} {meta['dim']}차원, rescore={meta.get('rescore', False)}, IVF lists={meta['ivf_lists']}")
+    for label, ms in (("Chroma", chroma_ms), ("Serving", serving_ms)):
+        print(f"   {label:8s} p50 {np.percentile(ms, 50):7.2f}ms | p95 {np.percentile(ms, 95):7.2f}ms")
+    print(f"   parent 겹침 비율 (Chroma 대비): {np.mean(overlaps):.1%}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="메모리 맵 서빙 인덱스 내보내기/벤치마크")
+    parser.add_argument("--export", action="store_true", help="Chroma 컬렉션 → 서빙 인덱스")
+    parser.add_argument("--dtype", choices=SERVING_DTYPES, default="float16")
+    parser.add_argument("--ivf-lists", type=int, default=None, help="IVF 리스트 수 (0: brute-force)")
+    parser.add_argument("--truncate-dim", type=int, default=None, help="Matryoshka 차원 축소 (예: 1024)")
+    parser.add_argument("--pq-subspaces", type=int, default=PQ_DEFAULT_SUBSPACES)
+    parser.add_argument("--no-rescore", action="store_true", help="원본 벡터 rescore 파일을 만들지 않음")
+    parser.add_argument("--bench", action="store_true", help="Chroma 경로와 지연시간/겹침 비교")
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.export:
+        from rag_core.components import load_retriever, INDEX_MANIFEST_PATH
+        from build_vector_db.index_manifest import read_build_version
+
+        collection = load_retriever().vectorstore._collection
+        meta = export_serving_index(
+            collection, read_build_version(str(INDEX_MANIFEST_PATH)), args.dtype, args.ivf_lists,
+            truncate_dim=args.truncate_dim, pq_subspaces=args.pq_subspaces,
+            rescore=False if args.no_rescore else None
+        )
+        resident, full = index_nbytes()
+        print(f"✅ 서빙 인덱스 저장 완료: 행 {meta['n_rows']:,}개, {meta['dim']}차원, "
+              f"{meta['dtype']}, IVF lists={meta['ivf_lists']}")
+        print(f"   상주 {resident / 1024 ** 2:.1f}MB (행당 {resident / meta['n_rows']:.0f}B) | "
+              f"rescore 원본 {full / 1024 ** 2:.1f}MB")
+    if args.bench:
+        _bench(args.k, args.repeat)
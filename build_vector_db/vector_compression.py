@@ -0,0 +1,82 @@
+"""
+임베딩 압축 (서빙 인덱스용, NumPy만 사용)
+- Matryoshka 차원 축소: text-embedding-3 계열은 앞쪽 차원만 잘라 다시 정규화해도 품질이 크게 유지됨
+- Product Quantization(PQ): D차원을 M개 부분공간으로 나누고 각 부분공간을 256개 중심 중 하나(uint8)로 부호화
+    3072차원 float32(12KB) → M=96이면 96바이트
+    검색은 질의-중심 내적 표(M x 256)를 만든 뒤 code로 조회해 합산 (ADC)
+- 압축 점수로 후보를 넉넉히 뽑고 원본(float16) 벡터로 다시 점수 계산하는 것은 serving_index.py에서 처리
+"""
+
+import numpy as np
+
+PQ_CENTROIDS = 256          # uint8 code
+PQ_DEFAULT_SUBSPACES = 96   # 3072 / 96 = 부분공간당 32차원
+PQ_TRAIN_ITERS = 15
+
+
+def truncate_dims(block, dim: int = None):
+    """Matryoshka 차원 축소: 앞쪽 dim개 차원만 남기고 다시 L2 정규화"""
+    block = np.asarray(block, dtype=np.float32)
+    if dim is None or dim >= block.shape[-1]:
+        return block
+    block = block[..., :dim]
+    norms = np.linalg.norm(block, axis=-1, keepdims=True)
+    return block / np.maximum(norms, 1e-12)
+
+
+def _nearest_centroid(x, centroids):
+    """유클리드 거리 기준 가장 가까운 중심 (||c||² - 2x·c 최소)"""
+    return np.argmin((centroids * centroids).sum(axis=1)[None, :] - 2.0 * (x @ centroids.T), axis=1)
+
+
+def _kmeans(x, n_centroids, iters, rng):
+    centroids = x[rng.choice(len(x), n_centroids, replace=len(x) < n_centroids)].copy()
+    for _ in range(iters):
+        assign = _nearest_centroid(x, centroids)
+        counts = np.bincount(assign, minlength=n_centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # 빈 중심은 임의 샘플로 다시 시작
+        n_empty = int((~filled).sum())
+        if n_empty:
+            centroids[~filled] = x[rng.choice(len(x), n_empty, replace=len(x) < n_empty)]
+    return centroids
+
+
+def train_pq(sample, n_subspaces: int = PQ_DEFAULT_SUBSPACES, n_centroids: int = PQ_CENTROIDS,
+             iters: int = PQ_TRAIN_ITERS, seed: int = 0):
+    """샘플 (S, D) → 코드북 (M, n_centroids, D/M) float32"""
+    sample = np.asarray(sample, dtype=np.float32)
+    dim = sample.shape[1]
+    if dim % n_subspaces:
+        raise ValueError(f"차원({dim})이 부분공간 수({n_subspaces})로 나누어떨어지지 않습니다.")
+    sub_dim = dim // n_subspaces
+    rng = np.random.default_rng(seed)
+    return np.stack([
+        _kmeans(sample[:, m * sub_dim:(m + 1) * sub_dim], n_centroids, iters, rng)
+        for m in range(n_subspaces)
+    ]).astype(np.float32)
+
+
+def pq_encode(block, codebooks):
+    """(B, D) float → (B, M) uint8 code"""
+    block = np.asarray(block, dtype=np.float32)
+    n_subspaces, _, sub_dim = codebooks.shape
+    codes = np.empty((len(block), n_subspaces), dtype=np.uint8)
+    for m in range(n_subspaces):
+        codes[:, m] = _nearest_centroid(block[:, m * sub_dim:(m + 1) * sub_dim], codebooks[m])
+    return codes
+
+
+def pq_lookup_table(query, codebooks):
+    """질의 (D,) → 부분공간별 중심과의 내적 표 (M, n_centroids)"""
+    n_subspaces, _, sub_dim = codebooks.shape
+    return np.einsum("mcd,md->mc", codebooks, np.asarray(query, dtype=np.float32).reshape(n_subspaces, sub_dim))
+
+
+def pq_scores(codes, lookup_table):
+    """(B, M) code + 내적 표 → 근사 내적 (B,)"""
+    codes = np.asarray(codes)
+    return lookup_table[np.arange(codes.shape[1])[None, :], codes].sum(axis=1)
@@ -0,0 +1,310 @@
+"""
+비동기 크롤링 엔진 (asyncio + aiohttp)
+- 모든 게시판을 동시에 순회하면서 결과를 도착하는 대로 흘려보냄 (stream)
+- 커넥션 풀 하나를 공유 (전체 동시 요청 수 제한)
+- 호스트별 동시 요청 수 + 요청 간 최소 간격(서버 예의) 제한 → 학과 사이트 20여 개를 병렬로 돌려도 한 서버에 몰리지 않음
+- 파싱은 HongikCrawler의 목록/상세 파서를 그대로 받아서 스레드에서 실행 (이벤트 루프 블로킹 방지)
+- URL만 바꾸면 로컬 HTTP 서버(픽스처)로도 그대로 동작
+- state(CrawlState)를 주면 증분 크롤링: watermark에서 목록 순회 중단 + 조건부 GET + 새 글/바뀐 글만 내보냄
+  (상태는 보류만 함 → 호출한 쪽이 결과를 저장한 뒤 state.commit())
+
+사용:
+    async with AsyncCrawlEngine(headers) as engine:
+        async for board_key, item in engine.stream(boards):
+            ...
+"""
+
+import time
+import random
+import asyncio
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import aiohttp
+
+GLOBAL_CONCURRENCY = 16        # 전체 동시 요청 수 (커넥션 풀 크기)
+PER_HOST_CONCURRENCY = 4       # 호스트별 동시 요청 수
+PER_HOST_DELAY = 0.2           # 같은 호스트 요청 시작 간 최소 간격(초)
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+READ_CHUNK_BYTES = 64 * 1024   # max_bytes 제한이 있는 본문을 읽는 단위
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: str = ""
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+    too_large: bool = False    # max_bytes 초과로 받다가 중단
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+@dataclass
+class PostTask:
+    """목록 페이지에서 찾은 게시글 하나 (상세 페이지 요청 대상)"""
+    url: str
+    title: str
+    date: object
+    post_no: int = None
+
+
+@dataclass
+class ListPage:
+    """목록 페이지 파싱 결과"""
+    tasks: list
+    next_url: str = None       # 다음 목록 페이지 (없으면 None)
+    keep_going: bool = True    # False면 이 게시판 순회 종료 (날짜 범위를 벗어남 등)
+
+
+@dataclass
+class Board:
+    """
+    순회할 게시판 하나
+    - parse_list(html, page_url, page_no) -> ListPage
+    - parse_detail(html, task) -> item dict 또는 None
+    """
+    key: str
+    start_url: str
+    parse_list: object
+    parse_detail: object
+
+
+class _HostLimiter:
+    """호스트별 동시 요청 수 + 요청 시작 간 최소 간격"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._delay = delay
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        async with self._lock:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self._delay
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+class AsyncCrawlEngine:
+
+    def __init__(
+        self,
+        headers: dict = None,
+        global_concurrency: int = GLOBAL_CONCURRENCY,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        per_host_delay: float = PER_HOST_DELAY,
+        timeout: float = REQUEST_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        verify_ssl: bool = False,   # 학과 사이트 일부 인증서 문제 (기존 verify=False와 동일)
+        state=None,                 # CrawlState (None이면 매번 전체 크롤링)
+    ):
+        self.headers = headers or {}
+        self.global_concurrency = global_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.verify_ssl = verify_ssl
+        self.state = state
+        self._session = None
+        self._hosts = {}
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "not_modified": 0, "unchanged": 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.global_concurrency,
+            limit_per_host=self.per_host_concurrency,
+            ssl=None if self.verify_ssl else False,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    def _limiter(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostLimiter(self.per_host_concurrency, self.per_host_delay)
+        return self._hosts[host]
+
+    # ---------------- 요청 ---------------- #
+
+    async def fetch(self, url: str, headers: dict = None, binary: bool = False, max_bytes: int = None):
+        """
+        GET 요청 (호스트 제한 + 재시도)
+        - max_bytes: 본문이 이보다 크면 받다가 중단하고 too_large=True로 반환 (첨부파일용)
+        - 반환: FetchResult (4xx/304 포함) 또는 None (재시도 후에도 연결 실패/5xx)
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._limiter(url):
+                    self.stats["requests"] += 1
+                    async with self._session.get(url, headers=headers) as resp:
+                        if resp.status >= 500:
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history, status=resp.status
+                            )
+                        if max_bytes is not None:
+                            if (resp.content_length or 0) > max_bytes:
+                                return FetchResult(url=str(resp.url), status=resp.status, too_large=True)
+                            # content.read(n)는 그 순간 버퍼에 있는 만큼만 반환 → EOF까지 조각 단위로 읽음
+                            chunks, size = [], 0
+                            async for chunk in resp.content.iter_chunked(READ_CHUNK_BYTES):
+                                size += len(chunk)
+                                if size > max_bytes:
+                                    return FetchResult(url=str(resp.url), status=resp.status, too_large=True)
+                                chunks.append(chunk)
+                            body = b"".join(chunks)
+                        else:
+                            body = await resp.read()
+                        text = "" if binary else body.decode(resp.get_encoding() or "utf-8", errors="replace")
+                        return FetchResult(
+                            url=str(resp.url),
+                            status=resp.status,
+                            text=text,
+                            headers=dict(resp.headers),
+                            body=body if binary else b"",
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError) as e:
+                # RuntimeError: 인코딩 추정 실패(get_encoding) 등
+                if attempt >= self.max_retries:
+                    self.stats["errors"] += 1
+                    print(f"[에러] 요청 실패: {url}, error={e!r}")
+                    return None
+                self.stats["retries"] += 1
+                await asyncio.sleep(BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE))
+
+    # ---------------- 게시판 순회 ---------------- #
+
+    async def _fetch_detail(self, board: Board, task: PostTask):
+        """반환: (status, item) - status는 ok / unchanged(304 또는 내용 동일) / failed"""
+        headers = self.state.conditional_headers(task.url) if self.state else None
+        result = await self.fetch(task.url, headers=headers)
+        if result is not None and result.status == 304:
+            self.stats["not_modified"] += 1
+            self.state.touch(task.url)
+            return "unchanged", None
+        if result is None or not result.ok:
+            return "failed", None
+        try:
+            item = await asyncio.to_thread(board.parse_detail, result.text, task)
+        except Exception as e:
+            print(f"[에러] 상세 페이지 파싱 실패: {task.url}, error={e}")
+            return "failed", None
+        if item is None:
+            return "failed", None
+        if self.state and not self.state.record(board.key, task.url, task.post_no, item, result.headers):
+            self.stats["unchanged"] += 1
+            return "unchanged", None
+        return "ok", item
+
+    def _cut_at_watermark(self, page: ListPage, watermark):
+        """
+        watermark 이하 post_no가 나오면 그 글부터는 이미 수집한 글 → 순회 중단
+        - post_no가 없는 글(상단 고정 공지)은 조건부 GET으로 계속 확인
+        """
+        if watermark is None:
+            return page
+        tasks = [t for t in page.tasks if t.post_no is None or t.post_no > watermark]
+        if len(tasks) < len(page.tasks):
+            return ListPage(tasks, next_url=None, keep_going=False)
+        return page
+
+    async def walk_board(self, board: Board):
+        """
+        게시판 하나를 목록 페이지 순서대로 순회하며 상세 결과를 도착하는 대로 yield
+        - 상세 요청을 보내는 동안 다음 목록 페이지도 미리 요청 (파이프라이닝)
+        - 증분 모드: 끝까지 실패 없이 순회했을 때만 watermark 갱신
+        """
+        watermark = self.state.watermark(board.key) if self.state else None
+        max_post_no = watermark
+        requested = set()
+        completed = True
+
+        visited = set()
+        page_no = 1
+        next_page = asyncio.ensure_future(self.fetch(board.start_url))
+        page_url = board.start_url
+
+        while next_page is not None:
+            visited.add(page_url)
+            result = await next_page
+            next_page = None
+            if result is None or not result.ok:
+                if result is not None:
+                    print(f"[에러] 목록 페이지 status={result.status}: {page_url}")
+                completed = False
+                break
+
+            page = await asyncio.to_thread(board.parse_list, result.text, page_url, page_no)
+            page = self._cut_at_watermark(page, watermark)
+
+            if page.keep_going and page.next_url and page.next_url not in visited:
+                page_url = page.next_url
+                page_no += 1
+                next_page = asyncio.ensure_future(self.fetch(page_url))
+
+            tasks = page.tasks
+            if self.state:
+                # 상단 고정 공지는 페이지마다 반복됨 → 한 번만 확인
+                tasks = [t for t in tasks if t.url not in requested]
+                requested.update(t.url for t in tasks)
+            for task in tasks:
+                if task.post_no is not None:
+                    max_post_no = max(max_post_no or 0, task.post_no)
+
+            details = [asyncio.ensure_future(self._fetch_detail(board, task)) for task in tasks]
+            for done in asyncio.as_completed(details):
+                status, item = await done
+                if status == "failed":
+                    completed = False
+                elif item is not None:
+                    yield item
+
+        if self.state and completed:
+            self.state.complete_board(board.key, max_post_no)
+
+    async def stream(self, boards):
+        """모든 게시판을 동시에 순회 → (board.key, item)을 도착 순서대로 yield"""
+        queue = asyncio.Queue()
+        done_marker = object()
+
+        async def pump(board):
+            try:
+                async for item in self.walk_board(board):
+                    await queue.put((board.key, item))
+            except Exception as e:
+                print(f"[에러] 게시판 크롤링 실패: {board.key}, error={e!r}")
+            finally:
+                await queue.put((board.key, done_marker))
+
+        workers = [asyncio.ensure_future(pump(board)) for board in boards]
+        remaining = len(workers)
+        try:
+            while remaining:
+                key, item = await queue.get()
+                if item is done_marker:
+                    remaining -= 1
+                    continue
+                yield key, item
+        finally:
+            for w in workers:
+                w.cancel()
@@ -0,0 +1,227 @@
+"""
+첨부파일 처리 단계 (게시판 크롤링이 끝난 뒤 실행)
+- 다운로드: 비동기 엔진(async_engine.py)의 호스트별 동시성/간격 제한을 그대로 사용 (크기 제한 초과 시 중단)
+- PDF 텍스트 추출: PyPDF2는 CPU 작업 → ProcessPoolExecutor (크롤링/이벤트 루프를 막지 않음)
+    다운로드가 끝나는 대로 추출 작업을 넣어서 다운로드와 추출이 겹쳐서 진행
+- 캐시(attachment_cache.db):
+    URL 적중 → 다운로드 생략 / 내용 해시 적중(같은 파일이 다른 URL로 재게시) → 추출 생략
+- 추출 결과는 게시글 item["content"] 뒤에 "[첨부파일: 이름]" 구간으로 붙임
+  → 전처리(json_to_csv) / 벡터DB 구축이 별도 수정 없이 첨부 내용까지 색인
+  첨부 dict에는 text_status / pages / content_hash만 기록 (본문 중복 저장 X)
+  text_status가 있는 첨부는 다시 처리하지 않음 (같은 결과 파일에 재실행해도 본문에 중복으로 붙지 않음)
+  단, 다운로드/추출 실패는 캐시에 남기지 않고 다음 실행에서 다시 시도 (URL 캐시에는 성공 결과와 too_large만)
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import asyncio
+import threading
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+ATTACHMENT_CACHE_PATH = Path(__file__).resolve().parent / "attachment_cache.db"
+MAX_ATTACHMENT_BYTES = 20 * 1024 ** 2   # 20MB 넘는 파일은 받지 않음
+MAX_PDF_PAGES = 30                      # 앞쪽 30페이지까지만 추출
+MAX_TEXT_CHARS = 20000                  # 첨부 하나당 본문에 붙이는 최대 글자 수
+PDF_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+EXTRACTABLE_EXTS = (".pdf",)            # hwp 등은 별도 라이브러리 필요 → 이름만 유지
+
+
+def extract_pdf_text(pdf_bytes, max_pages: int = MAX_PDF_PAGES):
+    """
+    PDF bytes → (텍스트, 전체 페이지 수, status)
+    - 프로세스 풀에서 실행되므로 모듈 최상위 함수 (pickle 가능)
+    """
+    try:
+        reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
+        n_pages = len(reader.pages)
+        texts = []
+        for page in reader.pages[:max_pages]:
+            texts.append(page.extract_text() or "")
+        text = "\n".join(texts).strip()
+        if not text:
+            return "", n_pages, "empty"
+        return text, n_pages, "ok" if n_pages <= max_pages else "truncated"
+    except Exception:
+        return "", 0, "failed"
+
+
+class AttachmentCache:
+    """첨부파일 추출 결과 캐시 (url → content_hash → 텍스트)"""
+
+    def __init__(self, path=ATTACHMENT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS texts (
+                content_hash TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                pages INTEGER,
+                status TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                status TEXT NOT NULL,
+                fetched_at REAL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def by_url(self, url):
+        """반환: {"content_hash", "text", "pages", "status"} 또는 None"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT u.content_hash, t.text, t.pages, COALESCE(t.status, u.status)
+                FROM urls u LEFT JOIN texts t ON t.content_hash = u.content_hash
+                WHERE u.url = ?
+                """,
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content_hash": row[0], "text": row[1] or "", "pages": row[2], "status": row[3]}
+
+    def by_hash(self, content_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, pages, status FROM texts WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content_hash": content_hash, "text": row[0], "pages": row[1], "status": row[2]}
+
+    def put(self, url, content_hash=None, text="", pages=None, status="ok"):
+        with self._lock:
+            if content_hash is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO texts (content_hash, text, pages, status) VALUES (?, ?, ?, ?)",
+                    (content_hash, text, pages, status),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO urls (url, content_hash, status, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, content_hash, status, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _is_extractable(att) -> bool:
+    name = str(att.get("name") or "").lower()
+    return bool(att.get("url")) and name.endswith(EXTRACTABLE_EXTS)
+
+
+async def _resolve(engine, cache, url, pool, max_bytes, max_pages, stats):
+    """URL 하나 → 캐시 결과 (없으면 다운로드 + 추출 후 캐시)"""
+    cached = cache.by_url(url)
+    if cached is not None and cached["status"] != "failed":   # 이전 버전이 남긴 실패 결과는 무시
+        stats["url_hits"] += 1
+        return cached
+
+    result = await engine.fetch(url, binary=True, max_bytes=max_bytes)
+    if result is None or not result.ok:
+        # 일시적 실패는 캐시하지 않음 (다음 실행에서 재시도)
+        stats["failed"] += 1
+        return {"content_hash": None, "text": "", "pages": None, "status": "download_failed"}
+    if result.too_large:
+        stats["too_large"] += 1
+        cache.put(url, status="too_large")
+        return {"content_hash": None, "text": "", "pages": None, "status": "too_large"}
+
+    stats["downloaded"] += 1
+    content_hash = hashlib.sha1(result.body).hexdigest()
+    cached = cache.by_hash(content_hash)
+    if cached is not None and cached["status"] != "failed":
+        stats["hash_hits"] += 1
+        cache.put(url, content_hash, cached["text"], cached["pages"], cached["status"])
+        return cached
+
+    loop = asyncio.get_running_loop()
+    text, pages, status = await loop.run_in_executor(pool, extract_pdf_text, result.body, max_pages)
+    stats["extracted"] += 1
+    if status == "failed":
+        # 추출 실패는 캐시하지 않음 (다음 실행에서 다시 받아서 재시도)
+        stats["failed"] += 1
+        return {"content_hash": content_hash, "text": "", "pages": None, "status": status}
+    cache.put(url, content_hash, text, pages, status)
+    return {"content_hash": content_hash, "text": text, "pages": pages, "status": status}
+
+
+async def _resolve_all(engine, cache, urls, max_bytes, max_pages, workers, stats):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        resolved = await asyncio.gather(*[
+            _resolve(engine, cache, url, pool, max_bytes, max_pages, stats) for url in urls
+        ])
+    return dict(zip(urls, resolved))
+
+
+def process_attachments(
+    items,
+    engine,
+    cache_path=ATTACHMENT_CACHE_PATH,
+    max_bytes: int = MAX_ATTACHMENT_BYTES,
+    max_pages: int = MAX_PDF_PAGES,
+    max_chars: int = MAX_TEXT_CHARS,
+    workers: int = PDF_WORKERS,
+):
+    """
+    게시글 item 목록의 첨부파일(PDF) 텍스트를 추출해 item["content"]에 붙임 (in-place)
+    - engine: 아직 열지 않은 AsyncCrawlEngine (여기서 세션을 열고 닫음)
+    - 반환: 통계 dict
+    """
+    stats = {"attachments": 0, "url_hits": 0, "hash_hits": 0, "downloaded": 0,
+             "extracted": 0, "too_large": 0, "failed": 0}
+    pending = [
+        (item, att)
+        for item in items
+        for att in item.get("attachments") or []
+        if isinstance(att, dict) and _is_extractable(att)
+        and att.get("text_status") in (None, "download_failed", "failed")   # 이미 붙인 첨부는 건너뜀
+    ]
+    stats["attachments"] = len(pending)
+    if not pending:
+        return stats
+
+    urls = list(dict.fromkeys(att["url"] for _, att in pending))
+
+    cache = AttachmentCache(cache_path)
+
+    async def main():
+        async with engine:
+            return await _resolve_all(engine, cache, urls, max_bytes, max_pages, workers, stats)
+
+    t0 = time.perf_counter()
+    try:
+        resolved = asyncio.run(main())
+    finally:
+        cache.close()
+
+    for item, att in pending:
+        info = resolved[att["url"]]
+        att["text_status"] = info["status"]
+        att["pages"] = info["pages"]
+        att["content_hash"] = info["content_hash"]
+        if info["text"]:
+            section = info["text"][:max_chars]
+            item["content"] = f"{item.get('content') or ''}\n\n[첨부파일: {att.get('name', '')}]\n{section}".strip()
+
+    print(
+        f"[첨부] {stats['attachments']}개 (URL 캐시 {stats['url_hits']}, 해시 캐시 {stats['hash_hits']}, "
+        f"다운로드 {stats['downloaded']}, 추출 {stats['extracted']}, 용량 초과 {stats['too_large']}, "
+        f"실패 {stats['failed']}), {time.perf_counter() - t0:.1f}초"
+    )
+    return stats
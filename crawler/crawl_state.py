@@ -0,0 +1,228 @@
+"""
+증분 크롤링 상태 저장소 - SQLite 단일 파일 (crawl_state.db)
+- posts: 게시글 URL별 post_no / 내용 해시 / ETag / Last-Modified
+- boards: 게시판별 watermark (마지막으로 '끝까지' 순회한 시점의 최대 post_no)
+
+비동기 엔진(async_engine.py)이 사용:
+    1) 목록 순회: watermark 이하 post_no가 나오면 그 아래는 이미 수집한 글 → 순회 중단
+       (중간에 끊긴 크롤링은 watermark를 올리지 않으므로 다음 실행에서 끝까지 다시 내려감)
+    2) 상세 요청: 저장된 ETag/Last-Modified로 조건부 GET → 304면 건너뜀
+    3) 200이어도 내용 해시가 같으면 건너뜀 → 새 글/바뀐 글만 결과로 내보냄
+
+record() / complete_board()는 메모리에 보류만 하고, 결과 파일을 저장한 뒤 commit()으로 SQLite에 반영
+    → 저장 전에 죽거나 예외가 나도 다음 실행에서 그 글을 "바뀌지 않음"으로 건너뛰지 않음
+
+증분 결과(새 글/바뀐 글만)는 merge_snapshot_items / compact_jsonl_chunks로 이전 결과 파일에 합쳐서 저장
+    → 결과 파일은 항상 전체 스냅샷 (벡터DB 증분 구축이 "입력에 없는 글 = 삭제"로 판단하므로)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+CRAWL_STATE_PATH = Path(__file__).resolve().parent / "crawl_state.db"
+
+
+def item_hash(item: dict) -> str:
+    """게시글 item 내용 해시 (키 순서 무관)"""
+    payload = json.dumps(item, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def merge_snapshot_items(previous, delta):
+    """
+    이전 스냅샷 items + 이번 증분 결과 → 전체 스냅샷 items
+    - 같은 URL은 이번 결과로 교체, 이번에 다시 받지 않은 글은 이전 것 유지 (새 글이 앞)
+    """
+    delta = list(delta)
+    fresh = {item.get("url") for item in delta if item.get("url")}
+    return delta + [item for item in previous or [] if not item.get("url") or item["url"] not in fresh]
+
+
+def compact_jsonl_chunks(path, items_key="items"):
+    """
+    chunk JSONL({"chunk_meta": {...}, items_key: [...]}) 파일에서 같은 URL은 마지막(가장 최근에 붙인) 것만 남김
+    - 증분 모드는 바뀐 글을 파일 뒤에 이어 붙이므로, 앞쪽 chunk에 남은 이전 버전을 제거
+    - 비게 된 chunk는 삭제, 임시 파일에 쓴 뒤 교체
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    seen = set()
+    compacted = []
+    for record in reversed(records):
+        items = []
+        for item in reversed(record.get(items_key) or []):
+            url = item.get("url")
+            if url:
+                if url in seen:
+                    continue
+                seen.add(url)
+            items.append(item)
+        if items:
+            items.reverse()
+            record[items_key] = items
+            record.setdefault("chunk_meta", {})["count"] = len(items)
+            compacted.append(record)
+    compacted.reverse()
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for record in compacted:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+class CrawlState:
+
+    def __init__(self, path=CRAWL_STATE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                url TEXT PRIMARY KEY,
+                board TEXT NOT NULL,
+                post_no INTEGER,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                first_seen REAL,
+                last_checked REAL
+            );
+            CREATE TABLE IF NOT EXISTS boards (
+                board TEXT PRIMARY KEY,
+                watermark INTEGER,
+                completed_at REAL
+            );
+            """
+        )
+        self._conn.commit()
+        self._pending_posts = {}    # url -> posts 행 (commit 전)
+        self._pending_boards = {}   # board -> watermark (commit 전)
+
+    # ---------------- 게시판 ---------------- #
+
+    def watermark(self, board: str):
+        """마지막으로 끝까지 순회했을 때의 최대 post_no (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark FROM boards WHERE board = ?", (board,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def complete_board(self, board: str, max_post_no=None):
+        """게시판 순회가 끝까지 정상 종료됐을 때만 호출 → watermark 갱신 (commit()에서 반영)"""
+        with self._lock:
+            prev = self._pending_boards.get(board)
+            self._pending_boards[board] = max(prev or 0, max_post_no or 0) or None
+
+    # ---------------- 게시글 ---------------- #
+
+    def conditional_headers(self, url: str) -> dict:
+        """저장된 검증자로 조건부 GET 헤더 구성"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM posts WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def touch(self, url: str):
+        """304 Not Modified → 확인 시각만 갱신"""
+        with self._lock:
+            self._conn.execute("UPDATE posts SET last_checked = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def record(self, board: str, url: str, post_no, item: dict, response_headers: dict = None) -> bool:
+        """
+        상세 페이지 결과 기록 (commit() 전까지는 메모리에만)
+        - 반환: True면 새 글이거나 내용이 바뀐 글 (내보낼 대상)
+        """
+        response_headers = {k.lower(): v for k, v in (response_headers or {}).items()}
+        new_hash = item_hash(item)
+        now = time.time()
+        with self._lock:
+            pending = self._pending_posts.get(url)
+            if pending is not None:
+                old_hash = pending[3]
+            else:
+                row = self._conn.execute(
+                    "SELECT content_hash FROM posts WHERE url = ?", (url,)
+                ).fetchone()
+                old_hash = row[0] if row else None
+            self._pending_posts[url] = (
+                url, board, post_no, new_hash,
+                response_headers.get("etag"),
+                response_headers.get("last-modified"),
+                now, now,
+            )
+        return old_hash != new_hash
+
+    def commit(self, urls=None):
+        """
+        보류 중인 기록을 SQLite에 반영 (결과 파일에 저장한 뒤 호출)
+        - urls: 저장을 마친 글만 반영 (None이면 전부 + 게시판 watermark까지)
+        """
+        with self._lock:
+            if urls is None:
+                rows = list(self._pending_posts.values())
+                boards = list(self._pending_boards.items())
+                self._pending_posts.clear()
+                self._pending_boards.clear()
+            else:
+                rows = [self._pending_posts.pop(url) for url in urls if url in self._pending_posts]
+                boards = []
+            if not rows and not boards:
+                return
+            self._conn.executemany(
+                """
+                INSERT INTO posts (url, board, post_no, content_hash, etag, last_modified, first_seen, last_checked)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    board = excluded.board,
+                    post_no = COALESCE(excluded.post_no, post_no),
+                    content_hash = excluded.content_hash,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    last_checked = excluded.last_checked
+                """,
+                rows,
+            )
+            now = time.time()
+            self._conn.executemany(
+                """
+                INSERT INTO boards (board, watermark, completed_at) VALUES (?, ?, ?)
+                ON CONFLICT(board) DO UPDATE SET
+                    watermark = MAX(COALESCE(watermark, 0), COALESCE(excluded.watermark, 0)),
+                    completed_at = excluded.completed_at
+                """,
+                [(board, watermark, now) for board, watermark in boards],
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            n_posts = self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+            n_boards = self._conn.execute("SELECT COUNT(*) FROM boards").fetchone()[0]
+            n_pending = len(self._pending_posts)
+        return {"posts": n_posts, "boards": n_boards, "pending": n_pending}
+
+    def close(self):
+        """보류 중인 기록은 버림 (저장되지 않은 글은 다음 실행에서 다시 내보냄)"""
+        with self._lock:
+            self._conn.close()
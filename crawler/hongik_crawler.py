@@ -7,14 +7,12 @@
 
 from unicodedata import name
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Comment
 from datetime import datetime, timedelta
 import json
 import time
 import urllib3
 from urllib.parse import urljoin, urlparse, parse_qs
-import PyPDF2
-from io import BytesIO
 import re
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -25,15 +23,84 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+import sys
+import asyncio
+import threading
+from functools import partial
+
+# 스크립트로 실행해도(python crawler/hongik_crawler.py) 패키지 import 가능하도록
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from crawler.crawl_state import CrawlState, compact_jsonl_chunks, merge_snapshot_items
+from crawler.attachment_stage import extract_pdf_text, process_attachments
+from crawler.async_engine import (
+    GLOBAL_CONCURRENCY,
+    PER_HOST_CONCURRENCY,
+    PER_HOST_DELAY,
+    AsyncCrawlEngine,
+    Board,
+    ListPage,
+    PostTask,
+)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Selenium .text처럼 줄을 바꾸는 블록 요소 (span/strong/a 등 인라인 요소는 같은 줄에 이어 붙임)
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "figcaption", "figure",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "nav", "ol", "p", "pre",
+    "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+
+
+def _block_text(element):
+    """
+    BeautifulSoup 요소 → Selenium WebElement.text와 같은 모양의 텍스트
+    - 블록 요소 경계와 <br>에서만 줄바꿈, 인라인 요소의 텍스트는 한 줄로 이어 붙임
+    - 연속 공백은 한 칸으로, 빈 줄은 제거
+    """
+    lines, current = [], []
+
+    def newline():
+        text = re.sub(r"\s+", " ", "".join(current)).strip()
+        if text:
+            lines.append(text)
+        current.clear()
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, Comment):
+                    current.append(str(child))
+            elif child.name == "br":
+                newline()
+            elif child.name in ("script", "style", "template"):
+                continue
+            elif child.name in BLOCK_TAGS:
+                newline()
+                walk(child)
+                newline()
+            else:
+                walk(child)
+
+    walk(element)
+    newline()
+    return "\n".join(lines)
+
+
 class HongikCrawler:
     DATE_PATTERN = re.compile(r"\d{4}\.\d{2}\.\d{2}")
     ATTACH_EXTS = (".pdf", ".hwp", ".hwpx", ".doc", ".docx",
                    ".xls", ".xlsx", ".ppt", ".pptx", ".zip")
 
-    def __init__(self):
+    def __init__(self, state_path=None):
+        """
+        state_path: 증분 크롤링 상태 DB 경로 (예: CRAWL_STATE_PATH)
+            - None이면 매번 전체 기간을 다시 크롤링 (기존 동작)
+            - 지정하면 이미 수집한 글에서 목록 순회를 멈추고, 상세 페이지는 조건부 GET
+              → 게시판 크롤링 결과에는 새 글/바뀐 글만 포함
+                저장할 때 이전 결과 파일의 게시글과 합치므로 결과 파일은 항상 전체 스냅샷
+                (벡터DB 증분 구축은 입력에 없는 글을 삭제로 판단)
+        """
         self.session = requests.Session()
         self.headers = {
             "User-Agent": (
@@ -41,6 +108,15 @@ class HongikCrawler:
                 "AppleWebKit/537.36 (KHTML, like Gecko)"
             )
         }
+        # 게시판 크롤링(비동기 엔진) 동시성 설정
+        self.global_concurrency = GLOBAL_CONCURRENCY      # 전체 동시 요청 수
+        self.per_host_concurrency = PER_HOST_CONCURRENCY  # 같은 서버에 동시에 보내는 요청 수
+        self.per_host_delay = PER_HOST_DELAY              # 같은 서버 요청 간 최소 간격(초)
+        self.state = CrawlState(state_path) if state_path else None
+        # 게시판 크롤링 후 첨부파일(PDF) 텍스트 추출 단계 실행 여부
+        self.attachment_stage = True
+        # 개설과목: HTTP로 못 찾은 학과만 쓰는 headless Chrome 수
+        self.course_driver_pool = 3
 
     # ---------------- 공통 유틸 ---------------- #
 
@@ -56,6 +132,16 @@ class HongikCrawler:
                     return None
         return None
 
+    def _extract_post_no(self, tr):
+        """tr 안의 게시글 번호(td.b-num-box) → int (상단 고정 '공지' 등은 None)"""
+        num_td = tr.find("td", class_="b-num-box")
+        if not num_td:
+            return None
+        try:
+            return int(num_td.get_text(strip=True))
+        except ValueError:
+            return None
+
     def _extract_article_text(self, soup, title=None):
         """
         게시물 상세 페이지에서 타이틀/본문 텍스트 추출
@@ -115,7 +201,7 @@ class HongikCrawler:
     def _extract_attachments(self, soup, page_url):
         """
         상세 페이지에서 첨부파일 정보 추출
-        - 이름과 URL, (PDF인 경우 내용 텍스트)까지
+        - 이름과 URL (PDF 내용은 크롤링 후 _process_attachments에서 본문에 붙임)
         - .pdf 외 확장자는 URL만 저장 (hwp 해석은 별도 라이브러리가 필요해서 여기선 제외)
         """
         attachments = []
@@ -132,71 +218,99 @@ class HongikCrawler:
                 continue
 
             file_url = urljoin(page_url, href)
+            # PDF 내용 추출은 크롤링이 끝난 뒤 첨부파일 단계(attachment_stage.py)에서 처리
             attach = {"name": name, "url": file_url, "content": None}
-
-            # # PDF인 경우만 내용까지 추출 (PyPDF2 사용)
-            # if lower.endswith(".pdf"):
-            #     try:
-            #         resp = self.session.get(file_url, headers=self.headers)
-            #         if resp.ok:
-            #             attach["content"] = self.extract_pdf_text(resp.content)
-            #     except Exception:
-            #         attach["content"] = "PDF 내용 추출 실패"
-
             attachments.append(attach)
 
         return attachments
 
     def extract_pdf_text(self, pdf_bytes):
-        """PDF 파일에서 텍스트 추출"""
-        try:
-            pdf_file = BytesIO(pdf_bytes)
-            reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in reader.pages:
-                # PyPDF2의 extract_text는 버전에 따라 이름이 다를 수 있음
-                text += page.extract_text() or ""
-            return text.strip() or "PDF에 추출 가능한 텍스트가 없습니다."
-        except Exception:
+        """PDF 파일에서 텍스트 추출 (페이지 제한은 attachment_stage.MAX_PDF_PAGES)"""
+        text, _, status = extract_pdf_text(pdf_bytes)
+        if status == "failed":
             return "PDF 내용 추출 실패"
+        return text or "PDF에 추출 가능한 텍스트가 없습니다."
 
-    def _fetch_detail(self, post_url, title, post_date):
-        try:
-            resp = self.session.get(
-                post_url,
-                headers=self.headers,
-                timeout=5
-            )
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[에러] 상세 페이지 요청 실패(HTTP): {post_url}, error={e}")
+    def _process_attachments(self, items):
+        """크롤링이 끝난 item들의 첨부파일(PDF) 텍스트를 추출해 content에 붙임 (in-place)"""
+        if not self.attachment_stage:
             return None
+        return process_attachments(items, self._engine())
 
+    def _process_jsonl_attachments(self, save_path, start_offset):
+        """
+        이번 실행에서 save_path에 추가한 chunk들(start_offset 이후)에 첨부파일 단계를 적용해 다시 씀
+        - chunk는 크롤링 중에 바로 저장되므로, 첨부 처리는 크롤링이 끝난 뒤 파일 단위로 한 번에
+        """
+        if not self.attachment_stage or not save_path.exists():
+            return
+        with save_path.open("r+", encoding="utf-8") as f:
+            f.seek(start_offset)
+            records = [json.loads(line) for line in f if line.strip()]
+            if not records:
+                return
+            self._process_attachments([item for record in records for item in record["items"]])
+            f.seek(start_offset)
+            f.truncate()
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _parse_univ_detail(self, html, task):
+        """학사 공지 상세 페이지 HTML → item (비동기 엔진이 스레드에서 호출)"""
         try:
-            detail_soup = BeautifulSoup(resp.text, "lxml")
+            detail_soup = BeautifulSoup(html, "lxml")
 
-            real_title, body = self._extract_article_text(detail_soup, title)
-            attachments = self._extract_attachments(detail_soup, post_url)
+            real_title, body = self._extract_article_text(detail_soup, task.title)
+            attachments = self._extract_attachments(detail_soup, task.url)
         except Exception as e:
-            print(f"[에러] 상세 페이지 파싱 실패: {post_url}, error={e}")
-            real_title = title
+            print(f"[에러] 상세 페이지 파싱 실패: {task.url}, error={e}")
+            real_title = task.title
             body = ""
             attachments = []
 
-        if hasattr(post_date, "strftime"):
-            date_str = post_date.strftime("%Y.%m.%d")
+        if hasattr(task.date, "strftime"):
+            date_str = task.date.strftime("%Y.%m.%d")
         else:
-            date_str = str(post_date)
+            date_str = str(task.date)
 
         return {
-            "url": post_url,
+            "url": task.url,
             "title": real_title,
             "content": body,
             "date": date_str,
             "attachments": attachments,
+            "post_no": task.post_no,
         }
 
+    def _engine(self):
+        return AsyncCrawlEngine(
+            headers=self.headers,
+            global_concurrency=self.global_concurrency,
+            per_host_concurrency=self.per_host_concurrency,
+            per_host_delay=self.per_host_delay,
+            state=self.state,
+        )
 
+    def _run_boards(self, boards, on_item):
+        """
+        게시판들을 비동기 엔진으로 동시에 크롤링
+        - item이 도착할 때마다 on_item(board.key, item) 호출 (게시판 간 순서는 섞임)
+        """
+        async def main():
+            async with self._engine() as engine:
+                async for key, item in engine.stream(boards):
+                    on_item(key, item)
+                return engine.stats
+
+        t0 = time.perf_counter()
+        stats = asyncio.run(main())
+        print(
+            f"[엔진] 게시판 {len(boards)}개, 요청 {stats['requests']}회 "
+            f"(재시도 {stats['retries']}, 실패 {stats['errors']}), {time.perf_counter() - t0:.1f}초"
+        )
+        if self.state:
+            print(f"[증분] 304 {stats['not_modified']}건, 내용 동일 {stats['unchanged']}건 건너뜀")
+        return stats
 
     # ---------------- 1. CN 홍익 로그인 ---------------- #
 
@@ -234,159 +348,82 @@ class HongikCrawler:
     # ---------------- 2. 학사 공지사항 게시판 ---------------- #
 
 
-    def _crawl_single_board(self, base_url, from_date, to_date=None):
+    def _parse_univ_list(self, html, page_url, page_no, base_url, from_date, to_date=None):
         """
-        - base_url부터 시작해서
-        - b-paging-wrap 안의 '다음 페이지' 링크를 타고 계속 내려가면서
-        - from_date ~ to_date 사이의 글들만 상세 크롤링해서 item을 yield
+        학사 공지 목록 페이지 HTML → ListPage
+        - from_date ~ to_date 사이 글만 상세 요청 대상으로
+        - from_date 이상 글이 하나도 없으면 순회 종료
+        - b-paging-wrap 안의 '다음 페이지' 링크를 next_url로
         """
+        soup = BeautifulSoup(html, "lxml")
+        rows = soup.select("tbody tr") or soup.select("tr")
 
-        current_url = base_url
-        visited = set()
-
-        while True:
-            # 0) 무한루프 방지
-            if current_url in visited:
-                print(f"[중단] 이미 방문한 URL 재방문 감지: {current_url}")
-                break
-            visited.add(current_url)
-
-            # 1) 목록 페이지 요청
-            try:
-                resp = self.session.get(
-                    current_url,
-                    headers=self.headers,
-                    timeout=5
-                )
-            except Exception as e:
-                print(f"[에러] 목록 페이지 요청 실패: {current_url}, error={e}")
-                break
-
-            if not resp.ok:
-                print(f"[에러] 목록 페이지 status={resp.status_code}: {current_url}")
-                break
-
-            # 2) 파싱
-            soup = BeautifulSoup(resp.text, "lxml")
-            rows = soup.select("tbody tr") or soup.select("tr")
+        page_has_not_too_old_post = False   # from_date 이상 글이 있었는지
+        tasks = []
 
-            page_has_not_too_old_post = False   # from_date 이상 글이 있었는지
-            tasks = []                          # (post_url, title, post_date, post_no)
-
-            for tr in rows:
-                link_elem = tr.find("a")
-                if not link_elem:
-                    continue
-
-                # 게시글 번호 (있으면)
-                num_td = tr.find("td", class_="b-num-box")
-                post_no = None
-                if num_td:
-                    try:
-                        post_no = int(num_td.get_text(strip=True))
-                    except ValueError:
-                        post_no = None
-
-                # 날짜 추출
-                post_date = self._extract_date_from_row(tr)
-                if not post_date:
-                    continue
-
-                # post_date 타입 통일 (datetime → date, str이면 파싱)
-                if isinstance(post_date, datetime):
-                    post_date = post_date.date()
-                elif isinstance(post_date, str):
-                    # 예: "2025.11.29" 형태라면
-                    try:
-                        post_date = datetime.strptime(post_date, "%Y.%m.%d").date()
-                    except ValueError:
-                        # 형식이 다르면 그냥 건너뛴다
-                        continue
-
-                # ① from_date보다 옛날이면: 이번 범위에서는 필요 없음
-                if post_date < from_date:
-                    # 이 글은 너무 오래된 글 → 이번 범위에서는 스킵
-                    continue
-
-                # 여기까지 왔으면 적어도 from_date 이상인 글이라는 뜻
-                page_has_not_too_old_post = True
-
-                # ② to_date가 있고, 그보다 더 "최근"이면: 이번 범위가 아니라 더 최신범위에서 다룰 대상
-                if to_date is not None and post_date > to_date:
-                    continue
-
-                # ③ 실제 수집 대상 (from_date ~ to_date 사이)
-                title = link_elem.get_text(strip=True)
-                href = link_elem.get("href")
-                if not href:
-                    continue
-
-                post_url = urljoin(current_url, href)
-                tasks.append((post_url, title, post_date, post_no))
-
-            # 디버깅용: 이 페이지 요약
-            print(
-                f"[목록] url={current_url}, rows={len(rows)}, "
-                f"from_date이상존재={page_has_not_too_old_post}, "
-                f"수집대상글수={len(tasks)}"
-            )
+        for tr in rows:
+            link_elem = tr.find("a")
+            if not link_elem:
+                continue
 
-            # 3) 이 페이지에 from_date 이상인 글이 하나도 없으면
-            #    아래 페이지는 전부 더 옛날 글 → 더 볼 필요 없음
-            if not page_has_not_too_old_post:
-                print(f"[중단] {current_url} 이후로는 {from_date} 이전 글만 있음 → 종료")
-                break
+            # 게시글 번호 (있으면)
+            post_no = self._extract_post_no(tr)
 
-            # 4) 상세 페이지 병렬 요청
-            if tasks:
-                max_workers = getattr(self, "max_workers", 5)
+            # 날짜 추출
+            post_date = self._extract_date_from_row(tr)
+            if not post_date:
+                continue
+            post_date = post_date.date()
 
-                with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                    futures = [
-                        ex.submit(self._fetch_detail, post_url, title, post_date)
-                        for (post_url, title, post_date, post_no) in tasks
-                    ]
+            # ① from_date보다 옛날이면: 수집 대상 아님
+            if post_date < from_date:
+                continue
 
-                    for (future, (post_url, title, post_date, post_no)) in zip(futures, tasks):
-                        try:
-                            item = future.result()
-                        except Exception as e:
-                            print(f"[에러] 상세 크롤링 실패: {post_url}, error={e}")
-                            continue
+            # 여기까지 왔으면 적어도 from_date 이상인 글이라는 뜻
+            page_has_not_too_old_post = True
 
-                        if item is None:
-                            continue
+            # ② to_date가 있고, 그보다 더 "최근"이면 스킵
+            if to_date is not None and post_date > to_date:
+                continue
 
-                        item["post_no"] = post_no
-                        # board_base_url은 바깥에서 붙이니까 여기선 안 건드림
-                        yield item
+            # ③ 실제 수집 대상 (from_date ~ to_date 사이)
+            title = link_elem.get_text(strip=True)
+            href = link_elem.get("href")
+            if not href:
+                continue
 
-            # 5) 다음 페이지 이동
-            time.sleep(0.1)  # 서버 예의상 잠깐 쉼
+            tasks.append(PostTask(urljoin(page_url, href), title, post_date, post_no))
 
-            paging_wrap = soup.find("div", class_="b-paging-wrap")
-            if not paging_wrap:
-                print("[중단] b-paging-wrap 없음 → 마지막 페이지로 판단")
-                break
+        # 디버깅용: 이 페이지 요약
+        print(
+            f"[목록] url={page_url}, rows={len(rows)}, "
+            f"from_date이상존재={page_has_not_too_old_post}, "
+            f"수집대상글수={len(tasks)}"
+        )
 
-            next_a = paging_wrap.select_one("li.next.pager > a")
-            if not next_a:
-                print("[중단] li.next.pager a 없음 → 다음 페이지 없음")
-                break
+        # 이 페이지에 from_date 이상인 글이 하나도 없으면
+        # 아래 페이지는 전부 더 옛날 글 → 더 볼 필요 없음
+        if not page_has_not_too_old_post:
+            print(f"[중단] {page_url} 이후로는 {from_date} 이전 글만 있음 → 종료")
+            return ListPage(tasks, keep_going=False)
 
-            href = next_a.get("href")
-            if not href or href.startswith("javascript"):
-                print(f"[중단] next 링크 이상함: href={href}")
-                break
+        # 다음 페이지
+        paging_wrap = soup.find("div", class_="b-paging-wrap")
+        if not paging_wrap:
+            print("[중단] b-paging-wrap 없음 → 마지막 페이지로 판단")
+            return ListPage(tasks)
 
-            next_url = urljoin(base_url, href)
-            if next_url in visited:
-                print(f"[중단] 다음 URL이 이미 방문한 URL: {next_url}")
-                break
+        next_a = paging_wrap.select_one("li.next.pager > a")
+        if not next_a:
+            print("[중단] li.next.pager a 없음 → 다음 페이지 없음")
+            return ListPage(tasks)
 
-            print(f"다음 페이지 이동: {next_url}")
-            current_url = next_url
+        href = next_a.get("href")
+        if not href or href.startswith("javascript"):
+            print(f"[중단] next 링크 이상함: href={href}")
+            return ListPage(tasks)
 
+        return ListPage(tasks, next_url=urljoin(base_url, href))
 
 
     def crawl_univ_board(
@@ -445,55 +482,62 @@ class HongikCrawler:
                 f"[저장] idx={current_chunk_idx}, "
                 f"기간={chunk_label}, 개수={len(current_items)} → {save_path}"
             )
+            if self.state:
+                # 파일에 쓴 글만 증분 상태에 반영
+                self.state.commit(item["url"] for item in current_items)
 
             current_items = []
             current_min_date = None
             current_max_date = None
             current_chunk_idx += 1
 
-        # === 날짜 범위를 100일씩 자르기 ===
+        # === 전체 기간(total_days)을 게시판 한 번 순회로 수집 ===
+        # 예전에는 100일 구간마다 1페이지부터 다시 내려갔지만(앞 페이지를 구간 수만큼 반복 요청)
+        # 이제는 목록을 한 번만 내려가면서 상세 페이지를 병렬로 받음
+        # days_per_step은 호출 호환용으로만 남김
+        # 증분 모드(state_path 지정)면 새 글/바뀐 글만 save_path 뒤에 이어 붙음
         today = datetime.now().date()
         oldest = today - timedelta(days=total_days)
 
-        # ex) [오늘-0~99], [100~199], ... 이런 식으로 뒤로 내려가면서
-        date_ranges = []
-        cur_end = today
-        while cur_end > oldest:
-            cur_start = max(oldest, cur_end - timedelta(days=days_per_step - 1))
-            # 겹치지 않게 하기 위해 다음 구간 end = start - 1
-            date_ranges.append((cur_start, cur_end))
-            cur_end = cur_start - timedelta(days=1)
-
-        # 최신 구간부터 돌고 싶으면 그냥 그대로 사용
-        # 오래된 것부터 돌고 싶으면 date_ranges.reverse()
-
-        for (from_date, to_date) in date_ranges:
-            print(f"\n[범위 시작] {from_date} ~ {to_date}")
+        boards = [
+            Board(
+                key=base_url,
+                start_url=base_url,
+                parse_list=partial(self._parse_univ_list, base_url=base_url, from_date=oldest),
+                parse_detail=self._parse_univ_detail,
+            )
+            for base_url in board_urls
+        ]
 
-            for base_url in board_urls:
-                print(f"[시작] {base_url} / {from_date}~{to_date}")
+        def on_item(base_url, item):
+            nonlocal current_min_date, current_max_date
 
-                for item in self._crawl_single_board(base_url, from_date, to_date):
-                    item["board_base_url"] = base_url
+            item["board_base_url"] = base_url
 
-                    post_date = datetime.strptime(item["date"], "%Y.%m.%d").date()
-                    if current_min_date is None or post_date < current_min_date:
-                        current_min_date = post_date
-                    if current_max_date is None or post_date > current_max_date:
-                        current_max_date = post_date
+            post_date = datetime.strptime(item["date"], "%Y.%m.%d").date()
+            if current_min_date is None or post_date < current_min_date:
+                current_min_date = post_date
+            if current_max_date is None or post_date > current_max_date:
+                current_max_date = post_date
 
-                    current_items.append(item)
+            current_items.append(item)
 
-                    if len(current_items) >= chunk_size:
-                        flush_current_chunk()
+            if len(current_items) >= chunk_size:
+                flush_current_chunk()
 
-                print(f"[완료] {base_url} / {from_date}~{to_date}")
+        print(f"\n[범위 시작] {oldest} ~ {today}")
+        start_offset = save_path.stat().st_size if save_path.exists() else 0
+        self._run_boards(boards, on_item)
 
         flush_current_chunk()
+        self._process_jsonl_attachments(save_path, start_offset)
+        if self.state:
+            # 바뀐 글은 파일 뒤에 다시 붙었으므로 앞쪽의 이전 버전 제거 → 파일 = 전체 스냅샷
+            compact_jsonl_chunks(save_path)
+            self.state.commit()   # 내용 동일 글의 검증자 + 게시판 watermark
         print("[전체 완료]")
 
 
-
     # ---------------- 3. 산업·데이터공학과 개설과목 ---------------- #
 
     # def crawl_ie_courses(self):
@@ -533,6 +577,8 @@ class HongikCrawler:
         """
         여러 학과의 '교육과정/커리큘럼' 페이지를 순회하면서
         각 학과별로 과목 정보를 수집하고, chunk_meta + item 구조로 반환.
+        - 먼저 HTTP로 전체 학과를 동시에 받아서 서버 렌더링된 ul.grid를 바로 파싱
+        - 과목을 못 찾은 학과만 headless Chrome 풀(course_driver_pool개)로 병렬 처리
         """
 
         # ✅ 여기서 학과 이름 + 커리큘럼 URL 관리
@@ -604,61 +650,139 @@ class HongikCrawler:
             # {"name": "디자인엔지니어링전공", "url": "https://smpd.hongik.ac.kr/smpd/0401.do"},
         ]
 
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
+        timings = defaultdict(list)   # 학과 → [(경로, 초), ...]
+        found = {}                    # 학과 → [{"index", "text"}, ...]
 
-        department_courses = {}
+        # 1) HTTP 빠른 경로: ul.grid가 서버에서 렌더링되는 학과는 브라우저 없이 처리 (전체 학과 동시 요청)
+        fallback = []
+        pages = self._fetch_course_pages(boards)
+        for board in boards:
+            name = board["name"]
+            html, sec = pages[name]
+            timings[name].append(("http", sec))
+            courses = self._parse_course_grid(html) if html else None
+            if courses is None:
+                fallback.append(board)
+            else:
+                found[name] = courses
 
-        driver = webdriver.Chrome(options=options)
-        try:
-            for board in boards:
-                name = board["name"]
-                url = board["url"]
+        # 2) HTTP로 과목을 찾지 못한 학과만 headless Chrome 풀로 병렬 처리
+        if fallback:
+            print(f"[과목] HTTP로 찾지 못한 {len(fallback)}개 학과 → headless Chrome 최대 {self.course_driver_pool}개로 처리")
+            for name, (courses, sec) in self._crawl_courses_selenium(fallback).items():
+                timings[name].append(("selenium", sec))
+                if courses is not None:
+                    found[name] = courses
 
-                print(f"[과목 크롤링 시작] {name} ({url})")
+        department_courses = {}
+        for board in boards:
+            name = board["name"]
+            courses = found.get(name)
+            if courses is None:
+                print(f"[경고] {name} 페이지에서 ul.grid를 찾지 못했습니다. (스킵)")
+                courses = []
 
-                driver.get(url)
+            department_courses[name] = {
+                "chunk_meta": {
+                    # ✅ item 개수만 넣기로 했으므로 이거 하나면 충분
+                    "count": len(courses)
+                },
+                "item": courses
+            }
 
-                try:
-                    ul_grid = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "ul.grid"))
-                    )
-                except TimeoutException:
-                    print(f"[경고] {name} 페이지에서 ul.grid를 찾지 못했습니다. (스킵)")
-                    department_courses[name] = {
-                        "chunk_meta": {"count": 0},
-                        "item": []
-                    }
-                    continue
+        # 3) 학과별 소요 시간
+        print("\n[과목 크롤링 소요 시간]")
+        for board in boards:
+            name = board["name"]
+            steps = " + ".join(f"{path} {sec:.2f}초" for path, sec in timings[name])
+            print(f"  {name}: {department_courses[name]['chunk_meta']['count']}개 ({steps})")
 
-                boxes = ul_grid.find_elements(By.CSS_SELECTOR, "div.curriculum-title-box")
+        # ✅ 바깥 key로 한 번 더 감싸지 말고 그대로 리턴
+        return department_courses
 
-                courses = []
-                for idx, box in enumerate(boxes, start=1):
-                    text = box.text.strip()  # HTML 태그 제거, 텍스트만
+    def _parse_course_grid(self, html):
+        """
+        커리큘럼 페이지 HTML → [{"index", "text"}, ...]
+        - ul.grid 안의 과목 박스가 서버에서 렌더링된 경우만 (없거나 비어 있으면 None → Selenium)
+        - 텍스트는 Selenium .text처럼 블록 요소 경계에서만 줄바꿈 (_block_text)
+          (전처리에서 1줄=과목명, 2줄=학수번호로 사용 → 두 경로의 줄 구성이 같아야 함)
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        ul_grid = soup.select_one("ul.grid")
+        if ul_grid is None:
+            return None
+        boxes = ul_grid.select("div.curriculum-title-box")
+        if not boxes:
+            return None
+        return [
+            {"index": idx, "text": _block_text(box)}
+            for idx, box in enumerate(boxes, start=1)
+        ]
 
-                    courses.append({
-                        "index": idx,
-                        "text": text
-                    })
+    def _fetch_course_pages(self, boards):
+        """모든 학과 커리큘럼 페이지를 HTTP로 동시에 요청 → {학과: (html 또는 None, 초)}"""
+        async def fetch_one(engine, board):
+            t0 = time.perf_counter()
+            result = await engine.fetch(board["url"])
+            html = result.text if result is not None and result.ok else None
+            return board["name"], html, time.perf_counter() - t0
 
-                department_courses[name] = {
-                    "chunk_meta": {
-                        # ✅ item 개수만 넣기로 했으므로 이거 하나면 충분
-                        "count": len(courses)
-                    },
-                    "item": courses
-                }
+        async def main():
+            async with self._engine() as engine:
+                return await asyncio.gather(*[fetch_one(engine, board) for board in boards])
 
-                print(f"[과목 크롤링 완료] {name} - {len(courses)}개 수집")
+        return {name: (html, sec) for name, html, sec in asyncio.run(main())}
 
+    def _crawl_courses_selenium(self, boards):
+        """
+        JS로 그려지는 커리큘럼 페이지용 fallback
+        - headless Chrome을 스레드마다 하나씩 띄워서 재사용 (최대 course_driver_pool개)
+        - 반환: {학과: (과목 리스트 또는 None, 초)}
+        """
+        local = threading.local()
+        drivers = []
+        drivers_lock = threading.Lock()
+
+        def get_driver():
+            if not hasattr(local, "driver"):
+                options = Options()
+                options.add_argument("--headless=new")
+                options.add_argument("--no-sandbox")
+                options.add_argument("--disable-dev-shm-usage")
+                local.driver = webdriver.Chrome(options=options)
+                with drivers_lock:
+                    drivers.append(local.driver)
+            return local.driver
+
+        def crawl_one(board):
+            name = board["name"]
+            t0 = time.perf_counter()
+            try:
+                driver = get_driver()
+                driver.get(board["url"])
+                ul_grid = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "ul.grid"))
+                )
+                boxes = ul_grid.find_elements(By.CSS_SELECTOR, "div.curriculum-title-box")
+                courses = [
+                    {"index": idx, "text": box.text.strip()}  # HTML 태그 제거, 텍스트만
+                    for idx, box in enumerate(boxes, start=1)
+                ]
+            except TimeoutException:
+                courses = None
+            except Exception as e:
+                print(f"[에러] {name} Selenium 크롤링 실패: {e}")
+                courses = None
+            return name, courses, time.perf_counter() - t0
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.course_driver_pool, len(boards)))) as ex:
+                results = list(ex.map(crawl_one, boards))
         finally:
-            driver.quit()
+            for driver in drivers:
+                driver.quit()
 
-        # ✅ 바깥 key로 한 번 더 감싸지 말고 그대로 리턴
-        return department_courses
+        return {name: (courses, sec) for name, courses, sec in results}
 
     # ---------------- 4. 전체 학과 공지사항 ---------------- #
 
@@ -671,6 +795,7 @@ class HongikCrawler:
           2) 각 페이지에서 최근 6개월 이내 글만 상세 페이지까지 크롤링
           3) 해당 페이지에 최근 6개월 이내 글이 하나도 없으면 -> 그 학부 크롤링 종료
           4) div.b-paging 안에서 (현재페이지+1) 텍스트를 가진 a 태그를 찾아 다음 페이지로 이동
+        - 증분 모드면 결과를 저장한 뒤 self.state.commit()을 호출해야 다음 실행에서 건너뜀 (run()이 처리)
         """
 
         # ✅ 여기서 name, url을 같이 관리
@@ -746,195 +871,135 @@ class HongikCrawler:
         # six_months_ago = datetime.now() - timedelta(days=180)  # 실제 운영
         six_months_ago = datetime.now() - timedelta(days=730)      # 2년치로 운영조정
 
-        results_by_board = {}
-
-        for board in boards:
-            name = board["name"]      # 딕셔너리 key로 쓸 이름
-            base_url = board["url"]   # 크롤링에 사용할 URL
-
-            print(f"학과 {name} 크롤링 시작...")
-            board_results = self._crawl_single_ie_board(base_url, six_months_ago)
+        # ✅ 모든 학과 게시판을 동시에 크롤링 (호스트별 동시 요청/간격 제한은 엔진이 담당)
+        results_by_board = {board["name"]: [] for board in boards}
+        engine_boards = [
+            Board(
+                key=board["name"],     # 딕셔너리 key로 쓸 이름
+                start_url=board["url"],
+                parse_list=partial(self._parse_ie_list, base_url=board["url"], since=six_months_ago),
+                parse_detail=self._parse_ie_detail,
+            )
+            for board in boards
+        ]
 
-            # ✅ 여기서 URL이 아니라 name을 key로 사용
-            results_by_board[name] = board_results
+        print(f"학과 {len(boards)}곳 동시 크롤링 시작...")
+        self._run_boards(engine_boards, lambda name, item: results_by_board[name].append(item))
+        self._process_attachments([item for items in results_by_board.values() for item in items])
 
+        for board in boards:
             # ✅ 크롤링 진행상황 출력 (원하는 멘트로 수정 가능)
-            print(f"[크롤링 완료] {name} ({base_url}) - {len(board_results)}건 수집")
+            name = board["name"]
+            print(f"[크롤링 완료] {name} ({board['url']}) - {len(results_by_board[name])}건 수집")
 
         return results_by_board
 
 
-    def _crawl_single_ie_board(self, base_url, six_months_ago):
+    def _parse_ie_list(self, html, page_url, page_no, base_url, since):
         """
-        하나의 산업데이터공학과(또는 동일 템플릿 학과) 공지 게시판에 대해
-        '최근 6개월 이내 글만' 페이지를 넘기며 크롤링하는 공통 로직
+        산업데이터공학과(또는 동일 템플릿 학과) 공지 목록 페이지 HTML → ListPage
+        - since 이후 글만 상세 요청 대상으로
+        - 해당 페이지에 since 이후 글이 하나도 없으면 순회 종료
+        - div.b-paging 안에서 (현재페이지+1) 텍스트를 가진 a 태그를 next_url로
         """
+        soup = BeautifulSoup(html, "html.parser")
 
-        results = []
-        current_page = 1
-        current_url = base_url
-        visited = set()
+        # 게시물 목록 tr
+        posts = soup.select("tbody tr") or soup.select("tr")
 
-        while True:
-            # 혹시 중복 요청 방지
-            if current_url in visited:
-                break
-            visited.add(current_url)
+        # 이 페이지에 '최근 글'이 있었는지
+        page_has_recent_post = False
+        tasks = []
 
-            # --- 현재 페이지 요청 --- #
-            try:
-                resp = self.session.get(
-                    current_url,
-                    headers=self.headers,
-                    timeout=10,
-                    verify=False,   # 🔹 SSL 인증서 검증 끔
-                )
-            except requests.exceptions.SSLError as e:
-                print(f"[경고] 학과 공지 요청 중 SSL 에러 발생, ie_board 크롤링을 건너뜁니다: {e}")
-                break
+        for post in posts:
+            # 제목 a 태그 없으면 스킵 (헤더/빈 행 등)
+            link_elem = post.find("a")
+            if not link_elem:
+                continue
 
-            if not resp.ok:
-                break
+            post_date = None
+            for td in post.find_all("td"):
+                text = td.get_text(strip=True)
+                # YYYY.MM.DD 형태인지 검사
+                if re.fullmatch(r"\d{4}\.\d{2}\.\d{2}", text):
+                    try:
+                        post_date = datetime.strptime(text, "%Y.%m.%d")
+                    except ValueError:
+                        post_date = None
+                    break
 
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # 게시물 목록 tr
-            posts = soup.select("tbody tr") or soup.select("tr")
-
-            # 이 페이지에 '최근 6개월 이내 글'이 있었는지
-            page_has_recent_post = False
-
-            for post in posts:
-                # 제목 a 태그 없으면 스킵 (헤더/빈 행 등)
-                link_elem = post.find("a")
-                if not link_elem:
-                    continue
-
-                # 공지(상단 고정) 제외하고 싶으면: 첫 번째 td가 '공지'면 스킵
-                # tds = post.find_all("td")
-                # if tds and tds[0].get_text(strip=True) == "공지":
-                #     continue
-
-                post_date = None
-                tds = post.find_all("td")
-
-                for td in tds:
-                    text = td.get_text(strip=True)
-                    # YYYY.MM.DD 형태인지 검사
-                    if re.fullmatch(r"\d{4}\.\d{2}\.\d{2}", text):
-                        try:
-                            post_date = datetime.strptime(text, "%Y.%m.%d")
-                        except ValueError:
-                            post_date = None
-                        break
-
-                # 날짜를 찾지 못하면 스킵
-                if not post_date:
-                    continue
-
-                # 6개월 이내 글인지 확인
-                if post_date >= six_months_ago:
-                    page_has_recent_post = True
-                else:
-                    # 이 글은 너무 오래된 글이라 상세 크롤링 안 함
-                    continue
-
-                title = link_elem.get_text(strip=True)
-                href = link_elem.get("href")
-                if not href:
-                    continue
-
-                post_url = urljoin(current_url, href)
-
-                # --- 개별 게시글 상세 페이지 요청 --- #
-                try:
-                    detail_resp = self.session.get(post_url, headers=self.headers)
-                    if not detail_resp.ok:
-                        continue
-                except Exception:
-                    continue
-
-                detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-
-                # 상세 내용 추출 (기존 방식 그대로 유지)
-                content = {
-                    "url": post_url,
-                    "title": "",
-                    "content": "",
-                    "date": post_date.strftime("%Y.%m.%d"),
-                    "attachments": [],
-                }
-
-                # 제목 및 본문
-                title_elem = detail_soup.select_one(".view_title") or detail_soup.find("h4")
-                if title_elem:
-                    content["title"] = title_elem.get_text(strip=True)
-                else:
-                    content["title"] = title
-
-                body_elem = detail_soup.select_one(".view_content") or detail_soup.find("div", class_="view_con")
-                if body_elem:
-                    content["content"] = body_elem.get_text(strip=True)
-                else:
-                    # fallback: 페이지 전체에서 본문 후보 영역을 못 찾으면 그냥 전체 텍스트 일부
-                    content["content"] = detail_soup.get_text(separator="\n", strip=True)
-
-                # 첨부파일 처리
-                attachments = detail_soup.select(".file_download a")
-                for attachment in attachments:
-                    file_url = urljoin(post_url, attachment.get("href", ""))
-                    file_name = attachment.get_text(strip=True)
-
-                    file_info = {"name": file_name, "content": None}
-
-                    # # PDF면 내용 추출 시도
-                    # if file_name.lower().endswith(".pdf"):
-                    #     try:
-                    #         file_resp = self.session.get(file_url, headers=self.headers)
-                    #         if file_resp.ok:
-                    #             pdf_text = self.extract_pdf_text(file_resp.content)
-                    #             file_info["content"] = pdf_text
-                    #     except Exception:
-                    #         file_info["content"] = "PDF 내용 추출 실패"
-
-                    # content["attachments"].append(file_info)
-
-                results.append(content)
-                time.sleep(0.2)
-
-            # ✅ 이 페이지에 최근 6개월 이내 글이 하나도 없으면 더 이상 내려갈 필요 없음
-            if not page_has_recent_post:
-                break
+            # 날짜를 찾지 못하면 스킵
+            if not post_date:
+                continue
 
-            # --- 다음 페이지: (현재페이지 + 1) 텍스트를 가진 a 태그 찾기 --- #
-            paging_div = soup.find("div", class_="b-paging")
-            if not paging_div:
-                break
+            # 기간 이내 글인지 확인 (너무 오래된 글은 상세 크롤링 안 함)
+            if post_date < since:
+                continue
+            page_has_recent_post = True
 
-            next_page_num = current_page + 1
-            next_link_tag = None
+            title = link_elem.get_text(strip=True)
+            href = link_elem.get("href")
+            if not href:
+                continue
 
-            for a in paging_div.find_all("a"):
-                text = a.get_text(strip=True)
-                if text == str(next_page_num):  # "2", "3", ...
-                    next_link_tag = a
-                    break
+            tasks.append(PostTask(urljoin(page_url, href), title, post_date, self._extract_post_no(post)))
 
-            # 다음 페이지 번호가 없으면 종료
-            if not next_link_tag:
-                break
+        # ✅ 이 페이지에 기간 이내 글이 하나도 없으면 더 이상 내려갈 필요 없음
+        if not page_has_recent_post:
+            return ListPage(tasks, keep_going=False)
 
-            href = next_link_tag.get("href")
-            if not href or href.startswith("javascript"):
+        # --- 다음 페이지: (현재페이지 + 1) 텍스트를 가진 a 태그 찾기 --- #
+        paging_div = soup.find("div", class_="b-paging")
+        if not paging_div:
+            return ListPage(tasks)
+
+        for a in paging_div.find_all("a"):
+            if a.get_text(strip=True) == str(page_no + 1):  # "2", "3", ...
+                href = a.get("href")
+                if href and not href.startswith("javascript"):
+                    return ListPage(tasks, next_url=urljoin(base_url, href))
                 break
 
-            # 다음 페이지로 이동
-            current_url = urljoin(base_url, href)
-            current_page = next_page_num
-            time.sleep(0.2)
+        return ListPage(tasks)
+
+    def _parse_ie_detail(self, html, task):
+        """학과 공지 상세 페이지 HTML → item (비동기 엔진이 스레드에서 호출)"""
+        detail_soup = BeautifulSoup(html, "html.parser")
+
+        # 상세 내용 추출 (기존 방식 그대로 유지)
+        content = {
+            "url": task.url,
+            "title": "",
+            "content": "",
+            "date": task.date.strftime("%Y.%m.%d"),
+            "attachments": [],
+        }
+
+        # 제목 및 본문
+        title_elem = detail_soup.select_one(".view_title") or detail_soup.find("h4")
+        if title_elem:
+            content["title"] = title_elem.get_text(strip=True)
+        else:
+            content["title"] = task.title
+
+        body_elem = detail_soup.select_one(".view_content") or detail_soup.find("div", class_="view_con")
+        if body_elem:
+            content["content"] = body_elem.get_text(strip=True)
+        else:
+            # fallback: 페이지 전체에서 본문 후보 영역을 못 찾으면 그냥 전체 텍스트 일부
+            content["content"] = detail_soup.get_text(separator="\n", strip=True)
+
+        # 첨부파일 처리
+        attachments = detail_soup.select(".file_download a")
+        for attachment in attachments:
+            file_url = urljoin(task.url, attachment.get("href", ""))
+            file_name = attachment.get_text(strip=True)
 
-        return results
+            # PDF 내용 추출은 크롤링이 끝난 뒤 첨부파일 단계(attachment_stage.py)에서 처리
+            file_info = {"name": file_name, "url": file_url, "content": None}
+            content["attachments"].append(file_info)
 
+        return content
 
 
     # ---------------- 결과 저장 & 실행 ---------------- #
@@ -943,6 +1008,46 @@ class HongikCrawler:
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+    def merge_previous_snapshot(self, data, filename):
+        """
+        증분 모드: 게시판 결과(새 글/바뀐 글만)를 이전 결과 파일(filename)의 게시글과 합침 (in-place)
+        - 이번에 다시 받지 않은 글 / 이번에 돌지 않은 학과도 그대로 유지 → 저장되는 파일은 전체 스냅샷
+        - 개설과목은 매번 전체를 다시 받으므로 합치지 않음
+        """
+        board_sections = ("ie_board",)
+        if not any(key in data for key in board_sections):
+            return
+        path = Path(filename)
+        if not path.exists():
+            print(f"⚠️ 이전 결과 파일({filename})이 없어 이번 증분 결과만 저장됩니다. "
+                  "벡터DB 증분 구축 전에 crawl_state.db를 지우고 전체 크롤링을 한 번 실행하세요.")
+            return
+        with path.open("r", encoding="utf-8") as f:
+            previous = json.load(f)
+        for key in board_sections:
+            if key not in data:
+                continue
+            old = previous.get(key) or {}
+            merged = dict(old)
+            for dept_name, items in data[key].items():
+                merged[dept_name] = merge_snapshot_items(old.get(dept_name), items)
+            data[key] = merged
+
+    def save_jsonl_sections(self, data, filename):
+        """
+        학과별 결과를 한 줄에 한 학과씩 JSONL로 저장 (전처리가 한 줄씩 스트리밍으로 읽음)
+        {"section": "department_Courses" | "department_Notice", "department": 학과명, "chunk_meta": {...}, "item": [...]}
+        """
+        sections = {"department_Courses": "department_Courses", "ie_board": "department_Notice"}
+        with open(filename, "w", encoding="utf-8") as f:
+            for key, section in sections.items():
+                for dept_name, content in (data.get(key) or {}).items():
+                    # 학과 공지는 {학과: [items]} 형태 → 과목과 같은 chunk_meta + item 구조로
+                    items = content if isinstance(content, list) else content.get("item", [])
+                    chunk_meta = {"count": len(items)} if isinstance(content, list) else content.get("chunk_meta", {})
+                    record = {"section": section, "department": dept_name, "chunk_meta": chunk_meta, "item": items}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
     def run(self, user_id=None, password=None):
         print("크롤링 시작...")
 
@@ -974,14 +1079,24 @@ class HongikCrawler:
         # all_results["ie_board"] = ie_board_data
         # print(f"   {len(ie_board_data)}개 게시물 크롤링 완료")
 
-        # 결과 저장
+        # 결과 저장 (증분 모드면 이전 결과 파일과 합쳐서 전체 스냅샷으로)
+        if self.state:
+            self.merge_previous_snapshot(all_results, "depart_Courses+Notice.json")
         self.save_results(all_results, "depart_Courses+Notice.json")
-        print("\n크롤링 완료! 결과가 'depart_Courses+Notice.json'에 저장되었습니다.")
+        # 전처리(preprocessing/json_to_csv_ver_funct.py) 입력용
+        self.save_jsonl_sections(all_results, "depart_Courses+Notice.jsonl")
+        if self.state:
+            # 결과 파일을 다 쓴 뒤에 증분 상태 반영 (저장 전에 죽으면 다음 실행에서 다시 수집)
+            self.state.commit()
+        print("\n크롤링 완료! 결과가 'depart_Courses+Notice.json'(.jsonl)에 저장되었습니다.")
 
         return all_results
 
 
 if __name__ == "__main__":
+    # 전체 크롤링 (결과 파일 = 현재 게시글 전체 스냅샷)
+    # 증분 크롤링: HongikCrawler(state_path=crawler.crawl_state.CRAWL_STATE_PATH)
+    #   → 새 글/바뀐 글만 받아서 이전 결과 파일에 합쳐 저장 (결과 파일은 그대로 전체 스냅샷)
     crawler = HongikCrawler()
 
     # ⚠️ 중요한 보안 주의:
@@ -1,168 +1,213 @@
+"""
+크롤링 결과 → 벡터DB 구축용 CSV / Parquet (스트리밍 전처리)
+- 입력(JSONL, 한 줄씩 읽음 → 전체 파일을 메모리에 올리지 않음)
+    univ_board.jsonl               : {"chunk_meta": {...}, "items": [...]}                  (학사 공지 chunk)
+    depart_Courses+Notice.jsonl    : {"section": "department_Courses" | "department_Notice",
+                                      "department": 학과명, "chunk_meta": {...}, "item": [...]}
+  기존 final_merged.json(.json)도 호환용으로 읽을 수 있음 (이 경우만 파일 전체 로드)
+- 출력 (행 단위로 바로 써서 메모리 사용량이 입력 크기와 무관)
+    CSV     : index, department, title, date, content, url, attachments (기존 형식)
+    Parquet : 정규화까지 끝낸 타입 있는 문서 테이블 (DOCUMENT_SCHEMA)
+              → build_chroma_db가 literal_eval / 정규식 정리 없이 바로 사용
+- crawler/pretty+plus.py 병합 단계(final_merged.json) 없이 크롤러 출력에서 바로 변환
+
+실행:
+    python preprocessing/json_to_csv_ver_funct.py univ_board.jsonl depart_Courses+Notice.jsonl \
+        [--out build_vector_db/data/df_json_to_csv.csv] [--parquet build_vector_db/data/documents.parquet]
+"""
+
+import sys
+import csv
 import json
-import pandas as pd
-
-def load_data(file_path):
-    """JSON 파일을 불러오는 함수"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def parse_attachments(item):
-    """첨부파일 리스트를 문자열로 변환하는 헬퍼 함수"""
-    att_list = item.get('attachments', [])
+import argparse
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 스크립트로 실행해도(python preprocessing/json_to_csv_ver_funct.py) 패키지 import 가능하도록
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from preprocessing.normalize import normalize_row
+
+OUTPUT_COLUMNS = ['index', 'department', 'title', 'date', 'content', 'url', 'attachments']
+DEFAULT_OUTPUT_PATH = 'build_vector_db/data/df_json_to_csv.csv'
+DEFAULT_PARQUET_PATH = 'build_vector_db/data/documents.parquet'
+PARQUET_ROW_GROUP = 2000
+
+# 정규화된 문서 테이블 (preprocessing.normalize.normalize_row 결과와 같은 키)
+DOCUMENT_SCHEMA = pa.schema([
+    ('original_id', pa.string()),
+    ('notice_type', pa.string()),
+    ('department', pa.string()),
+    ('title', pa.string()),
+    ('content', pa.string()),
+    ('url', pa.string()),
+    ('date', pa.string()),
+    ('course_id', pa.string()),
+    ('attachment_names', pa.list_(pa.string())),
+    ('has_attachment', pa.bool_()),
+])
+
+
+def format_attachments(att_list):
+    """첨부파일 리스트를 CSV용 문자열로 변환하는 헬퍼 함수"""
     if att_list:
         return ', '.join([str(x) for x in att_list])
     return ''
 
-def process_courses(data):
-    """학과 강좌(department_Courses) 데이터를 처리하여 DataFrame 반환"""
-    rows = []
-    # 데이터 추출
-    for dept_name, content in data.get('department_Courses', {}).items():
-        items = content.get('item', [])
-        for item in items:
-            rows.append({
-                'department': dept_name,
-                'index': item.get('index'),
-                'text': item.get('text')
-            })
-
-    if not rows:
-        return pd.DataFrame()
-
-    df_courses = pd.DataFrame(rows)
-    
-    # ID 생성
-    df_courses['index'] = [f'course_{i+1}' for i in range(len(df_courses))]
-
-    # 텍스트 전처리 (제목, 날짜, 내용 분리)
-    split_data = df_courses['text'].str.split('\n')
-    df_courses['title'] = split_data.str[0]
-    df_courses['date'] = split_data.str[1]
-    
-    # 내용은 나머지 줄을 다시 합쳐서 저장 (CSV 저장 시 리스트보다 문자열이 안전함)
-    df_courses['content'] = split_data.str[2:].apply(lambda x: '\n'.join(x) if isinstance(x, list) else '')
-    
-    df_courses['url'] = ''
-    df_courses['attachments'] = ''
-    
-    # 불필요한 원본 텍스트 컬럼 삭제
-    df_courses.drop(columns=['text'], inplace=True)
-    
-    return df_courses
-
-def process_dept_notices(data):
-    """학과 공지사항(department_Notice) 데이터를 처리하여 DataFrame 반환"""
-    rows = []
-    for dept_name, content in data.get('department_Notice', {}).items():
-        items = content.get('item', [])
-        if items:
-            for item in items:
-                rows.append({
-                    'index': '', # 나중에 일괄 부여
-                    'department': dept_name,
-                    'date': item.get('date'),
-                    'title': item.get('title'),
-                    'url': item.get('url'),
-                    'attachments': parse_attachments(item),
-                    'content': item.get('content')
-                })
-    
-    df_notice = pd.DataFrame(rows)
-    
-    if not df_notice.empty:
-        df_notice['index'] = [f'notice_{i+1}' for i in range(len(df_notice))]
-        
-    return df_notice
-
-def process_univ_notices(data):
-    notice_rows = []
-    target_list = []
-
-    # 1. data['univ_Notice'] 리스트를 돌면서 'items' 키가 있는 딕셔너리 찾기
-    if 'univ_Notice' in data:
-        for entry in data['univ_Notice']:
-            if 'items' in entry:
-                target_list = entry['items']
-                break  # 찾았으면 반복문 종료
-
-    # 2. 찾은 item 리스트 순회
-    if target_list:
-        for item in target_list:
-            
-            # attachments (리스트 -> 문자열 변환)
-            att_list = item.get('attachments', [])
-            if att_list:
-                attachments_str = ', '.join([str(x) for x in att_list])
-            else:
-                attachments_str = ''
-
-            row = {
-                'date': item.get('date'),
-                'title': item.get('title'),
-                'url': item.get('url'),
-                'attachments': attachments_str,
-                'content': item.get('content')
-            }
-            notice_rows.append(row)
-
-    # 3. 데이터프레임 생성
-    df_univ = pd.DataFrame(notice_rows)
-    
-    # 데이터가 비어있지 않다면 후처리 진행
-    if not df_univ.empty:
-        # 4. 인덱스 ID 추가 (univ_notice_1, univ_notice_2 ...)
-        df_univ['index'] = [f'univ_notice_{i+1}' for i in range(len(df_univ))]
-
-        # 5. 컬럼 순서 정리 (ID를 맨 앞으로)
-        cols = ['index'] + [c for c in df_univ.columns if c != 'index']
-        df_univ = df_univ[cols]
-
-        # 6. department 컬럼 생성 (요청하신 로직 그대로)
-        departments = []
-        for content in df_univ['content']:
-            split_data = content.split('\n')
-            # 두 번째 줄(인덱스 1)을 이용하여 부서명 생성
-            dept_result = f"대학전체_{split_data[1]}" 
-            departments.append(dept_result)
-
-        # 7. department 컬럼 할당
-        df_univ['department'] = departments
-
-    return df_univ
-
-def main():
-    # 1. 파일 경로 설정 및 로드
-    file_path = '/content/final_merged.json'
-    data = load_data(file_path)
-    print("데이터 로드 완료")
-
-    # 2. 각 섹션별 데이터프레임 변환
-    df_courses = process_courses(data)
-    df_notice = process_dept_notices(data)
-    df_univ = process_univ_notices(data)
-
-    print(f"강좌 데이터: {len(df_courses)}건")
-    print(f"학과 공지: {len(df_notice)}건")
-    print(f"학교 공지: {len(df_univ)}건")
-
-    # 3. 데이터프레임 병합 (공통 컬럼 기준)
-    # 컬럼 순서를 맞추기 위해 reindex 혹은 concat 시 자동 정렬 이용
-    all_dfs = [df_courses, df_notice, df_univ]
-    df_final = pd.concat(all_dfs, axis=0, ignore_index=True, sort=False)
-
-    # index 컬럼을 맨 앞으로 오게 정렬
-    if 'index' in df_final.columns:
-        cols = ['index'] + [c for c in df_final.columns if c != 'index']
-        df_final = df_final[cols]
-
-    # 4. CSV 저장
-    output_path = 'df_json_to_csv.csv'
-    df_final.to_csv(output_path, index=False, encoding='utf-8-sig')
-    print(f"파일 저장 완료: {output_path}")
-
-    # 결과 미리보기
-    return df_final.head()
+
+# ---------------- 입력 읽기 ---------------- #
+
+def _legacy_records(data):
+    """final_merged.json(dict) → JSONL과 같은 레코드 형태로 변환"""
+    for section in ('department_Courses', 'department_Notice'):
+        for dept_name, content in data.get(section, {}).items():
+            # department_Notice는 {"chunk_meta", "item"}로 감싼 형태 / 크롤러 원본 리스트 형태 둘 다 허용
+            items = content if isinstance(content, list) else content.get('item', [])
+            yield {'section': section, 'department': dept_name, 'item': items}
+    for entry in data.get('univ_Notice', []):
+        if 'items' in entry:
+            yield entry
+
+
+def iter_records(path):
+    """JSONL이면 한 줄(레코드)씩, .json이면 전체를 읽어서 레코드로 변환"""
+    path = Path(path)
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from _legacy_records(json.load(f))
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# ---------------- 항목별 정규화 ---------------- #
+
+def course_row(dept_name, item):
+    """학과 강좌: 텍스트를 줄 단위로 나눠서 1줄=과목명, 2줄=학수번호(date 컬럼), 나머지=내용"""
+    lines = (item.get('text') or '').split('\n')
+    return {
+        'department': dept_name,
+        'title': lines[0],
+        'date': lines[1] if len(lines) > 1 else None,
+        'content': '\n'.join(lines[2:]),
+        'url': '',
+        'attachments': [],
+    }
+
+
+def dept_notice_row(dept_name, item):
+    """학과 공지사항"""
+    return {
+        'department': dept_name,
+        'date': item.get('date'),
+        'title': item.get('title'),
+        'url': item.get('url'),
+        'attachments': item.get('attachments') or [],
+        'content': item.get('content'),
+    }
+
+
+def univ_notice_row(item):
+    """학사 공지: 본문 두 번째 줄(담당 부서)로 department 생성"""
+    content = item.get('content') or ''
+    split_data = content.split('\n')
+    department = f"대학전체_{split_data[1]}" if len(split_data) > 1 else "대학전체"
+    return {
+        'department': department,
+        'date': item.get('date'),
+        'title': item.get('title'),
+        'url': item.get('url'),
+        'attachments': item.get('attachments') or [],
+        'content': content,
+    }
+
+
+def iter_rows(paths):
+    """
+    입력 파일들 → (index 접두어, 행 dict) 를 순서대로 yield
+    - index 접두어(course / notice / univ_notice)는 build_chroma_db에서 notice_type으로 쓰임
+    """
+    for path in paths:
+        for record in iter_records(path):
+            section = record.get('section')
+            if section == 'department_Courses':
+                for item in record.get('item', []):
+                    yield 'course', course_row(record['department'], item)
+            elif section == 'department_Notice':
+                for item in record.get('item', []):
+                    yield 'notice', dept_notice_row(record['department'], item)
+            elif 'items' in record:
+                for item in record['items']:
+                    yield 'univ_notice', univ_notice_row(item)
+
+
+# ---------------- 출력 ---------------- #
+
+def write_outputs(rows, output_path=DEFAULT_OUTPUT_PATH, parquet_path=DEFAULT_PARQUET_PATH):
+    """
+    (index 접두어, 행) 스트림 → CSV + Parquet (한 번 순회하면서 둘 다 기록)
+    - index는 종류별 일련번호 (course_1, notice_1, univ_notice_1 ...)
+    - Parquet에는 본문이 빈 행 제외 (CSV를 읽을 때 dropna(subset=["content"])와 동일)
+    - parquet_path=None이면 CSV만
+    - 반환: 종류별 행 수
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    parquet_writer = None
+    if parquet_path:
+        Path(parquet_path).parent.mkdir(parents=True, exist_ok=True)
+        parquet_writer = pq.ParquetWriter(str(parquet_path), DOCUMENT_SCHEMA, compression='zstd')
+
+    counts = {}
+    batch = []
+
+    def flush_batch():
+        if parquet_writer is not None and batch:
+            parquet_writer.write_table(pa.Table.from_pylist(batch, schema=DOCUMENT_SCHEMA))
+        batch.clear()
+
+    try:
+        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+            writer.writeheader()
+            for prefix, row in rows:
+                counts[prefix] = counts.get(prefix, 0) + 1
+                row = {**row, 'index': f'{prefix}_{counts[prefix]}'}
+                writer.writerow({**row, 'attachments': format_attachments(row['attachments'])})
+
+                if parquet_writer is not None and row.get('content'):
+                    batch.append(normalize_row(row))
+                    if len(batch) >= PARQUET_ROW_GROUP:
+                        flush_batch()
+        flush_batch()
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    return counts
+
+
+def main(input_paths=('univ_board.jsonl', 'depart_Courses+Notice.jsonl'),
+         output_path=DEFAULT_OUTPUT_PATH, parquet_path=DEFAULT_PARQUET_PATH):
+    counts = write_outputs(iter_rows(input_paths), output_path, parquet_path)
+
+    print(f"강좌 데이터: {counts.get('course', 0)}건")
+    print(f"학과 공지: {counts.get('notice', 0)}건")
+    print(f"학교 공지: {counts.get('univ_notice', 0)}건")
+    print(f"파일 저장 완료: {output_path}" + (f", {parquet_path}" if parquet_path else ""))
+    return counts
+
 
 # 실행
 if __name__ == "__main__":
-    df_result = main()
+    parser = argparse.ArgumentParser(description="크롤링 결과(JSONL) → CSV/Parquet 스트리밍 전처리")
+    parser.add_argument("inputs", nargs="*", default=['univ_board.jsonl', 'depart_Courses+Notice.jsonl'],
+                        help="크롤러 출력 파일 (JSONL, 또는 기존 final_merged.json)")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_PATH, help="출력 CSV 경로")
+    parser.add_argument("--parquet", default=DEFAULT_PARQUET_PATH, help="정규화된 Parquet 경로")
+    parser.add_argument("--no-parquet", action="store_true", help="CSV만 출력")
+    args = parser.parse_args()
+    main(args.inputs, args.out, None if args.no_parquet else args.parquet)
@@ -0,0 +1,160 @@
+"""
+전처리 / 벡터DB 구축 공용 정규화
+- 전처리(json_to_csv_ver_funct.py)가 Parquet에 정규화된 값을 미리 저장할 때 사용
+- 벡터DB 구축(chroma_builder_pdr.py)이 CSV를 읽는 경우에도 같은 규칙으로 정규화 → 두 경로의 메타데이터가 동일
+  (normalize_row: 행 단위, normalize_frame: 컬럼 단위)
+"""
+
+import re
+import ast
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+NOTICE_TYPE_MAPPING = {
+    "course": "교과목/수강",
+    "notice": "학과공지",
+    "univ_notice": "대학공지",
+}
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+ATTACHMENT_PARALLEL_MIN = 5000   # 고유 첨부 문자열이 이보다 많을 때만 프로세스 풀 사용
+
+
+def is_missing(value) -> bool:
+    """None / NaN / 빈 문자열 (CSV를 다시 읽으면 빈 칸은 NaN이 되므로 같은 취급)"""
+    if value is None or value == "":
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+
+def clean_text(t) -> str:
+    """HTML 태그 제거 + 공백/줄바꿈 정리"""
+    if is_missing(t):
+        return ""
+    t = _TAG_PATTERN.sub(" ", str(t))
+    t = t.replace("\n", " ").replace("\r", " ").replace("\t", " ")
+    return " ".join(t.split())
+
+
+def normalize_date(date_str) -> str:
+    """'2025.01.02' → '2025-01-02' (없으면 '날짜미상')"""
+    if is_missing(date_str):
+        return "날짜미상"
+    return str(date_str).replace(".", "-")
+
+
+def notice_type_code(raw_index) -> str:
+    """index('univ_notice_100') → 'univ_notice'"""
+    raw_index = str(raw_index)
+    return raw_index.rsplit("_", 1)[0] if "_" in raw_index else "general"
+
+
+def parse_attachment_names(raw) -> list:
+    """
+    첨부파일 → 중복 없는 파일명 목록
+    - raw: 크롤러의 dict 리스트 그대로, 또는 CSV에 저장된 문자열("{'name': ...}, {...}")
+    """
+    if is_missing(raw):
+        return []
+    if isinstance(raw, str):
+        try:
+            raw = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return [raw[:50] + "..."] if len(raw) > 5 else []
+    if isinstance(raw, dict):
+        raw = [raw]
+    names = []
+    for item in raw if isinstance(raw, (list, tuple)) else []:
+        if isinstance(item, dict) and "name" in item and item["name"] not in names:
+            names.append(item["name"])
+    return names
+
+
+def normalize_row(row: dict) -> dict:
+    """
+    전처리 행(index, department, title, date, content, url, attachments) → 정규화된 문서 행
+    - 교과목은 date 컬럼에 학수번호가 들어 있음 → course_id로 옮기고 날짜는 '상시'
+    """
+    code = notice_type_code(row["index"])
+    if code == "course":
+        date = "상시"
+        course_id = "해당없음" if is_missing(row["date"]) else str(row["date"]).strip()
+    else:
+        date, course_id = normalize_date(row["date"]), "해당없음"
+    attachment_names = parse_attachment_names(row.get("attachments"))
+    return {
+        "original_id": str(row["index"]),
+        "notice_type": NOTICE_TYPE_MAPPING.get(code, code),
+        "department": str(row["department"]),
+        "title": clean_text(row["title"]),
+        "content": clean_text(row["content"]),
+        "url": "" if is_missing(row.get("url")) else str(row["url"]),
+        "date": date,
+        "course_id": course_id,
+        "attachment_names": attachment_names,
+        "has_attachment": bool(attachment_names),
+    }
+
+
+def _clean_series(series):
+    """clean_text의 컬럼 단위 버전"""
+    return (
+        series.fillna("").astype(str)
+        .str.replace(_TAG_PATTERN, " ", regex=True)
+        .str.split().str.join(" ")
+    )
+
+
+def _parse_attachment_column(series, workers=None):
+    """
+    첨부파일 문자열 컬럼 → 파일명 리스트 컬럼
+    - 같은 문자열은 한 번만 파싱, 고유 값이 많으면 프로세스 풀에서 literal_eval
+    """
+    present = series[~series.map(is_missing)]
+    unique = list(dict.fromkeys(present.astype(str)))
+    if len(unique) >= ATTACHMENT_PARALLEL_MIN:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parsed = list(ex.map(parse_attachment_names, unique, chunksize=256))
+    else:
+        parsed = [parse_attachment_names(raw) for raw in unique]
+    names_by_raw = dict(zip(unique, parsed))
+    return series.map(lambda raw: [] if is_missing(raw) else names_by_raw[str(raw)])
+
+
+def normalize_frame(df, workers=None):
+    """
+    normalize_row의 DataFrame 버전 (CSV를 읽는 벡터DB 구축 경로용, 결과 동일)
+    - 정규식 정리 / notice_type / 날짜는 컬럼 연산, 첨부파일 파싱만 병렬 worker
+    """
+    # 스트리밍 전처리(json_to_csv_ver_funct.py)는 pandas 없이 동작하도록 여기서만 import
+    import numpy as np
+    import pandas as pd
+
+    index = df["index"].astype(str)
+    code = pd.Series(
+        np.where(index.str.contains("_", regex=False), index.str.rsplit("_", n=1).str[0], "general"),
+        index=df.index,
+    )
+    is_course = (code == "course").to_numpy()
+
+    raw_date = df["date"]
+    date_missing = raw_date.map(is_missing).to_numpy(dtype=bool)
+    date_str = raw_date.astype(str)
+
+    url = df["url"]
+    attachment_names = _parse_attachment_column(df["attachments"], workers)
+
+    return pd.DataFrame({
+        "original_id": index,
+        "notice_type": code.map(NOTICE_TYPE_MAPPING).fillna(code),
+        "department": df["department"].astype(str),
+        "title": _clean_series(df["title"]),
+        "content": _clean_series(df["content"]),
+        "url": np.where(url.map(is_missing).to_numpy(dtype=bool), "", url.astype(str)),
+        "date": np.where(
+            is_course, "상시",
+            np.where(date_missing, "날짜미상", date_str.str.replace(".", "-", regex=False)),
+        ),
+        "course_id": np.where(is_course & ~date_missing, date_str.str.strip(), "해당없음"),
+        "attachment_names": attachment_names,
+        "has_attachment": attachment_names.map(len) > 0,
+    }, index=df.index)
@@ -0,0 +1 @@
+"""홍익대 RAG 챗봇 질의(검색/답변) 경로 공통 모듈"""
@@ -0,0 +1,69 @@
+"""
+RAG API(rag_core/server.py) 클라이언트
+- RAGEngine과 같은 stream_answer / stats 인터페이스 → 앱은 in-process 엔진과 원격 API를 구분하지 않음
+- SSE 응답을 줄 단위로 읽어서 ("meta" | "token" | "done", data) 이벤트로 변환
+"""
+
+import json
+
+import requests
+from langchain_core.documents import Document
+
+REQUEST_TIMEOUT = (5, 120)   # (연결, 읽기) 초 - 읽기는 토큰 사이 간격 기준
+HEALTH_TIMEOUT = (2, 3)      # /health는 짧게 (사이드바 통계 조회가 UI를 오래 막지 않도록)
+
+
+def iter_sse(lines):
+    """SSE 줄 스트림 → (event, data 문자열)"""
+    event, data = "message", []
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].lstrip())
+
+
+class RAGClient:
+
+    def __init__(self, base_url: str, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def stream_answer(self, query: str, history=(), category_filter: str = None,
+                      max_age_days: int = None, quick: bool = False):
+        payload = {
+            "query": query,
+            "history": [list(turn) for turn in history],
+            "category": category_filter,
+            "max_age_days": max_age_days,
+            "quick": quick,
+        }
+        with self._session.post(f"{self.base_url}/answer", json=payload, stream=True,
+                                timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            for event, raw in iter_sse(resp.iter_lines(decode_unicode=True)):
+                data = json.loads(raw)
+                if event == "meta":
+                    data["docs"] = [
+                        Document(page_content=d["page_content"], metadata=d["metadata"])
+                        for d in data.get("docs", [])
+                    ]
+                    yield event, data
+                elif event == "token":
+                    yield event, data["text"]
+                elif event == "error":
+                    raise RuntimeError(data.get("message", "RAG API 오류"))
+                else:
+                    yield event, data
+
+    def stats(self) -> dict:
+        resp = self._session.get(f"{self.base_url}/health", timeout=HEALTH_TIMEOUT)
+        resp.raise_for_status()
+        return resp.json().get("stats", {})
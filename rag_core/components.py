@@ -0,0 +1,108 @@
+"""
+RAG 구성요소 생성 (Streamlit 비의존)
+- retriever: Chroma(자식 벡터) + SQLite docstore(부모 원본) + 부모 LRU 캐시
+- chain: 프롬프트 | gpt-4o-mini | 문자열 파서
+"""
+
+from pathlib import Path
+
+from langchain_openai import ChatOpenAI
+from langchain_chroma import Chroma
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.output_parsers import StrOutputParser
+from langchain.retrievers import ParentDocumentRetriever
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from build_vector_db.embedding_cache import get_cached_embeddings
+from build_vector_db.parent_store import SQLiteDocStore, LRUParentCache, PARENT_CACHE_MAX_BYTES
+from build_vector_db.index_manifest import IndexVersionWatcher
+from build_vector_db.chroma_shards import ShardRouter
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHROMA_DIR = BASE_DIR / "build_vector_db" / "chroma_db"
+DOCSTORE_PATH = BASE_DIR / "build_vector_db" / "docstore.db"
+INDEX_MANIFEST_PATH = BASE_DIR / "build_vector_db" / "index_manifest.json"
+LLM_CACHE_DB = BASE_DIR / "build_vector_db" / "llm_cache" / "llm_cache.db"
+COLLECTION_NAME = "hongik_data"
+EMBEDDING_MODEL = "text-embedding-3-large"
+LLM_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = '''당신은 홍익대학교 학사 정보 안내 챗봇입니다.
+
+역할:
+- 학생들의 질문에 친절하고 정확하게 답변합니다
+- 제공된 참고 문서를 바탕으로 최신 정보를 제공합니다
+- 검색 결과에 URL이 있다면 반드시 포함하여 안내합니다
+
+참고 문서 활용 방법:
+- 각 문서에는 제목, 날짜, 분류, 학과, URL, 내용이 포함되어 있습니다
+- 여러 문서가 있을 때는 날짜가 최근인 정보를 우선적으로 안내하세요
+
+답변 규칙:
+1. 참고 문서의 제목과 날짜를 언급하여 신뢰성을 높입니다
+2. 여러 결과가 있을 경우 각각을 구분하여 간략히 요약합니다
+3. URL은 "자세한 내용: [URL]" 형식으로 반드시 안내합니다
+4. 검색 결과가 없거나 관련 정보가 없으면 솔직하게 알려줍니다
+5. 이전 대화 내용을 참고하여 맥락에 맞는 답변을 제공합니다
+'''
+
+
+def make_child_splitter():
+    """구축 때와 같은 child splitter (400자 / 50자 겹침)"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=400,
+        chunk_overlap=50,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def load_retriever(
+    chroma_dir=CHROMA_DIR,
+    docstore_path=DOCSTORE_PATH,
+    manifest_path=INDEX_MANIFEST_PATH,
+    parent_cache_max_bytes: int = PARENT_CACHE_MAX_BYTES,
+    embeddings=None,
+):
+    """ParentDocumentRetriever 재구성 (구축 때와 같은 임베딩/splitter 설정)"""
+    # 질문 임베딩도 디스크 캐시 경유 (같은 질문은 API 호출 X)
+    if embeddings is None:
+        embeddings = get_cached_embeddings(EMBEDDING_MODEL)
+
+    vectorstore = Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=str(chroma_dir)
+    )
+
+    # 자주 묻는 부모 문서는 메모리에서 바로 반환 (docstore I/O 최소화)
+    docstore = LRUParentCache(
+        SQLiteDocStore(docstore_path),
+        max_bytes=parent_cache_max_bytes,
+        version_watcher=IndexVersionWatcher(manifest_path)
+    )
+
+    return ParentDocumentRetriever(
+        vectorstore=vectorstore,
+        docstore=docstore,
+        child_splitter=make_child_splitter(),
+        parent_splitter=None
+    )
+
+
+def load_shard_router(chroma_dir=CHROMA_DIR, manifest_path=INDEX_MANIFEST_PATH, embeddings=None):
+    """notice_type별 샤드 라우터 (매니페스트에 샤드가 없으면 available=False → 본 컬렉션 사용)"""
+    return ShardRouter(embeddings or get_cached_embeddings(EMBEDDING_MODEL), chroma_dir, manifest_path)
+
+
+def build_chain(llm=None):
+    """프롬프트 | LLM | 문자열 파서"""
+    if llm is None:
+        llm = ChatOpenAI(model=LLM_MODEL, temperature=0, streaming=True)
+
+    prompt = ChatPromptTemplate.from_messages([
+        ('system', SYSTEM_PROMPT),
+        MessagesPlaceholder(variable_name="history"),
+        ('human', '질문: {question}\n\n참고 문서:\n{context}'),
+    ])
+
+    return prompt | llm | StrOutputParser()
@@ -0,0 +1,176 @@
+"""
+토큰 예산 기반 컨텍스트 구성 (format_context 대체)
+- 기존: 리랭크 상위 20개 부모(= 공지 전문, parent_splitter=None)를 통째로 프롬프트에 붙임
+  → 긴 공지 몇 개만 섞여도 프롬프트가 수만 토큰 (LLM 지연/비용 증가)
+- 여기서는 tiktoken으로 세면서 리랭크 순서대로 예산(budget)까지만 담음
+    짧은 부모 : 전문
+    긴 부모   : 검색에 걸린 child 조각(retrieve_documents의 child_windows)만 원문 순서대로 (겹치는 조각은 합침)
+                child 원문이 없으면(서빙 인덱스 경로 / BM25로만 찾은 문서) 구축 때와 같은 splitter로
+                나눈 조각 중 질문 토큰과 많이 겹치는 것
+    예산 초과 : 마지막 문서는 남은 토큰만큼 자르고, 그 뒤 문서는 제외
+- 질문마다 전문을 붙였을 때 대비 줄어든 토큰 수를 같이 반환
+  (패킹하면서 센 문서별 토큰 수의 합 - 통계만을 위해 전체 컨텍스트를 다시 인코딩하지 않음)
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from build_vector_db.index_manifest import make_parent_key, make_parent_id
+from build_vector_db.lexical_index import tokenize
+from rag_core.retrieval import format_document, CONTEXT_SEPARATOR
+
+TOKENIZER_MODEL = "gpt-4o-mini"
+CONTEXT_TOKEN_BUDGET = 6000       # 참고 문서 전체 토큰 상한
+LONG_PARENT_TOKENS = 800          # 본문이 이보다 길면 child 조각만
+MAX_WINDOWS_PER_PARENT = 3        # 긴 부모에서 가져오는 child 조각 수
+MIN_DOC_TOKENS = 120              # 남은 예산이 이보다 적으면 다음 문서는 넣지 않음
+WINDOW_GAP = "\n(...)\n"
+TRUNCATION_MARK = " ..."
+
+
+@dataclass
+class PackedContext:
+    context: str
+    docs: list = field(default_factory=list)   # 실제로 들어간 문서 (순서 = [문서 n] 번호)
+    tokens: int = 0                            # 패킹된 컨텍스트 토큰 수
+    full_tokens: int = 0                       # 검토한 부모를 전문으로 붙였을 때 (예산 때문에 보지 않은 문서는 제외)
+    windowed: int = 0                          # child 조각만 넣은 문서 수
+    dropped: int = 0                           # 예산 때문에 빠진 문서 수
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.full_tokens - self.tokens)
+
+    def summary(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "full_tokens": self.full_tokens,
+            "saved_tokens": self.saved_tokens,
+            "docs": len(self.docs),
+            "windowed": self.windowed,
+            "dropped": self.dropped,
+        }
+
+
+@lru_cache(maxsize=4)
+def _encoding(model: str = TOKENIZER_MODEL):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = TOKENIZER_MODEL) -> int:
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def _truncate(text: str, max_tokens: int, model: str = TOKENIZER_MODEL) -> str:
+    """max_tokens 이내로 자름 (뒤에 붙이는 TRUNCATION_MARK 토큰까지 포함)"""
+    enc = _encoding(model)
+    ids = enc.encode(text, disallowed_special=())
+    if len(ids) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - len(enc.encode(TRUNCATION_MARK)))
+    return enc.decode(ids[:keep]) + TRUNCATION_MARK
+
+
+def _merge_windows(text: str, windows) -> str:
+    """child 조각들 → 원문 위치 순서로 정렬, 겹치거나 붙어 있는 구간은 합쳐서 이어 붙임"""
+    spans = []
+    for window in windows:
+        start = text.find(window)
+        if start >= 0:
+            spans.append((start, start + len(window)))
+    if not spans:
+        return WINDOW_GAP.join(windows)
+    spans.sort()
+    merged = [list(spans[0])]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    body = WINDOW_GAP.join(text[start:end].strip() for start, end in merged)
+    if merged[0][0] > 0:
+        body = "(...) " + body
+    if merged[-1][1] < len(text):
+        body = body + " (...)"
+    return body
+
+
+def _lexical_windows(text: str, query: str, n: int):
+    """child 원문이 없을 때: 구축 때와 같은 splitter로 나눈 조각 중 질문 토큰이 많이 겹치는 n개"""
+    from rag_core.components import make_child_splitter
+
+    query_terms = set(tokenize(query))
+    chunks = make_child_splitter().split_text(text)
+    scored = sorted(
+        range(len(chunks)),
+        key=lambda i: (-sum(1 for t in tokenize(chunks[i]) if t in query_terms), i),
+    )
+    return [chunks[i] for i in scored[:n]]
+
+
+def pack_context(docs, query: str, child_windows: dict = None, budget: int = CONTEXT_TOKEN_BUDGET,
+                 long_parent_tokens: int = LONG_PARENT_TOKENS,
+                 max_windows: int = MAX_WINDOWS_PER_PARENT, model: str = TOKENIZER_MODEL) -> PackedContext:
+    """
+    리랭크 순서의 부모 문서 → 토큰 예산 안의 참고 문서 문자열
+    - child_windows: {parent_id: [(child 본문, distance), ...]} (retrieve_documents가 채운 것)
+    """
+    child_windows = child_windows or {}
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR, model)
+
+    parts, included = [], []
+    used = windowed = full_tokens = 0
+    for pos, doc in enumerate(docs):
+        content = doc.page_content
+        content_tokens = count_tokens(content, model)
+        # 전문을 붙였을 때 (기존 format_context): 머리글 + 본문 + 구분자
+        full_tokens += content_tokens + count_tokens(format_document(pos + 1, doc, ""), model)
+        full_tokens += separator_tokens if pos else 0
+        is_windowed = False
+        if content_tokens > long_parent_tokens:
+            pid = make_parent_id(make_parent_key(doc.metadata or {}))
+            windows = [text for text, _ in child_windows.get(pid, [])[:max_windows]]
+            if not windows:
+                windows = _lexical_windows(content, query, max_windows)
+            content = _merge_windows(doc.page_content, windows)
+            is_windowed = True
+
+        idx = len(included) + 1
+        overhead = separator_tokens if included else 0
+        part = format_document(idx, doc, content)
+        part_tokens = count_tokens(part, model) + overhead
+        if used + part_tokens > budget:
+            header_tokens = count_tokens(format_document(idx, doc, ""), model) + overhead
+            remaining = budget - used - header_tokens
+            if remaining < MIN_DOC_TOKENS:
+                return _packed(parts, included, used, full_tokens, windowed, len(docs) - pos)
+            part = format_document(idx, doc, _truncate(content, remaining, model))
+            part_tokens = count_tokens(part, model) + overhead
+            # 자른 경계에서 토큰이 다시 합쳐지며 조금 넘칠 수 있음 → 넘친 만큼 더 자름
+            while used + part_tokens > budget and remaining > 0:
+                remaining -= used + part_tokens - budget
+                part = format_document(idx, doc, _truncate(content, remaining, model))
+                part_tokens = count_tokens(part, model) + overhead
+
+        parts.append(part)
+        included.append(doc)
+        used += part_tokens
+        windowed += is_windowed
+
+    return _packed(parts, included, used, full_tokens, windowed, 0)
+
+
+def _packed(parts, included, used, full_tokens, windowed, dropped) -> PackedContext:
+    return PackedContext(
+        context=CONTEXT_SEPARATOR.join(parts),
+        docs=included,
+        tokens=used,
+        full_tokens=full_tokens,
+        windowed=windowed,
+        dropped=dropped,
+    )
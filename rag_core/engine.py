@@ -0,0 +1,375 @@
+"""
+RAG 엔진 (Streamlit / HTTP 비의존)
+- retriever(Chroma + docstore), 리랭크용 인덱스(사이드카/BM25/서빙/샤드), 체인, 답변 캐시를 한 객체가 소유
+- 질문 하나 → 이벤트 스트림
+    ("meta",  {"similarity", "docs", "rerank_debug", "source"})   source: quick / cache / llm / empty
+    ("token", "답변 조각")
+    ("done",  {"timings": 단계별 소요 시간(ms), "context": 컨텍스트 토큰 수 / 절약한 토큰 수 (LLM 호출 시)})
+- 참고 문서는 토큰 예산 안에서 구성 (rag_core/context_packer.py, 긴 공지는 검색에 걸린 child 조각만)
+- stream_answer(동기, Streamlit in-process) / astream_answer(asyncio, HTTP 서버) 두 경로
+- 같은 질문 동시 요청은 single-flight로 합침 (rag_core/single_flight.py)
+- asyncio 경로의 질문 임베딩/벡터 검색은 동시 질문끼리 micro-batch (rag_core/query_batcher.py)
+- 세션 상태를 건드리지 않음 → Streamlit 앱(in-process)과 HTTP 서버(rag_core/server.py)가 같은 엔진 사용
+- 로컬 테스트: rag_core/fakes.py의 가짜 임베딩/LLM으로 build_fake_engine()
+"""
+
+import asyncio
+from pathlib import Path
+from dataclasses import dataclass, field
+
+from build_vector_db.index_manifest import IndexVersionWatcher, make_parent_key, make_parent_id
+from rag_core.retrieval import retrieve_documents, aretrieve_documents
+from rag_core.context_packer import pack_context, CONTEXT_TOKEN_BUDGET
+from rag_core.semantic_cache import replay_stream
+from rag_core.timing import StageTimer
+from rag_core.single_flight import SingleFlight, ThreadSingleFlight, coalesce_key
+from rag_core.query_batcher import QueryBatcher
+
+ANSWER_TOP_K = 20
+NO_RESULT_MESSAGE = "검색 결과가 없습니다. 질문을 더 구체적으로 입력해주세요."
+NO_RESULT_META = {"similarity": None, "docs": [], "rerank_debug": [], "source": "empty"}
+
+
+@dataclass
+class RetrievalResult:
+    docs: list = field(default_factory=list)
+    similarity: float = 0.0
+    rerank_debug: list = field(default_factory=list)
+    child_windows: dict = field(default_factory=dict)   # {parent_id: [(child 본문, distance), ...]}
+
+
+def answer_cache_category(category_filter: str = None, max_age_days: int = None):
+    """의미 캐시 키의 카테고리 부분 (기간 필터가 다르면 다른 답변)"""
+    return category_filter if not max_age_days else f"{category_filter}|{max_age_days}d"
+
+
+class RAGEngine:
+
+    def __init__(
+        self,
+        retriever,
+        chain,
+        sidecar=None,
+        lexical_index=None,
+        serving_index=None,
+        shard_router=None,
+        semantic_cache=None,
+        quick_answers=None,
+        version_watcher=None,
+        coalesce: bool = True,
+        batch_queries: bool = True,
+        context_token_budget: int = CONTEXT_TOKEN_BUDGET,
+    ):
+        self.retriever = retriever
+        self.chain = chain
+        self.sidecar = sidecar
+        self.lexical_index = lexical_index
+        self.serving_index = serving_index
+        self.shard_router = shard_router
+        self.semantic_cache = semantic_cache
+        self.quick_answers = quick_answers
+        self.version_watcher = version_watcher
+        self.context_token_budget = context_token_budget
+        # 같은 질문 동시 요청은 검색/LLM 스트림 하나를 공유 (None이면 요청마다 따로 실행)
+        self.flights = SingleFlight() if coalesce else None
+        self.thread_flights = ThreadSingleFlight() if coalesce else None
+        # asyncio 경로: 동시 질문의 임베딩/벡터 검색을 몇 ms 모아서 한 번에 (None이면 질문별)
+        self.batcher = QueryBatcher(
+            retriever.vectorstore.embeddings, retriever.vectorstore, serving_index
+        ) if batch_queries else None
+
+    @classmethod
+    def from_index(
+        cls,
+        chroma_dir=None,
+        docstore_path=None,
+        manifest_path=None,
+        parent_cache_max_bytes: int = None,
+        llm=None,
+        use_llm_cache: bool = True,
+    ):
+        """구축된 인덱스(build_vector_db/)로 엔진 생성 - 인덱스 파일이 없으면 FileNotFoundError"""
+        from rag_core import components
+        from rag_core.semantic_cache import SemanticAnswerCache
+        from rag_core.quick_answers import QuickAnswerStore
+        from build_vector_db.metadata_sidecar import MetadataSidecar
+        from build_vector_db.lexical_index import LexicalIndex
+        from build_vector_db.serving_index import ServingIndex
+        from build_vector_db.parent_store import PARENT_CACHE_MAX_BYTES
+
+        chroma_dir = Path(chroma_dir or components.CHROMA_DIR)
+        docstore_path = Path(docstore_path or components.DOCSTORE_PATH)
+        manifest_path = Path(manifest_path or components.INDEX_MANIFEST_PATH)
+
+        if not chroma_dir.exists():
+            raise FileNotFoundError(f"ChromaDB를 찾을 수 없습니다: {chroma_dir} (먼저 벡터DB 구축 스크립트를 실행하세요)")
+        if not docstore_path.exists():
+            raise FileNotFoundError(
+                f"Docstore를 찾을 수 없습니다: {docstore_path} "
+                f"(기존 docstore 폴더가 있다면 python build_vector_db/parent_store.py --migrate)"
+            )
+
+        if use_llm_cache:
+            from langchain_community.cache import SQLiteCache
+            from langchain_core.globals import set_llm_cache
+
+            components.LLM_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+            set_llm_cache(SQLiteCache(database_path=str(components.LLM_CACHE_DB)))
+
+        retriever = components.load_retriever(
+            chroma_dir, docstore_path, manifest_path,
+            parent_cache_max_bytes=parent_cache_max_bytes or PARENT_CACHE_MAX_BYTES
+        )
+        return cls(
+            retriever,
+            components.build_chain(llm),
+            sidecar=MetadataSidecar(),
+            lexical_index=LexicalIndex(),
+            serving_index=ServingIndex(version_watcher=IndexVersionWatcher(manifest_path)),
+            shard_router=components.load_shard_router(chroma_dir, manifest_path, retriever.vectorstore.embeddings),
+            semantic_cache=SemanticAnswerCache(version_watcher=IndexVersionWatcher(manifest_path)),
+            quick_answers=QuickAnswerStore(version_watcher=IndexVersionWatcher(manifest_path)),
+            version_watcher=IndexVersionWatcher(manifest_path),
+        )
+
+    @property
+    def embeddings(self):
+        return self.retriever.vectorstore.embeddings
+
+    # ---------------- 검색 ---------------- #
+
+    def retrieve(self, query: str, category_filter: str = None, k: int = ANSWER_TOP_K,
+                 max_age_days: int = None, query_embedding=None) -> RetrievalResult:
+        """child 검색 + BM25 → RRF → 최신성 리랭크 → 상위 k개 부모"""
+        child_windows = {}
+        docs, similarity, rerank_debug = retrieve_documents(
+            self.retriever, query, category_filter, k,
+            sidecar=self.sidecar,
+            max_age_days=max_age_days,
+            lexical_index=self.lexical_index,
+            serving_index=self.serving_index,
+            shard_router=self.shard_router,
+            query_embedding=query_embedding,
+            child_windows=child_windows
+        )
+        return RetrievalResult(docs, similarity, rerank_debug, child_windows)
+
+    async def aretrieve(self, query: str, category_filter: str = None, k: int = ANSWER_TOP_K,
+                        max_age_days: int = None, query_embedding=None, timer=None) -> RetrievalResult:
+        """retrieve의 asyncio 버전 (임베딩 ∥ BM25, hydrate ∥ 최신성 리랭크)"""
+        child_windows = {}
+        docs, similarity, rerank_debug = await aretrieve_documents(
+            self.retriever, query, category_filter, k,
+            sidecar=self.sidecar,
+            max_age_days=max_age_days,
+            lexical_index=self.lexical_index,
+            serving_index=self.serving_index,
+            shard_router=self.shard_router,
+            query_embedding=query_embedding,
+            timer=timer,
+            batcher=self.batcher,
+            child_windows=child_windows
+        )
+        return RetrievalResult(docs, similarity, rerank_debug, child_windows)
+
+    # ---------------- 답변 ---------------- #
+
+    def _quick_answer(self, query, category_filter, max_age_days, quick):
+        """빠른 질문 버튼 → 사전계산 답변 (기간 필터가 없을 때만)"""
+        if not quick or max_age_days or self.quick_answers is None:
+            return None
+        return self.quick_answers.get(category_filter or "전체", query)
+
+    @staticmethod
+    def _replay(meta, chunks, timer):
+        """LLM 호출 없이 끝나는 답변 (사전계산 / 검색 결과 없음 / 의미 캐시 적중)"""
+        yield "meta", meta
+        timer.mark("first_token")
+        for chunk in chunks:
+            yield "token", chunk
+        timer.mark("total")
+        yield "done", {"timings": timer.summary()}
+
+    def _chain_input(self, query, history, result: RetrievalResult, timer):
+        """토큰 예산 안으로 참고 문서 구성 → (체인 입력, 컨텍스트 통계)"""
+        with timer.stage("pack_context"):
+            packed = pack_context(result.docs, query, result.child_windows, budget=self.context_token_budget)
+        chain_input = {
+            "question": query,
+            "context": packed.context,
+            "history": [tuple(turn) for turn in history]
+        }
+        return chain_input, packed.summary()
+
+    def stream_answer(self, query: str, history=(), category_filter: str = None,
+                      max_age_days: int = None, quick: bool = False):
+        """
+        질문 → ("meta" | "token" | "done", data) 이벤트 (동기, Streamlit in-process용)
+        - quick: 빠른 질문 버튼 → 사전계산 답변이 있으면 그대로 (기간 필터가 없을 때만)
+        - history: [("user" | "assistant", 내용), ...] 최근 대화
+        - done 이벤트의 timings: 단계별 소요 시간(ms), first_token = 첫 토큰까지
+        - 같은 질문이 진행 중이면 그 스트림에 합류 (meta에 coalesced=True)
+        """
+        history = [tuple(turn) for turn in history]
+
+        def run():
+            return self._stream_answer(query, history, category_filter, max_age_days, quick)
+
+        if self.thread_flights is None:
+            yield from run()
+            return
+        key = coalesce_key(query, history, category_filter, max_age_days, quick)
+        yield from self.thread_flights.subscribe(key, run)
+
+    def _stream_answer(self, query, history, category_filter, max_age_days, quick):
+        timer = StageTimer()
+        precomputed = self._quick_answer(query, category_filter, max_age_days, quick)
+        if precomputed is not None:
+            answer, similarity, docs = precomputed
+            yield from self._replay(
+                {"similarity": similarity, "docs": docs, "rerank_debug": [], "source": "quick"}, [answer], timer
+            )
+            return
+
+        with timer.stage("embed"):
+            query_embedding = self.embeddings.embed_query(query)
+        with timer.stage("retrieve"):
+            result = self.retrieve(query, category_filter, ANSWER_TOP_K, max_age_days, query_embedding)
+        yield from self._answer_events(
+            query, history, category_filter, max_age_days, result, query_embedding, timer
+        )
+
+    def _answer_events(self, query, history, category_filter, max_age_days, result, query_embedding, timer):
+        if not result.docs:
+            yield from self._replay(NO_RESULT_META, [NO_RESULT_MESSAGE], timer)
+            return
+
+        # 의미 캐시: 같은 카테고리 + 같은 검색 문서 집합 + 비슷한 질문이면 저장된 답변 재생
+        # (대화 이력이 있으면 답변이 이전 대화에 따라 달라지므로 조회/저장 모두 안 함)
+        parent_ids = [make_parent_id(make_parent_key(doc.metadata or {})) for doc in result.docs]
+        cache_category = answer_cache_category(category_filter, max_age_days)
+        use_cache = self.semantic_cache is not None and not history
+        cached_answer = None
+        if use_cache:
+            with timer.stage("answer_cache"):
+                cached_answer = self.semantic_cache.lookup(query_embedding, cache_category, parent_ids)
+
+        meta = {"similarity": result.similarity, "docs": result.docs, "rerank_debug": result.rerank_debug}
+        if cached_answer is not None:
+            yield from self._replay({**meta, "source": "cache"}, replay_stream(cached_answer), timer)
+            return
+
+        chain_input, context_stats = self._chain_input(query, history, result, timer)
+        yield "meta", {**meta, "source": "llm"}
+        full_answer = ""
+        for chunk in self.chain.stream(chain_input):
+            if not full_answer:
+                timer.mark("first_token")
+            full_answer += chunk
+            yield "token", chunk
+        timer.mark("total")
+
+        if use_cache:
+            self.semantic_cache.store(query, query_embedding, cache_category, parent_ids, full_answer)
+        yield "done", {"timings": timer.summary(), "context": context_stats}
+
+    async def astream_answer(self, query: str, history=(), category_filter: str = None,
+                             max_age_days: int = None, quick: bool = False):
+        """
+        stream_answer의 asyncio 버전 (HTTP 서버용, 이벤트 형식 동일)
+        - 질문 임베딩을 먼저 시작 → 검색(BM25와 겹침)과 의미 캐시 조회가 같은 임베딩을 기다림
+        - 컨텍스트가 만들어지는 즉시 chain.astream으로 LLM 요청 (이벤트 루프를 막지 않음)
+        - 같은 질문이 진행 중이면 그 스트림에 합류 (meta에 coalesced=True)
+        """
+        history = [tuple(turn) for turn in history]
+
+        def run():
+            return self._astream_answer(query, history, category_filter, max_age_days, quick)
+
+        if self.flights is None:
+            async for event in run():
+                yield event
+            return
+        key = coalesce_key(query, history, category_filter, max_age_days, quick)
+        async for event in self.flights.subscribe(key, run):
+            yield event
+
+    async def _astream_answer(self, query, history, category_filter, max_age_days, quick):
+        timer = StageTimer()
+        precomputed = self._quick_answer(query, category_filter, max_age_days, quick)
+        if precomputed is not None:
+            answer, similarity, docs = precomputed
+            for event in self._replay(
+                {"similarity": similarity, "docs": docs, "rerank_debug": [], "source": "quick"}, [answer], timer
+            ):
+                yield event
+            return
+
+        embed_task = asyncio.ensure_future(
+            self.batcher.embed_query(query) if self.batcher is not None else self.embeddings.aembed_query(query)
+        )
+        try:
+            with timer.stage("retrieve"):
+                result = await self.aretrieve(
+                    query, category_filter, ANSWER_TOP_K, max_age_days, query_embedding=embed_task, timer=timer
+                )
+            query_embedding = await embed_task
+        finally:
+            embed_task.cancel()
+
+        if not result.docs:
+            for event in self._replay(NO_RESULT_META, [NO_RESULT_MESSAGE], timer):
+                yield event
+            return
+
+        parent_ids = [make_parent_id(make_parent_key(doc.metadata or {})) for doc in result.docs]
+        cache_category = answer_cache_category(category_filter, max_age_days)
+        use_cache = self.semantic_cache is not None and not history   # 대화 이력이 있으면 의미 캐시 X
+
+        cached_answer = None
+        if use_cache:
+            with timer.stage("answer_cache"):
+                cached_answer = await asyncio.to_thread(
+                    self.semantic_cache.lookup, query_embedding, cache_category, parent_ids
+                )
+
+        meta = {"similarity": result.similarity, "docs": result.docs, "rerank_debug": result.rerank_debug}
+        if cached_answer is not None:
+            for event in self._replay({**meta, "source": "cache"}, replay_stream(cached_answer), timer):
+                yield event
+            return
+
+        chain_input, context_stats = await asyncio.to_thread(self._chain_input, query, history, result, timer)
+        yield "meta", {**meta, "source": "llm"}
+        full_answer = ""
+        async for chunk in self.chain.astream(chain_input):
+            if not full_answer:
+                timer.mark("first_token")
+            full_answer += chunk
+            yield "token", chunk
+        timer.mark("total")
+
+        if use_cache:
+            await asyncio.to_thread(
+                self.semantic_cache.store, query, query_embedding, cache_category, parent_ids, full_answer
+            )
+        yield "done", {"timings": timer.summary(), "context": context_stats}
+
+    # ---------------- 상태 ---------------- #
+
+    def stats(self) -> dict:
+        """캐시 적중률 등 (사이드바 / /health)"""
+        stats = {"index_version": self.version_watcher.current() if self.version_watcher else None}
+        for name, obj in (("embedding_cache", self.embeddings),
+                          ("answer_cache", self.semantic_cache),
+                          ("parent_cache", self.retriever.docstore)):
+            if hasattr(obj, "stats"):
+                stats[name] = obj.stats()
+        if self.batcher is not None:
+            stats["query_batcher"] = self.batcher.stats()
+        if self.flights is not None:
+            stats["single_flight"] = {
+                name: self.flights.stats()[name] + self.thread_flights.stats()[name]
+                for name in ("started", "joined", "in_flight")
+            }
+        return stats
@@ -0,0 +1,139 @@
+"""
+로컬 테스트용 가짜 백엔드 (OpenAI API 키 / 구축된 인덱스 없이 엔진·서버·앱 실행)
+- FakeEmbeddings: 글자 bigram 해싱 벡터 (결정적, 같은 단어를 공유하는 문장끼리 가까움)
+- FakeChatModel: 프롬프트의 질문/문서 제목으로 답변을 만들어 조각 단위로 스트리밍
+- build_fake_engine: 메모리 Chroma + InMemoryStore에 샘플 문서를 넣은 RAGEngine
+
+실행 예:
+    python -m rag_core.server --fake
+    RAG_FAKE_BACKENDS=1 streamlit run app_final.py
+"""
+
+import re
+import uuid
+import zlib
+import math
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_EMBEDDING_DIM = 256
+
+SAMPLE_DOCUMENTS = [
+    Document(
+        page_content="2025학년도 1학기 수강신청 일정 안내. 수강신청은 2월 10일부터 2월 14일까지 클래스넷에서 진행합니다.",
+        metadata={"title": "2025학년도 1학기 수강신청 일정 안내", "date": "2025-02-03", "notice_type": "대학공지",
+                  "department": "대학전체_교무처", "url": "https://www.hongik.ac.kr/fake/notice/1"},
+    ),
+    Document(
+        page_content="2025학년도 1학기 교내 장학금 신청 안내. 성적 장학금과 가계곤란 장학금 신청 기간은 3월 4일부터입니다.",
+        metadata={"title": "2025학년도 1학기 교내 장학금 신청 안내", "date": "2025-02-20", "notice_type": "대학공지",
+                  "department": "대학전체_학생처", "url": "https://www.hongik.ac.kr/fake/notice/2"},
+    ),
+    Document(
+        page_content="컴퓨터공학과 졸업 프로젝트 중간 발표 일정 공지. 발표는 4월 둘째 주 공학관에서 진행합니다.",
+        metadata={"title": "졸업 프로젝트 중간 발표 일정", "date": "2025-03-28", "notice_type": "학과공지",
+                  "department": "컴퓨터공학과", "url": "https://ce.hongik.ac.kr/fake/notice/3"},
+    ),
+    Document(
+        page_content="자료구조 (학수번호 101810). 선형 자료구조, 트리, 그래프와 탐색 알고리즘을 다룹니다. 3학점.",
+        metadata={"title": "자료구조", "date": "상시", "notice_type": "교과목/수강", "department": "컴퓨터공학과",
+                  "url": "", "course_id": "101810"},
+    ),
+]
+
+
+class FakeEmbeddings(Embeddings):
+    """글자 bigram → 해시 버킷 카운트 → L2 정규화 (API 호출 없음)"""
+
+    def __init__(self, dim: int = FAKE_EMBEDDING_DIM):
+        self.dim = dim
+        self.calls = 0
+
+    def _embed(self, text: str) -> list:
+        vec = [0.0] * self.dim
+        text = " ".join(str(text).split())
+        for i in range(max(1, len(text) - 1)):
+            vec[zlib.crc32(text[i:i + 2].encode("utf-8")) % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._embed(text)
+
+    def stats(self) -> dict:
+        """CachedEmbeddings.stats()와 같은 키 (캐시가 없으므로 전부 miss)"""
+        return {"hits": 0, "misses": self.calls, "hit_rate": 0.0, "entries": 0, "bytes": 0}
+
+
+class FakeChatModel(BaseChatModel):
+    """질문 + 참고 문서 제목으로 결정적인 답변 생성 (chunk_chars 글자씩 스트리밍)"""
+
+    chunk_chars: int = 8
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, messages) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        question = re.search(r"질문: (.*)", prompt)
+        titles = re.findall(r"^제목: (.*)$", prompt, flags=re.M)
+        urls = [u for u in re.findall(r"^URL: (.*)$", prompt, flags=re.M) if u and u != "URL 없음"]
+        answer = f"[테스트 답변] '{question.group(1) if question else ''}' 관련 문서 {len(titles)}건"
+        if titles:
+            answer += ": " + ", ".join(titles[:3])
+        if urls:
+            answer += f"\n자세한 내용: {urls[0]}"
+        return answer
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._answer(messages)
+        for i in range(0, len(text), self.chunk_chars):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + self.chunk_chars]))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def build_fake_engine(documents=None):
+    """
+    샘플 문서(또는 documents)로 메모리 인덱스를 만든 RAGEngine
+    - 부모 id는 빌더와 같은 make_parent_id(make_parent_key(metadata))
+    - 사이드카/BM25/서빙 인덱스/의미 캐시 없이 Chroma 검색 + 최신성 리랭크 경로만 사용
+    """
+    from langchain_chroma import Chroma
+    from langchain_core.stores import InMemoryStore
+    from langchain.retrievers import ParentDocumentRetriever
+
+    from build_vector_db.index_manifest import make_parent_key, make_parent_id
+    from rag_core.components import build_chain, make_child_splitter
+    from rag_core.engine import RAGEngine
+
+    documents = list(documents or SAMPLE_DOCUMENTS)
+    vectorstore = Chroma(
+        # 같은 프로세스에서 여러 번 만들어도 섞이지 않도록 컬렉션 이름을 매번 새로
+        collection_name=f"fake_{uuid.uuid4().hex[:8]}",
+        embedding_function=FakeEmbeddings(),
+    )
+    retriever = ParentDocumentRetriever(
+        vectorstore=vectorstore,
+        docstore=InMemoryStore(),
+        child_splitter=make_child_splitter(),
+        parent_splitter=None
+    )
+    retriever.add_documents(
+        documents, ids=[make_parent_id(make_parent_key(doc.metadata or {})) for doc in documents]
+    )
+    return RAGEngine(retriever, build_chain(FakeChatModel(cache=False)))
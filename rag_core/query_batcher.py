@@ -0,0 +1,121 @@
+"""
+질문 임베딩 / 벡터 검색 micro-batching (HTTP 서버의 asyncio 경로)
+- 동시에 들어온 질문들을 max_wait_ms 동안(또는 max_batch개가 찰 때까지) 모아서
+    임베딩: embed_documents 한 번 (임베딩 캐시 조회 1번 + 캐시에 없는 질문만 API 호출 1번)
+    검색  : 서빙 인덱스면 search_batch (블록 x 질문 행렬곱 한 번),
+            Chroma면 chroma_search_batch (collection.query에 질문 벡터 여러 개를 한 번에)
+- 검색은 같은 조건(k, 카테고리/필터)끼리만 묶음
+- 추가 지연은 최대 max_wait_ms (혼자 들어온 질문도 그 이상 기다리지 않음)
+- 개강/수강신청 기간처럼 동시 질문이 몰릴 때 초당 처리량을 올리기 위한 것 (한가할 때는 batch 크기 1)
+"""
+
+import json
+import asyncio
+
+QUERY_BATCH_MAX = 16            # 한 번에 묶는 최대 질문 수
+QUERY_BATCH_MAX_WAIT_MS = 5     # 첫 질문이 들어온 뒤 최대 대기 시간
+
+
+class MicroBatcher:
+    """
+    group_key별로 항목을 모아 run_batch(group_key, items) → 결과 목록을 스레드에서 한 번에 실행
+    - submit()은 자기 항목의 결과를 기다림 (실패하면 같은 배치의 모든 요청에 예외 전달)
+    """
+
+    def __init__(self, run_batch, max_batch: int = QUERY_BATCH_MAX, max_wait_ms: float = QUERY_BATCH_MAX_WAIT_MS):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending = {}   # group_key -> [(item, future)]
+        self._timers = {}
+        self._tasks = set()  # 이벤트 루프는 task를 약하게만 참조 → 배치 실행이 끝날 때까지 여기서 보관
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, group_key, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(group_key, [])
+        pending.append((item, future))
+        if len(pending) >= self.max_batch:
+            self._flush(group_key)
+        elif group_key not in self._timers:
+            self._timers[group_key] = loop.call_later(self.max_wait, self._flush, group_key)
+        return await future
+
+    def _flush(self, group_key):
+        timer = self._timers.pop(group_key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(group_key, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(group_key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group_key, batch):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await asyncio.to_thread(self.run_batch, group_key, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": self.items / self.batches if self.batches else 0.0,
+        }
+
+
+class QueryBatcher:
+    """RAGEngine이 소유 - 질문 임베딩 / 서빙 인덱스 검색 / Chroma 검색 배치"""
+
+    def __init__(self, embeddings, vectorstore=None, serving_index=None,
+                 max_batch: int = QUERY_BATCH_MAX, max_wait_ms: float = QUERY_BATCH_MAX_WAIT_MS):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.serving_index = serving_index
+        self._embed = MicroBatcher(self._embed_batch, max_batch, max_wait_ms)
+        self._serving = MicroBatcher(self._serving_batch, max_batch, max_wait_ms)
+        self._chroma = MicroBatcher(self._chroma_batch, max_batch, max_wait_ms)
+
+    # ---------------- 배치 실행 (스레드) ---------------- #
+
+    def _embed_batch(self, _, texts):
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, self.embeddings.embed_documents(unique)))
+        return [vectors[t] for t in texts]
+
+    def _serving_batch(self, group_key, embeddings):
+        k, notice_type = group_key
+        return self.serving_index.search_batch(embeddings, k=k, notice_type=notice_type)
+
+    def _chroma_batch(self, group_key, embeddings):
+        from build_vector_db.serving_index import chroma_search_batch
+
+        k, filter_json = group_key
+        return chroma_search_batch(self.vectorstore, embeddings, k=k, filter=json.loads(filter_json))
+
+    # ---------------- 요청 ---------------- #
+
+    async def embed_query(self, text: str):
+        return await self._embed.submit(None, text)
+
+    async def serving_search(self, query_embedding, k: int, notice_type: str = None):
+        """ServingIndex.search와 같은 반환 형식 (allowed_ids 없는 경우만)"""
+        return await self._serving.submit((k, notice_type), query_embedding)
+
+    async def chroma_search(self, query_embedding, k: int, filter: dict = None):
+        """Chroma similarity_search_by_vector_with_relevance_scores와 같은 반환 형식"""
+        return await self._chroma.submit((k, json.dumps(filter, sort_keys=True)), query_embedding)
+
+    def stats(self) -> dict:
+        return {"embed": self._embed.stats(), "serving": self._serving.stats(), "chroma": self._chroma.stats()}
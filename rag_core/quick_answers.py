@@ -0,0 +1,178 @@
+"""
+빠른 질문(QUICK_QUESTIONS) 답변 사전 계산
+- 사이드바 빠른 질문은 모든 사용자가 똑같이 누르므로
+  인덱스 구축 직후 카테고리별로 검색 결과 + 답변을 미리 만들어 JSON으로 저장
+- 앱은 저장된 답변/출처/신뢰도를 바로 보여줌
+- 저장 파일의 index_version이 현재 build_version과 다를 때만 다시 생성
+
+실행 (build_chroma_db 이후 자동 실행, 수동 실행도 가능):
+    python -m rag_core.quick_answers [--force]
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from build_vector_db.index_manifest import IndexVersionWatcher, read_build_version
+from rag_core.retrieval import retrieve_documents
+from rag_core.context_packer import pack_context
+
+QUICK_ANSWERS_PATH = Path(__file__).resolve().parent.parent / "build_vector_db" / "quick_answers.json"
+QUICK_ANSWER_TOP_K = 20
+
+QUICK_QUESTIONS = {
+    "전체": [
+        "최근 공지사항 알려줘",
+        "이번 학기 주요 일정은?",
+        "장학금 정보 알려줘"
+    ],
+    "대학공지": [
+        "학교 전체 공지사항 최근거 보여줘",
+        "대학원 입학 정보 알려줘",
+        "학사 일정 알려줘"
+    ],
+    "학과공지": [
+        "디자인학부 공지사항 알려줘",
+        "건축학부 최근 소식은?",
+        "컴퓨터공학부 공지 보여줘"
+    ],
+    "교과목/수강": [
+        "이번 학기 개설 과목 알려줘",
+        "수강신청 일정은?",
+        "교양 과목 추천해줘"
+    ]
+}
+
+
+def precompute_quick_answers(retriever, chain, index_version, out_path=QUICK_ANSWERS_PATH,
+                             sidecar=None, lexical_index=None, serving_index=None, shard_router=None):
+    """모든 빠른 질문에 대해 검색 + 답변 생성 후 저장"""
+    answers = {}
+    for category, questions in QUICK_QUESTIONS.items():
+        category_filter = None if category == "전체" else category
+        answers[category] = {}
+        for question in questions:
+            child_windows = {}
+            docs, avg_similarity, _ = retrieve_documents(
+                retriever, question, category_filter, k=QUICK_ANSWER_TOP_K,
+                sidecar=sidecar, lexical_index=lexical_index, serving_index=serving_index,
+                shard_router=shard_router, child_windows=child_windows
+            )
+            if docs:
+                answer = chain.invoke({
+                    "question": question,
+                    "context": pack_context(docs, question, child_windows).context,
+                    "history": []
+                })
+            else:
+                answer = "검색 결과가 없습니다. 질문을 더 구체적으로 입력해주세요."
+
+            answers[category][question] = {
+                "answer": answer,
+                "similarity": avg_similarity,
+                "docs": [
+                    {"page_content": d.page_content, "metadata": d.metadata}
+                    for d in docs
+                ],
+            }
+            print(f"   - [{category}] {question} ✔")
+
+    payload = {
+        "index_version": index_version,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "answers": answers,
+    }
+    out_path = str(out_path)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, out_path)
+    return payload
+
+
+def refresh_quick_answers(force: bool = False, out_path=QUICK_ANSWERS_PATH):
+    """인덱스 build_version이 바뀌었을 때만 빠른 질문 답변 재생성"""
+    from rag_core.components import INDEX_MANIFEST_PATH, load_retriever, load_shard_router, build_chain
+    from build_vector_db.metadata_sidecar import MetadataSidecar
+    from build_vector_db.lexical_index import LexicalIndex
+    from build_vector_db.serving_index import ServingIndex
+
+    index_version = read_build_version(str(INDEX_MANIFEST_PATH))
+    if index_version is None:
+        print("⚠️ 인덱스 매니페스트가 없어 빠른 질문 사전계산을 건너뜁니다.")
+        return None
+
+    if not force and os.path.exists(out_path):
+        try:
+            with open(out_path, "r", encoding="utf-8") as f:
+                saved_version = json.load(f).get("index_version")
+        except (OSError, ValueError):
+            saved_version = None
+        if saved_version == index_version:
+            print(f"✅ 빠른 질문 답변이 최신입니다. (build_version={index_version})")
+            return None
+
+    print(f"⚡ 빠른 질문 답변 사전계산 중... (build_version={index_version})")
+    payload = precompute_quick_answers(
+        load_retriever(), build_chain(), index_version, out_path,
+        sidecar=MetadataSidecar(), lexical_index=LexicalIndex(),
+        serving_index=ServingIndex(version_watcher=IndexVersionWatcher(INDEX_MANIFEST_PATH)),
+        shard_router=load_shard_router()
+    )
+    print(f"✅ 빠른 질문 답변 저장 완료: {out_path}")
+    return payload
+
+
+class QuickAnswerStore:
+    """
+    앱에서 사전계산 답변 조회
+    - 파일 mtime이 바뀌면 다시 로드
+    - 현재 인덱스 build_version과 다른 답변은 사용하지 않음 (일반 검색 경로로 처리)
+    """
+
+    def __init__(self, path=QUICK_ANSWERS_PATH, version_watcher=None):
+        self.path = str(path)
+        self.version_watcher = version_watcher
+        self._mtime = None
+        self._payload = {}
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self._mtime, self._payload = None, {}
+            return
+        if mtime != self._mtime:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._payload = json.load(f)
+            except (OSError, ValueError):
+                self._payload = {}
+            self._mtime = mtime
+
+    def get(self, category: str, question: str):
+        """반환: (answer, similarity, [Document]) 또는 None"""
+        self._reload_if_changed()
+        if self.version_watcher is not None:
+            if self._payload.get("index_version") != self.version_watcher.current():
+                return None
+
+        entry = self._payload.get("answers", {}).get(category, {}).get(question)
+        if not entry:
+            return None
+        docs = [
+            Document(page_content=d["page_content"], metadata=d["metadata"])
+            for d in entry.get("docs", [])
+        ]
+        return entry["answer"], entry.get("similarity"), docs
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    refresh_quick_answers(force="--force" in sys.argv)
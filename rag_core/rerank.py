@@ -0,0 +1,88 @@
+"""
+최신성 리랭크 (NumPy 벡터화)
+- 날짜 문자열은 epoch-day(int32)로 한 번만 파싱 (같은 문자열은 lru_cache로 재사용)
+- 점수 = RECENCY_ALPHA * 의미유사도 + (1 - RECENCY_ALPHA) * exp(-경과일 / RECENCY_DECAY_DAYS)
+- 상위 k개는 argpartition으로 선택 → k, child over-fetch를 늘려도 파이썬 루프 비용 없음
+- 하이브리드 검색(dense + BM25)은 reciprocal_rank_fusion으로 후보만 합치고, 리랭크는 dense 유사도로 같은 식 적용
+"""
+
+import numpy as np
+
+# epoch-day 변환/특수값은 사이드카(구축 결과물)와 같은 것을 사용
+from build_vector_db.metadata_sidecar import (
+    EPOCH_DAY_ALWAYS,
+    EPOCH_DAY_INVALID,
+    date_to_epoch_day,
+    today_epoch_day,
+)
+
+#  최신성(rencency) 가중치 리랭킹 파라미터
+# - alpha가 클수록 "의미 유사도"를 더 중시
+# - (1-alpha)가 클수록 "최근 문서"를 더 중시
+RECENCY_ALPHA = 0.75
+RECENCY_DECAY_DAYS = 360
+
+# RRF 상수 (순위 1위와 하위 순위 점수 차이를 완만하게, 일반적으로 60 사용)
+RRF_K = 60
+
+def epoch_days_of(docs) -> np.ndarray:
+    """Document 목록 → epoch-day int32 배열"""
+    return np.fromiter(
+        (date_to_epoch_day((doc.metadata or {}).get("date")) for doc in docs),
+        dtype=np.int32,
+        count=len(docs),
+    )
+
+
+def recency_weights(epoch_days: np.ndarray, today: int = None, decay_days: int = RECENCY_DECAY_DAYS) -> np.ndarray:
+    """epoch-day 배열 → 최신성 가중치 배열 (0.1~1.0, 기존 calculate_recency_weight와 동일 규칙)"""
+    if today is None:
+        today = today_epoch_day()
+    days_old = (today - epoch_days).astype(np.float64)
+    weights = np.clip(np.exp(-days_old / decay_days), 0.1, 1.0)
+    weights = np.where(epoch_days == EPOCH_DAY_ALWAYS, 1.0, weights)
+    weights = np.where(epoch_days == EPOCH_DAY_INVALID, 0.5, weights)
+    return weights
+
+
+def rerank(semantic_sims, epoch_days, k: int, alpha: float = RECENCY_ALPHA,
+           decay_days: int = RECENCY_DECAY_DAYS, today: int = None):
+    """
+    반환: (top_idx, final_scores, recency)
+    - top_idx: 최종 점수 내림차순 상위 k개 인덱스 (동점이면 원래 순서 유지)
+    """
+    sem = np.asarray(semantic_sims, dtype=np.float64)
+    rec = recency_weights(np.asarray(epoch_days, dtype=np.int32), today, decay_days)
+    final = alpha * sem + (1 - alpha) * rec
+
+    n = final.shape[0]
+    if k <= 0:
+        candidates = np.arange(0)
+    elif k < n:
+        candidates = np.sort(np.argpartition(-final, k - 1)[:k])
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(-final[candidates], kind="stable")
+    return candidates[order], final, rec
+
+
+def reciprocal_rank_fusion(rankings, limit: int = None, rrf_k: int = RRF_K):
+    """
+    여러 검색기의 id 순위 목록 → RRF 점수로 합친 (ids, relevance)
+    - score(id) = Σ 1 / (rrf_k + rank)   (rank는 1부터)
+    - relevance는 최고점이 1.0이 되도록 정규화한 융합 점수 (순위용 - 코사인 유사도와 범위가 달라
+      rerank()의 의미유사도 자리에는 쓰지 않음)
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    if not scores:
+        return [], np.empty(0, dtype=np.float64)
+
+    ids = list(scores)
+    fused = np.fromiter(scores.values(), dtype=np.float64, count=len(ids))
+    order = np.argsort(-fused, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+    return [ids[i] for i in order], fused[order] / fused[order[0]]
@@ -0,0 +1,447 @@
+"""
+검색 + 최신성 리랭크 (Streamlit 비의존)
+- child 검색(score 포함) → parent 복원 → 의미유사도 + 최신성 가중치로 리랭크 (rerank.py, NumPy)
+- app_final.py와 빠른 질문 사전계산(quick_answers.py)이 같이 사용
+- 메타데이터 사이드카(build_vector_db/metadata_sidecar.py)가 있으면
+  docstore 조회 전에 날짜로 리랭크/기간 필터 → 최종 k개 부모만 hydrate
+- BM25 색인(build_vector_db/lexical_index.py)이 있으면 dense 검색과 병렬로 실행 후
+  RRF로 후보를 합침 → 학수번호/학과명/첨부파일명 같은 정확한 토큰 질의 보완
+  (최신성 리랭크의 의미유사도는 융합 점수가 아니라 dense 유사도)
+- 서빙 인덱스(build_vector_db/serving_index.py)가 현재 빌드와 같으면 Chroma 대신
+  메모리 맵 행렬곱으로 child top-k 검색
+- 샤드 라우터(build_vector_db/chroma_shards.py)가 있으면 카테고리별 컬렉션으로 라우팅,
+  "전체"는 샤드별 병렬 검색 후 k-way merge
+- aretrieve_documents: 같은 검색을 asyncio로 (임베딩 ∥ BM25, hydrate ∥ 최신성 리랭크)
+"""
+
+import asyncio
+import inspect
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rag_core.rerank import (
+    RECENCY_ALPHA,
+    RECENCY_DECAY_DAYS,
+    epoch_days_of,
+    rerank,
+    reciprocal_rank_fusion,
+    today_epoch_day,
+)
+from rag_core.timing import StageTimer
+
+# "최근 N일" 허용 부모 수가 이 이하면 Chroma where 절(doc_id $in)로 직접 필터, 초과하면 검색 후 필터
+DOC_ID_PUSHDOWN_MAX = 1000
+
+# BM25 검색을 dense 검색과 동시에 돌리기 위한 스레드 풀 (NumPy 연산은 GIL을 대부분 놓음)
+_LEXICAL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+
+
+def _extract_parent_id(metadata: dict):
+    if not metadata:
+        return None
+    for key in ("doc_id", "parent_id", "parent", "document_id"):
+        val = metadata.get(key)
+        if val:
+            return val
+    return None
+
+
+def _score_to_similarity(score):
+    try:
+        return 1 / (1 + float(score))
+    except Exception:
+        return 0.5
+
+
+def _mean_similarity(dense_sims):
+    """dense 유사도 평균 (BM25로만 찾은 문서는 제외)"""
+    known = dense_sims[~np.isnan(dense_sims)]
+    return float(known.mean()) if len(known) else 0.0
+
+
+def _rerank_debug(docs, relevance, dense_sims, rec, final, idx):
+    return [
+        {
+            "title": (doc.metadata or {}).get("title", ""),
+            "date": (doc.metadata or {}).get("date", ""),
+            "semantic": 0.0 if np.isnan(dense_sims[i]) else float(dense_sims[i]),
+            "relevance": float(relevance[i]),
+            "recency": float(rec[i]),
+            "final": float(final[i])
+        }
+        for doc, i in zip(docs, idx)
+    ]
+
+
+@dataclass
+class _Scope:
+    """카테고리/기간 필터 → 검색 범위"""
+    notice_type: str = None
+    chroma_filter: dict = None
+    id_filter: dict = None
+    allowed_ids: set = None
+    sidecar: object = None
+    empty: bool = False
+
+
+def _query_scope(category_filter, max_age_days, sidecar, today) -> _Scope:
+    notice_type = category_filter if category_filter and category_filter != "전체" else None
+    scope = _Scope(notice_type=notice_type)
+    if notice_type:
+        scope.chroma_filter = {"notice_type": notice_type}
+
+    if sidecar is not None:
+        sidecar.refresh()
+        if sidecar.available:
+            scope.sidecar = sidecar
+
+    # 0) 기간 필터: 사이드카의 날짜 정렬 인덱스로 허용 부모 id 계산
+    if max_age_days and scope.sidecar is not None:
+        allowed = scope.sidecar.ids_in_date_range(today - max_age_days)
+        if not allowed:
+            scope.empty = True
+            return scope
+        if len(allowed) <= DOC_ID_PUSHDOWN_MAX:
+            scope.id_filter = {"doc_id": {"$in": allowed}}
+            scope.chroma_filter = (
+                scope.id_filter if scope.chroma_filter is None else {"$and": [scope.chroma_filter, scope.id_filter]}
+            )
+        scope.allowed_ids = set(allowed)
+    return scope
+
+
+def _dense_search(vectorstore, query_embedding, k: int, scope: _Scope, serving_index=None, shard_router=None):
+    """
+    질문 임베딩 → child 후보
+    반환: (child_hits [(parent_id, distance)], child_results [(child Document, distance)])
+    """
+    if serving_index is not None and serving_index.usable:
+        # 카테고리 비트마스크/허용 id로 거른 행만 행렬곱 (child 원문 없음)
+        child_hits = serving_index.search(
+            query_embedding,
+            k=k * 5,
+            notice_type=scope.notice_type,
+            allowed_ids=scope.allowed_ids
+        )
+        return child_hits, []
+
+    if shard_router is not None and shard_router.available:
+        child_results = shard_router.similarity_search_by_vector(
+            query_embedding,
+            k=k * 5,
+            notice_type=scope.notice_type,
+            filter=scope.id_filter
+        )
+    else:
+        child_results = vectorstore.similarity_search_by_vector_with_relevance_scores(
+            query_embedding,
+            k=k * 5,                 # 리랭크/중복 제거 고려 넉넉히
+            filter=scope.chroma_filter
+        )
+    return _child_hits(child_results), child_results
+
+
+def _collect_windows(child_results, child_windows):
+    """child 검색 결과 → {parent_id: [(child 본문, distance), ...]} (거리 오름차순, 컨텍스트 패커용)"""
+    if child_windows is None:
+        return
+    for child_doc, score in child_results:
+        pid = _extract_parent_id(child_doc.metadata)
+        if pid:
+            child_windows.setdefault(pid, []).append((child_doc.page_content, score))
+
+
+def _child_hits(child_results):
+    return [
+        # parent id가 아예 없다면 child를 parent 취급 fallback
+        (_extract_parent_id(child_doc.metadata) or f"__child__:{hash(child_doc.page_content)}", score)
+        for child_doc, score in child_results
+    ]
+
+
+async def _adense_search(vectorstore, query_embedding, k: int, scope: _Scope, serving_index=None,
+                         shard_router=None, batcher=None):
+    """_dense_search의 async 버전 - batcher(QueryBatcher)가 있으면 동시 질문들과 묶어서 한 번에 검색"""
+    if batcher is not None:
+        if serving_index is not None and serving_index.usable:
+            if scope.allowed_ids is None:
+                return await batcher.serving_search(query_embedding, k * 5, scope.notice_type), []
+        elif shard_router is None or not shard_router.available:
+            child_results = await batcher.chroma_search(query_embedding, k * 5, scope.chroma_filter)
+            return _child_hits(child_results), child_results
+    # 허용 id 집합이 질문마다 다르거나(기간 필터 + 서빙 인덱스) 샤드 라우팅이면 질문별 검색
+    return await asyncio.to_thread(
+        _dense_search, vectorstore, query_embedding, k, scope, serving_index, shard_router
+    )
+
+
+def _fuse_candidates(child_hits, lexical_hits, k: int, allowed_ids=None):
+    """
+    dense child 후보 + BM25 후보 → 부모 후보
+    - RRF는 어떤 부모를 후보로 볼지(순서 + 상위 k*3개)만 정함
+    - 최신성 블렌드에 들어가는 relevance는 dense 유사도 그대로 (BM25로만 찾은 부모는 후보 중 최저 dense 유사도)
+      → 하이브리드 여부와 관계없이 alpha / 유사도 임계값의 의미가 같음
+    반환: (parent_ids, relevance, dense_sims) 또는 부모 후보가 없으면 None
+    """
+    lexical_ids = [pid for pid, _ in lexical_hits]
+    if allowed_ids is not None:
+        lexical_ids = [pid for pid in lexical_ids if pid in allowed_ids]
+    if not child_hits and not lexical_ids:
+        return None
+
+    # parent별 best semantic similarity 수집 + parent id 순서
+    parent_id_to_best_sim = {}
+    parent_ids = []
+    for pid, score in child_hits:
+        if allowed_ids is not None and pid not in allowed_ids:
+            continue
+
+        sim = _score_to_similarity(score)
+
+        if pid not in parent_id_to_best_sim:
+            parent_id_to_best_sim[pid] = sim
+            parent_ids.append(pid)
+        else:
+            parent_id_to_best_sim[pid] = max(parent_id_to_best_sim[pid], sim)
+
+        if len(parent_ids) >= (k * 3):
+            break
+
+    # RRF 융합으로 후보 선택 (BM25 결과가 있을 때만)
+    if lexical_ids:
+        parent_ids, _ = reciprocal_rank_fusion([parent_ids, lexical_ids], limit=k * 3)
+    if not parent_ids:
+        return None
+    dense_sims = np.asarray([parent_id_to_best_sim.get(pid, np.nan) for pid in parent_ids], dtype=np.float64)
+    known = ~np.isnan(dense_sims)
+    floor = float(dense_sims[known].min()) if known.any() else 0.0
+    relevance = np.where(known, dense_sims, floor)
+    return parent_ids, relevance, dense_sims
+
+
+def _sidecar_order(sidecar, parent_ids, relevance, today):
+    """사이드카 날짜로 hydrate 전에 리랭크 → (전체 순위, final, rec) 또는 날짜가 빠진 후보가 있으면 None"""
+    days, all_found = sidecar.epoch_days(parent_ids)
+    if not all_found:
+        return None
+    return rerank(relevance, days, len(parent_ids), alpha=RECENCY_ALPHA,
+                  decay_days=RECENCY_DECAY_DAYS, today=today)
+
+
+def _take_in_order(order, loaded, k: int):
+    """리랭크 순서대로 hydrate된 부모 k개 → (docs, 후보 index)"""
+    top_docs, top_idx = [], []
+    for i in order:
+        if loaded[i] is not None:
+            top_docs.append(loaded[i])
+            top_idx.append(i)
+            if len(top_docs) >= k:
+                break
+    return top_docs, top_idx
+
+
+def _rerank_hydrated(loaded, relevance, dense_sims, child_results, k: int, scope: _Scope,
+                     max_age_days, today):
+    """사이드카가 없거나 오래된 경우: hydrate한 부모 메타데이터 날짜로 리랭크"""
+    hydrated = [i for i, doc in enumerate(loaded) if doc is not None]
+    parent_docs = [loaded[i] for i in hydrated]
+
+    # docstore miss가 많으면 child fallback
+    if not parent_docs:
+        if scope.allowed_ids is not None:
+            return [], 0.0, []
+        fallback_docs = [d for d, _ in child_results[:k]]
+        avg_sim = sum([_score_to_similarity(s) for _, s in child_results[:k]]) / max(1, len(fallback_docs))
+        return fallback_docs, avg_sim, []
+
+    # 최신성 가중치로 리랭크 (epoch-day 배열 + argpartition)
+    sem = relevance[hydrated]
+    dense = dense_sims[hydrated]
+    epoch_days = epoch_days_of(parent_docs)
+    if max_age_days and scope.allowed_ids is None:
+        # 사이드카 없이 기간 필터: hydrate한 메타데이터 날짜로 거름
+        keep = np.flatnonzero((epoch_days >= 0) & (epoch_days >= today - max_age_days))
+        parent_docs = [parent_docs[i] for i in keep]
+        sem, dense, epoch_days = sem[keep], dense[keep], epoch_days[keep]
+        if not parent_docs:
+            return [], 0.0, []
+    top_idx, final, rec = rerank(sem, epoch_days, k, alpha=RECENCY_ALPHA,
+                                 decay_days=RECENCY_DECAY_DAYS, today=today)
+    top_docs = [parent_docs[i] for i in top_idx]
+
+    # 신뢰도 배지는 "의미 유사도" 평균으로 유지 (최신성/BM25는 정렬에만 반영)
+    avg_semantic_similarity = _mean_similarity(dense[top_idx]) if len(top_idx) else 0.0
+
+    # (디버그/확장용) 리랭크 점수도 같이 반환
+    rerank_debug = _rerank_debug(top_docs, sem, dense, rec, final, top_idx)
+
+    return top_docs, avg_semantic_similarity, rerank_debug
+
+
+def retrieve_documents(retriever, query: str, category_filter: str = None, k: int = 50,
+                       sidecar=None, max_age_days: int = None, lexical_index=None,
+                       serving_index=None, shard_router=None, query_embedding=None, child_windows=None):
+    """
+    카테고리 필터를 Chroma 검색에 직접 적용
+    child 검색(score 포함) → parent 복원
+    의미유사도 + 최신성 가중치로 리랭크
+    - sidecar: MetadataSidecar (있으면 hydrate 전에 리랭크, 상위 k개만 docstore 조회)
+    - max_age_days: 최근 N일 이내 문서만 ("상시"/날짜 미상 문서는 제외)
+    - lexical_index: LexicalIndex (있으면 BM25와 RRF 융합으로 후보 선택, 리랭크 점수는 dense 유사도 기준)
+    - serving_index: ServingIndex (usable이면 Chroma 대신 사용, child 원문이 없어 child fallback은 생략)
+    - shard_router: ShardRouter (샤드가 있으면 메타데이터 필터 대신 카테고리 컬렉션 검색)
+    - query_embedding: 이미 계산한 질문 임베딩 (없으면 임베딩 캐시 경유로 계산)
+    - child_windows: dict를 주면 부모별로 검색에 걸린 child 조각을 채워 줌 (context_packer.py용,
+      child 원문이 없는 서빙 인덱스 경로에서는 비어 있음)
+    반환: (docs, avg_semantic_similarity, rerank_debug)
+    """
+    vectorstore = retriever.vectorstore
+    docstore = retriever.docstore
+    today = today_epoch_day()
+
+    scope = _query_scope(category_filter, max_age_days, sidecar, today)
+    if scope.empty:
+        return [], 0.0, []
+
+    # 1) child 검색 (score 포함) + BM25 검색 (병렬)
+    lexical_future = None
+    if lexical_index is not None:
+        lexical_future = _LEXICAL_POOL.submit(
+            lexical_index.search,
+            query,
+            k * 3,
+            scope.notice_type
+        )
+    if query_embedding is None:
+        query_embedding = vectorstore.embeddings.embed_query(query)
+    child_hits, child_results = _dense_search(vectorstore, query_embedding, k, scope, serving_index, shard_router)
+    _collect_windows(child_results, child_windows)
+    lexical_hits = lexical_future.result() if lexical_future is not None else []
+
+    # 2~3) parent별 best semantic similarity + RRF 융합
+    fused = _fuse_candidates(child_hits, lexical_hits, k, scope.allowed_ids)
+    if fused is None:
+        return [], 0.0, []
+    parent_ids, relevance, dense_sims = fused
+
+    # 4-a) 사이드카에 모든 후보의 날짜가 있으면: hydrate 전에 리랭크 → 순위대로 필요한 만큼만 mget
+    if scope.sidecar is not None:
+        ranked = _sidecar_order(scope.sidecar, parent_ids, relevance, today)
+        if ranked is not None:
+            order, final, rec = ranked
+            top_docs, top_idx = [], []
+            cursor = 0
+            while len(top_docs) < k and cursor < len(order):
+                chunk = order[cursor:cursor + k - len(top_docs)]
+                cursor += len(chunk)
+                for i, doc in zip(chunk, docstore.mget([parent_ids[i] for i in chunk])):
+                    if doc is not None:
+                        top_docs.append(doc)
+                        top_idx.append(i)
+            if top_docs:
+                avg_semantic_similarity = _mean_similarity(dense_sims[top_idx])
+                rerank_debug = _rerank_debug(top_docs, relevance, dense_sims, rec, final, top_idx)
+                return top_docs, avg_semantic_similarity, rerank_debug
+
+    # 4-b) 사이드카가 없거나 오래된 경우: 후보 전체 parent 로드 후 리랭크
+    loaded = docstore.mget(parent_ids)
+    return _rerank_hydrated(loaded, relevance, dense_sims, child_results, k, scope, max_age_days, today)
+
+
+async def aretrieve_documents(retriever, query: str, category_filter: str = None, k: int = 50,
+                              sidecar=None, max_age_days: int = None, lexical_index=None,
+                              serving_index=None, shard_router=None, query_embedding=None, timer=None,
+                              batcher=None, child_windows=None):
+    """
+    retrieve_documents의 asyncio 버전 (결과 동일, 단계를 겹쳐서 실행)
+    - 질문 임베딩(aembed_query) ∥ BM25 검색
+    - docstore hydrate(후보 전체 mget) ∥ 사이드카 날짜 리랭크 → 순위대로 k개 선택
+      (사이드카가 오래돼 날짜가 빠져도 이미 hydrate한 후보로 4-b 경로를 바로 진행)
+    - query_embedding: 임베딩 결과 또는 awaitable (호출 측이 먼저 시작해 둔 임베딩 task)
+    - timer: StageTimer (단계별 소요 시간 기록)
+    - batcher: QueryBatcher (있으면 임베딩/벡터 검색을 동시 질문들과 묶어서 실행)
+    - child_windows: retrieve_documents와 동일
+    """
+    timer = timer or StageTimer()
+    vectorstore = retriever.vectorstore
+    docstore = retriever.docstore
+    today = today_epoch_day()
+
+    scope = _query_scope(category_filter, max_age_days, sidecar, today)
+    if scope.empty:
+        return [], 0.0, []
+
+    async def lexical():
+        if lexical_index is None:
+            return []
+        with timer.stage("lexical"):
+            return await asyncio.to_thread(lexical_index.search, query, k * 3, scope.notice_type)
+
+    async def dense():
+        nonlocal query_embedding
+        with timer.stage("embed"):
+            if query_embedding is None:
+                if batcher is not None:
+                    query_embedding = await batcher.embed_query(query)
+                else:
+                    query_embedding = await vectorstore.embeddings.aembed_query(query)
+            elif inspect.isawaitable(query_embedding):
+                query_embedding = await query_embedding
+        with timer.stage("dense_search"):
+            return await _adense_search(
+                vectorstore, query_embedding, k, scope, serving_index, shard_router, batcher
+            )
+
+    (child_hits, child_results), lexical_hits = await asyncio.gather(dense(), lexical())
+    _collect_windows(child_results, child_windows)
+
+    fused = _fuse_candidates(child_hits, lexical_hits, k, scope.allowed_ids)
+    if fused is None:
+        return [], 0.0, []
+    parent_ids, relevance, dense_sims = fused
+
+    async def hydrate():
+        with timer.stage("hydrate"):
+            return await asyncio.to_thread(docstore.mget, parent_ids)
+
+    async def order():
+        if scope.sidecar is None:
+            return None
+        with timer.stage("recency"):
+            return await asyncio.to_thread(_sidecar_order, scope.sidecar, parent_ids, relevance, today)
+
+    loaded, ranked = await asyncio.gather(hydrate(), order())
+    if ranked is not None:
+        order_idx, final, rec = ranked
+        top_docs, top_idx = _take_in_order(order_idx, loaded, k)
+        if top_docs:
+            avg_semantic_similarity = _mean_similarity(dense_sims[top_idx])
+            return top_docs, avg_semantic_similarity, _rerank_debug(top_docs, relevance, dense_sims, rec, final, top_idx)
+
+    with timer.stage("recency"):
+        return _rerank_hydrated(loaded, relevance, dense_sims, child_results, k, scope, max_age_days, today)
+
+
+def format_document(idx: int, doc, content: str = None) -> str:
+    """문서 하나 → 프롬프트의 [문서 idx] 블록 (content를 주면 본문 대신 사용)"""
+    metadata = doc.metadata or {}
+    return f"""[문서 {idx}]
+제목: {metadata.get('title', '제목 없음')}
+날짜: {metadata.get('date', '날짜 없음')}
+분류: {metadata.get('notice_type', '미분류')}
+학과: {metadata.get('department', '해당없음')}
+URL: {metadata.get('url', 'URL 없음')}
+
+내용:
+{doc.page_content if content is None else content}
+"""
+
+
+CONTEXT_SEPARATOR = '\n\n---\n\n'
+
+
+def format_context(docs) -> str:
+    """검색된 문서들 → 프롬프트의 참고 문서 문자열"""
+    return CONTEXT_SEPARATOR.join(format_document(idx, doc) for idx, doc in enumerate(docs, 1))
@@ -0,0 +1,139 @@
+"""
+의미 기반 답변 캐시 (chain.stream 앞단)
+- SQLiteCache(set_llm_cache)는 프롬프트 문자열이 완전히 같아야만 적중
+  → "수강신청 일정은?" / "수강신청 언제야?" 같은 질문은 매번 LLM 호출
+- 여기서는 (카테고리, 검색된 부모 문서 집합)이 같고
+  질문 임베딩 코사인 유사도가 threshold 이상이면 저장된 답변을 그대로 스트리밍
+- 인덱스 build_version이 바뀌면 이전 답변은 사용하지 않음 (+ 시간 TTL)
+- 대화 이력이 있는 질문("그럼 언제까지야?" 등)은 조회/저장하지 않음 (RAGEngine에서 판단)
+"""
+
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+SEMANTIC_CACHE_PATH = Path(__file__).resolve().parent.parent / "build_vector_db" / "llm_cache" / "semantic_cache.db"
+SEMANTIC_CACHE_THRESHOLD = 0.93
+SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def parent_set_key(parent_ids) -> str:
+    """검색된 부모 문서 집합 → 순서와 무관한 키"""
+    joined = "\n".join(sorted(set(str(p) for p in parent_ids)))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def replay_stream(answer: str, chunk_chars: int = 20):
+    """저장된 답변을 chain.stream처럼 조각 단위로 yield"""
+    for i in range(0, len(answer), chunk_chars):
+        yield answer[i : i + chunk_chars]
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        path=SEMANTIC_CACHE_PATH,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: int = SEMANTIC_CACHE_TTL_SECONDS,
+        version_watcher=None,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.version_watcher = version_watcher
+        self.hits = 0
+        self.misses = 0
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT NOT NULL,
+                parents_key TEXT NOT NULL,
+                index_version TEXT,
+                created_at REAL NOT NULL,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answers_key ON answers(category, parents_key)"
+        )
+        self._conn.commit()
+
+    def _version(self):
+        if self.version_watcher is None:
+            return None
+        version = self.version_watcher.current()
+        return None if version is None else str(version)
+
+    def lookup(self, query_embedding, category, parent_ids):
+        """적중하면 저장된 답변 문자열, 아니면 None"""
+        version = self._version()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, answer FROM answers "
+                "WHERE category = ? AND parents_key = ? AND index_version IS ? AND created_at >= ?",
+                (
+                    category or "전체",
+                    parent_set_key(parent_ids),
+                    version,
+                    time.time() - self.ttl_seconds,
+                ),
+            ).fetchall()
+
+        best_sim, best_answer = -1.0, None
+        for blob, answer in rows:
+            vec = np.frombuffer(blob, dtype=np.float32)
+            if vec.shape != query.shape:
+                continue
+            sim = float(vec @ query) / ((np.linalg.norm(vec) or 1.0) * query_norm)
+            if sim > best_sim:
+                best_sim, best_answer = sim, answer
+
+        if best_answer is not None and best_sim >= self.threshold:
+            self.hits += 1
+            return best_answer
+        self.misses += 1
+        return None
+
+    def store(self, question, query_embedding, category, parent_ids, answer):
+        if not answer:
+            return
+        blob = np.asarray(query_embedding, dtype=np.float32).tobytes()
+        version = self._version()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers "
+                "(category, parents_key, index_version, created_at, question, embedding, answer) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (category or "전체", parent_set_key(parent_ids), version, now, question, blob, answer),
+            )
+            # 만료되었거나 이전 인덱스 버전의 답변 정리
+            self._conn.execute(
+                "DELETE FROM answers WHERE created_at < ? OR index_version IS NOT ?",
+                (now - self.ttl_seconds, version),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
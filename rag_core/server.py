@@ -0,0 +1,142 @@
+"""
+RAG 엔진 HTTP API (aiohttp, 토큰은 SSE로 스트리밍)
+- Streamlit 앱과 분리해서 검색/답변만 따로 띄우고 늘릴 수 있음 (앱은 RAG_API_URL로 접속하는 얇은 클라이언트)
+- 엔진의 asyncio 경로(astream_answer) 사용 → 느린 임베딩/LLM 호출이 다른 요청을 막지 않음
+
+엔드포인트:
+    GET  /health    → {"status": "ok", "stats": {...}}
+    POST /retrieve  {"query", "category", "max_age_days", "k"} → {"similarity", "docs", "rerank_debug"}
+    POST /answer    {"query", "history", "category", "max_age_days", "quick"}
+                    → text/event-stream
+                      event: meta   data: {"similarity", "docs", "rerank_debug", "source"}
+                      event: token  data: {"text": "..."}
+                      event: done   data: {"timings": {단계: ms}}   (first_token = 첫 토큰까지)
+                      event: error  data: {"message": "..."}
+
+실행:
+    python -m rag_core.server [--host 0.0.0.0] [--port 8100] [--fake]
+"""
+
+import json
+import asyncio
+import argparse
+
+from aiohttp import web
+
+from rag_core.engine import RAGEngine, ANSWER_TOP_K
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8100
+ENGINE_KEY = web.AppKey("engine", RAGEngine)
+
+
+def serialize_docs(docs) -> list:
+    """Document → quick_answers.json과 같은 {"page_content", "metadata"} 형태"""
+    return [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+
+
+def sse_event(event: str, data) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+def _category(body: dict):
+    category = body.get("category")
+    return None if not category or category == "전체" else category
+
+
+# ---------------- 핸들러 ---------------- #
+
+async def health(request):
+    engine = request.app[ENGINE_KEY]
+    stats = await asyncio.to_thread(engine.stats)
+    return web.json_response({"status": "ok", "stats": stats}, dumps=lambda o: json.dumps(o, default=str))
+
+
+async def retrieve(request):
+    engine = request.app[ENGINE_KEY]
+    body = await request.json()
+    if not body.get("query"):
+        raise web.HTTPBadRequest(text="query가 필요합니다.")
+    result = await engine.aretrieve(
+        body["query"], _category(body), int(body.get("k") or ANSWER_TOP_K), body.get("max_age_days")
+    )
+    return web.json_response(
+        {"similarity": result.similarity, "docs": serialize_docs(result.docs), "rerank_debug": result.rerank_debug},
+        dumps=lambda o: json.dumps(o, ensure_ascii=False, default=str)
+    )
+
+
+async def answer(request):
+    engine = request.app[ENGINE_KEY]
+    body = await request.json()
+    if not body.get("query"):
+        raise web.HTTPBadRequest(text="query가 필요합니다.")
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",   # 프록시(nginx) 버퍼링 끄기
+    })
+    await response.prepare(request)
+    source, coalesced = None, False
+
+    events = engine.astream_answer(
+        body["query"],
+        history=[tuple(turn) for turn in body.get("history") or []],
+        category_filter=_category(body),
+        max_age_days=body.get("max_age_days"),
+        quick=bool(body.get("quick")),
+    )
+    try:
+        async for event, data in events:
+            if event == "meta":
+                source, coalesced = data.get("source"), data.get("coalesced", False)
+                data = {**data, "docs": serialize_docs(data["docs"])}
+            elif event == "token":
+                data = {"text": data}
+            elif event == "done":
+                timings = data.get("timings", {})
+                line = f"⏱️ [{source}{' 합류' if coalesced else ''}] " + " | ".join(f"{k} {v:.0f}ms" for k, v in timings.items())
+                if data.get("context"):
+                    ctx = data["context"]
+                    line += f" | 컨텍스트 {ctx['tokens']}토큰 (절약 {ctx['saved_tokens']})"
+                print(line)
+            await response.write(sse_event(event, data))
+    except ConnectionResetError:
+        # 클라이언트가 스트림 도중 연결을 끊음
+        return response
+    except Exception as e:
+        print(f"[에러] 답변 생성 실패: {e!r}")
+        await response.write(sse_event("error", {"message": str(e)}))
+    await response.write_eof()
+    return response
+
+
+def create_app(engine: RAGEngine) -> web.Application:
+    app = web.Application()
+    app[ENGINE_KEY] = engine
+    app.router.add_get("/health", health)
+    app.router.add_post("/retrieve", retrieve)
+    app.router.add_post("/answer", answer)
+    return app
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="RAG 엔진 HTTP(SSE) 서버")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fake", action="store_true", help="가짜 임베딩/LLM + 샘플 문서 (API 키/인덱스 불필요)")
+    args = parser.parse_args()
+
+    if args.fake:
+        from rag_core.fakes import build_fake_engine
+        engine = build_fake_engine()
+    else:
+        load_dotenv()
+        engine = RAGEngine.from_index()
+
+    print(f"🚀 RAG API 서버 시작: http://{args.host}:{args.port} ({'fake' if args.fake else 'index'})")
+    web.run_app(create_app(engine), host=args.host, port=args.port, print=None)
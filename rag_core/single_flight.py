@@ -0,0 +1,169 @@
+"""
+같은 질문 동시 요청 합치기 (single-flight)
+- 인기 공지가 올라온 직후 여러 학생이 같은 질문을 동시에 보내면
+  검색 1번 + LLM 스트림 1개만 실행하고, 나오는 이벤트(토큰)를 모든 구독자에게 나눠 줌
+- 키: 정규화한 질문 + 카테고리 + 기간 + 빠른 질문 여부 + 대화 히스토리 해시
+- 진행 중인 요청에 늦게 합류해도 이미 나온 이벤트부터 순서대로 받음 (이벤트 버퍼)
+- 스트림이 끝나면 키를 지움 → 이후 같은 질문은 의미 캐시(semantic_cache.py)가 처리
+- 생산자는 구독자와 별도로 끝까지 실행 (한 명이 연결을 끊어도 나머지 스트림 유지)
+
+SingleFlight: asyncio (HTTP 서버) / ThreadSingleFlight: 스레드 (Streamlit in-process)
+"""
+
+import json
+import asyncio
+import hashlib
+import threading
+import unicodedata
+
+_TRAILING_PUNCT = " ?？!.~"
+
+
+def normalize_question(query: str) -> str:
+    """NFKC + 소문자 + 공백 정리 + 끝 문장부호 제거 ("수강신청 일정은?" == "수강신청  일정은")"""
+    text = unicodedata.normalize("NFKC", str(query)).lower()
+    return " ".join(text.split()).rstrip(_TRAILING_PUNCT)
+
+
+def coalesce_key(query: str, history=(), category_filter: str = None,
+                 max_age_days: int = None, quick: bool = False) -> str:
+    history_hash = hashlib.sha1(
+        json.dumps([list(turn) for turn in history], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    payload = "\n".join([
+        normalize_question(query), category_filter or "전체", str(max_age_days or ""),
+        "quick" if quick else "", history_hash,
+    ])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _mark_joined(event):
+    """합류한 구독자에게는 meta에 coalesced=True 표시 (버퍼의 원본 dict는 그대로)"""
+    name, data = event
+    if name == "meta":
+        return name, {**data, "coalesced": True}
+    return event
+
+
+class _Flight:
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+
+
+class SingleFlight:
+    """asyncio 버전 - subscribe(key, make_stream)는 make_stream()이 내는 이벤트를 async yield"""
+
+    def __init__(self):
+        self._flights = {}
+        self._tasks = set()   # 이벤트 루프는 task를 약하게만 참조 → 끝날 때까지 여기서 보관
+        self.started = 0
+        self.joined = 0
+
+    async def _produce(self, key, flight, changed, make_stream):
+        try:
+            async for event in make_stream():
+                flight.events.append(event)
+                changed[0].set()
+                changed[0] = asyncio.Event()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            changed[0].set()
+            self._flights.pop(key, None)
+
+    async def subscribe(self, key: str, make_stream):
+        entry = self._flights.get(key)
+        joined = entry is not None
+        if entry is None:
+            flight, changed = _Flight(), [asyncio.Event()]
+            entry = self._flights[key] = (flight, changed)
+            self.started += 1
+            task = asyncio.ensure_future(self._produce(key, flight, changed, make_stream))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.joined += 1
+        flight, changed = entry
+        flight.subscribers += 1
+
+        i = 0
+        while True:
+            if i < len(flight.events):
+                event = flight.events[i]
+                i += 1
+                yield _mark_joined(event) if joined else event
+                continue
+            if flight.done:
+                if flight.error is not None:
+                    raise flight.error
+                return
+            await changed[0].wait()
+
+    def stats(self) -> dict:
+        return {"started": self.started, "joined": self.joined, "in_flight": len(self._flights)}
+
+
+class ThreadSingleFlight:
+    """스레드 버전 - 생산자는 데몬 스레드, 구독자는 Condition으로 새 이벤트를 기다림"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def _produce(self, key, flight, cond, make_stream):
+        try:
+            for event in make_stream():
+                with cond:
+                    flight.events.append(event)
+                    cond.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            with cond:
+                flight.done = True
+                cond.notify_all()
+
+    def subscribe(self, key: str, make_stream):
+        with self._lock:
+            entry = self._flights.get(key)
+            joined = entry is not None
+            if entry is None:
+                flight, cond = _Flight(), threading.Condition()
+                entry = self._flights[key] = (flight, cond)
+                self.started += 1
+                threading.Thread(
+                    target=self._produce, args=(key, flight, cond, make_stream),
+                    name="single-flight", daemon=True
+                ).start()
+            else:
+                self.joined += 1
+        flight, cond = entry
+        flight.subscribers += 1
+
+        i = 0
+        while True:
+            with cond:
+                while i >= len(flight.events) and not flight.done:
+                    cond.wait()
+                pending = flight.events[i:]
+                finished = flight.done
+            for event in pending:
+                yield _mark_joined(event) if joined else event
+            i += len(pending)
+            if finished and i >= len(flight.events):
+                if flight.error is not None:
+                    raise flight.error
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {"started": self.started, "joined": self.joined, "in_flight": in_flight}
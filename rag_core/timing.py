@@ -0,0 +1,32 @@
+"""
+질의 경로 단계별 소요 시간 (ms)
+- stage(name): 구간 측정 (with 블록, await가 섞여도 됨 → 겹쳐 실행된 단계는 각자 벽시계 시간)
+- mark(name): 요청 시작부터 지금까지 (first_token, total 등)
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (time.perf_counter() - t0) * 1000
+
+    def mark(self, name: str):
+        self.stages[name] = (time.perf_counter() - self.started) * 1000
+
+    def summary(self) -> dict:
+        return {name: round(ms, 1) for name, ms in self.stages.items()}
+
+    def format(self) -> str:
+        return " | ".join(f"{name} {ms:.0f}ms" for name, ms in self.stages.items())
@@ -0,0 +1,12 @@
+"""
+pytest 공통 설정
+- 저장소 루트를 import 경로에 추가 (rag_core / build_vector_db / crawler 패키지)
+
+실행:
+    python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
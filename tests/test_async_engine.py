@@ -0,0 +1,200 @@
+"""
+비동기 크롤링 엔진 - 로컬 픽스처 서버(aiohttp.test_utils)로 목록/상세 HTML을 흉내 내서 검증
+- walk_board 결과가 기존 동기 크롤링(목록 페이지 순서대로 상세 페이지를 하나씩)과 같은지
+- 날짜 범위를 벗어난 페이지에서 순회 중단 / 5xx 재시도 / 호스트별 동시 요청 수 제한
+"""
+
+import json
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from crawler import async_engine
+from crawler.async_engine import AsyncCrawlEngine, Board
+from crawler.hongik_crawler import HongikCrawler
+
+FIXTURE_ROOT = "http://fixture.test"
+LIST_PATH = "/ie/0401.do"
+PAGE_SIZE = 4
+N_POSTS = 14
+RECENT_POSTS = 7        # 14 ~ 8번 글은 최근, 7번 이하는 기간 밖
+FLAKY_POST = 9          # 첫 요청은 503
+PER_HOST_CAP = 2
+N_PAGES = (N_POSTS + PAGE_SIZE - 1) // PAGE_SIZE
+TODAY = datetime.now()
+
+
+def _post_date(no):
+    days_ago = N_POSTS - no + 1 if no > N_POSTS - RECENT_POSTS else 400 + no
+    return TODAY - timedelta(days=days_ago)
+
+
+def list_html(page):
+    numbers = range(N_POSTS - (page - 1) * PAGE_SIZE, max(0, N_POSTS - page * PAGE_SIZE), -1)
+    rows = "".join(
+        f'<tr><td class="b-num-box">{no}</td>'
+        f'<td><a href="/ie/view.do?no={no}">공지 {no}</a></td>'
+        f"<td>{_post_date(no):%Y.%m.%d}</td></tr>"
+        for no in numbers
+    )
+    # 학과 공지(b-paging 숫자 링크) / 학사 공지(b-paging-wrap의 li.next.pager) 둘 다
+    paging = "".join(f'<a href="{LIST_PATH}?page={p}">{p}</a>' for p in range(1, N_PAGES + 1))
+    next_li = f'<li class="next pager"><a href="{LIST_PATH}?page={page + 1}">다음</a></li>' if page < N_PAGES else ""
+    return (
+        f"<html><body><table><tbody>{rows}</tbody></table>"
+        f'<div class="b-paging">{paging}</div>'
+        f'<div class="b-paging-wrap"><ul>{next_li}</ul></div></body></html>'
+    )
+
+
+def detail_html(no):
+    return (
+        f"<html><body><div>공지사항</div>"
+        f'<h4 class="view_title">공지 {no}</h4>'
+        f'<div class="view_content">본문 {no}번 글입니다.</div>'
+        f'<div class="file_download"><a href="/files/{no}.pdf">첨부{no}.pdf</a></div>'
+        f"<div>목록</div></body></html>"
+    )
+
+
+def _html_for(url):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if parsed.path == LIST_PATH:
+        return list_html(int(query.get("page", ["1"])[0]))
+    return detail_html(int(query["no"][0]))
+
+
+class FixtureSite:
+    """요청 기록 + 상세 페이지 동시 처리 수 측정"""
+
+    def __init__(self):
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failed_once = set()
+
+    async def list_page(self, request):
+        self.requested.append(request.path_qs)
+        return web.Response(text=list_html(int(request.query.get("page", "1"))), content_type="text/html")
+
+    async def detail_page(self, request):
+        self.requested.append(request.path_qs)
+        no = int(request.query["no"])
+        if no == FLAKY_POST and no not in self.failed_once:
+            self.failed_once.add(no)
+            return web.Response(status=503)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight -= 1
+        return web.Response(text=detail_html(no), content_type="text/html")
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get(LIST_PATH, self.list_page)
+        app.router.add_get("/ie/view.do", self.detail_page)
+        return app
+
+
+def _boards(crawler, root):
+    start_url = root + LIST_PATH
+    since = TODAY - timedelta(days=30)
+    return {
+        "ie": Board(
+            key="ie",
+            start_url=start_url,
+            parse_list=partial(crawler._parse_ie_list, base_url=start_url, since=since),
+            parse_detail=crawler._parse_ie_detail,
+        ),
+        "univ": Board(
+            key="univ",
+            start_url=start_url,
+            parse_list=partial(crawler._parse_univ_list, base_url=start_url, from_date=since.date()),
+            parse_detail=crawler._parse_univ_detail,
+        ),
+    }
+
+
+def sync_crawl(board):
+    """기존 동기 크롤링과 같은 순서: 목록 페이지 → 그 페이지의 상세 페이지들 → 다음 목록 페이지"""
+    items, url, page_no = [], board.start_url, 1
+    while url:
+        page = board.parse_list(_html_for(url), url, page_no)
+        for task in page.tasks:
+            item = board.parse_detail(_html_for(task.url), task)
+            if item is not None:
+                items.append(item)
+        if not page.keep_going:
+            break
+        url, page_no = page.next_url, page_no + 1
+    return items
+
+
+def _normalize(items, root):
+    """서버 포트가 들어간 URL → FIXTURE_ROOT, 도착 순서 무관하게 비교"""
+    dumped = [json.dumps(item, ensure_ascii=False, sort_keys=True).replace(root, FIXTURE_ROOT) for item in items]
+    return sorted(dumped)
+
+
+async def _walk(board_kind):
+    site = FixtureSite()
+    server = TestServer(site.app())
+    await server.start_server()
+    try:
+        root = str(server.make_url("")).rstrip("/")
+        board = _boards(HongikCrawler(), root)[board_kind]
+        async with AsyncCrawlEngine(per_host_concurrency=PER_HOST_CAP, per_host_delay=0) as engine:
+            items = [item async for item in engine.walk_board(board)]
+            stats = dict(engine.stats)
+    finally:
+        await server.close()
+    return site, root, items, stats
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(async_engine, "BACKOFF_BASE", 0)
+
+
+@pytest.mark.parametrize("board_kind", ["ie", "univ"])
+def test_walk_board_matches_sync_crawl(board_kind):
+    site, root, items, _ = asyncio.run(_walk(board_kind))
+    expected = sync_crawl(_boards(HongikCrawler(), FIXTURE_ROOT)[board_kind])
+
+    assert len(expected) == RECENT_POSTS
+    assert _normalize(items, root) == _normalize(expected, FIXTURE_ROOT)
+
+
+@pytest.mark.parametrize("board_kind", ["ie", "univ"])
+def test_walk_board_stops_at_date_range(board_kind):
+    site, _, _, _ = asyncio.run(_walk(board_kind))
+
+    # 3페이지(전부 기간 밖)에서 중단 → 4페이지와 기간 밖 글의 상세 페이지는 요청하지 않음
+    assert f"{LIST_PATH}?page=3" in site.requested
+    assert f"{LIST_PATH}?page=4" not in site.requested
+    detail_nos = {int(path.split("no=")[1]) for path in site.requested if "no=" in path}
+    assert detail_nos == set(range(N_POSTS - RECENT_POSTS + 1, N_POSTS + 1))
+
+
+def test_walk_board_retries_server_errors():
+    site, _, items, stats = asyncio.run(_walk("ie"))
+
+    assert stats["retries"] == 1
+    assert stats["errors"] == 0
+    assert site.requested.count(f"/ie/view.do?no={FLAKY_POST}") == 2
+    assert any(item["title"] == f"공지 {FLAKY_POST}" for item in items)
+
+
+def test_walk_board_respects_per_host_concurrency():
+    site, _, _, _ = asyncio.run(_walk("ie"))
+
+    # 상세 요청은 병렬로 나가지만 같은 호스트에는 PER_HOST_CAP개까지만
+    assert site.max_in_flight == PER_HOST_CAP
@@ -0,0 +1,38 @@
+"""
+토큰 예산 컨텍스트 구성: 예산 준수 / 전문 대비 토큰 통계
+"""
+
+from langchain_core.documents import Document
+
+from rag_core.context_packer import count_tokens, pack_context
+from rag_core.retrieval import format_context
+
+
+def _docs(n, sentences):
+    return [
+        Document(
+            page_content=" ".join(f"{i}번 공지의 {j}번째 안내 문장입니다." for j in range(sentences)),
+            metadata={"title": f"공지 {i}", "date": "2025-03-0{}".format(i + 1), "notice_type": "대학공지",
+                      "url": f"https://www.hongik.ac.kr/fake/notice/{i}"},
+        )
+        for i in range(n)
+    ]
+
+
+def test_truncated_context_stays_within_budget():
+    docs = _docs(3, 40)
+    for budget in (300, 457, 800):
+        packed = pack_context(docs, "안내 문장", budget=budget, long_parent_tokens=10 ** 6)
+        assert packed.tokens <= budget
+        # 문서별로 센 합 기준 (이어 붙인 경계에서 토큰이 합쳐지는 정도의 차이만 허용)
+        assert count_tokens(packed.context) <= budget + len(packed.docs)
+    assert pack_context(docs, "안내 문장", budget=300, long_parent_tokens=10 ** 6).context.endswith(" ...\n")
+
+
+def test_full_tokens_matches_whole_context():
+    docs = _docs(3, 5)
+    packed = pack_context(docs, "안내 문장", budget=10 ** 6)
+    assert packed.dropped == 0
+    assert packed.context == format_context(docs)
+    # 문서별로 나눠 센 합 - 경계에서 토큰이 합쳐지는 차이 정도만 허용
+    assert abs(packed.full_tokens - count_tokens(format_context(docs))) <= 2 * len(docs)
@@ -0,0 +1,49 @@
+"""
+개설과목 커리큘럼 그리드: HTTP 경로(_parse_course_grid)와 Selenium fallback의 텍스트 줄 구성이 같은지
+(전처리가 1줄=과목명, 2줄=학수번호로 읽으므로 인라인 요소에서 줄이 갈리면 안 됨)
+"""
+
+from urllib.parse import quote
+
+import pytest
+
+from crawler.hongik_crawler import HongikCrawler
+
+GRID_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<ul class="grid">
+  <li><div class="curriculum-title-box">
+    <p class="tit"><strong>자료</strong><span>구조</span></p>
+    <p class="num">학수번호 <span>101810</span></p>
+    <div class="info">3<em>학점</em> / 전공필수</div>
+  </div></li>
+  <li><div class="curriculum-title-box">
+    <p class="tit"><a href="#">데이터베이스</a><span class="badge">(영어강의)</span></p>
+    <p class="num">101820</p>
+    <!-- 비고 -->
+    <div class="info">3학점<br>전공선택</div>
+  </div></li>
+</ul>
+</body></html>"""
+
+EXPECTED_TEXTS = [
+    "자료구조\n학수번호 101810\n3학점 / 전공필수",
+    "데이터베이스(영어강의)\n101820\n3학점\n전공선택",
+]
+
+
+def test_http_grid_joins_inline_elements():
+    courses = HongikCrawler()._parse_course_grid(GRID_HTML)
+    assert [course["index"] for course in courses] == [1, 2]
+    assert [course["text"] for course in courses] == EXPECTED_TEXTS
+
+
+def test_http_grid_matches_selenium_fallback():
+    crawler = HongikCrawler()
+    crawler.course_driver_pool = 1
+    board = {"name": "fixture", "url": "data:text/html;charset=utf-8," + quote(GRID_HTML)}
+
+    courses, _ = crawler._crawl_courses_selenium([board])["fixture"]
+    if courses is None:
+        pytest.skip("headless Chrome을 실행할 수 없는 환경")
+    assert courses == crawler._parse_course_grid(GRID_HTML)
@@ -0,0 +1,40 @@
+"""
+증분 크롤링 결과 → 전체 스냅샷 (이전 결과와 합치기 / chunk JSONL 중복 제거)
+"""
+
+import json
+
+from crawler.crawl_state import compact_jsonl_chunks, merge_snapshot_items
+
+
+def _post(no, title="제목"):
+    return {"url": f"https://ie.hongik.ac.kr/ie/0401.do?articleNo={no}", "title": title}
+
+
+def test_merge_snapshot_keeps_posts_not_refetched():
+    previous = [_post(3), _post(2), _post(1)]
+    delta = [_post(4), _post(2, "수정된 제목")]
+
+    merged = merge_snapshot_items(previous, delta)
+
+    assert [item["url"] for item in merged] == [_post(n)["url"] for n in (4, 2, 3, 1)]
+    assert merged[1]["title"] == "수정된 제목"
+    assert merge_snapshot_items(None, delta) == delta
+
+
+def test_compact_jsonl_chunks_keeps_latest_version(tmp_path):
+    path = tmp_path / "univ_board.jsonl"
+    records = [
+        {"chunk_meta": {"idx": 0, "count": 2}, "items": [_post(2), _post(1)]},
+        {"chunk_meta": {"idx": 0, "count": 1}, "items": [_post(1, "수정된 제목")]},   # 증분 실행에서 이어 붙인 chunk
+        {"chunk_meta": {"idx": 1, "count": 1}, "items": [_post(2, "다시 수정")]},
+    ]
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+    compact_jsonl_chunks(path)
+
+    compacted = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    titles = {item["url"]: item["title"] for record in compacted for item in record["items"]}
+    assert titles == {_post(1)["url"]: "수정된 제목", _post(2)["url"]: "다시 수정"}
+    assert len(compacted) == 2   # 첫 chunk는 비어서 삭제
+    assert [record["chunk_meta"]["count"] for record in compacted] == [1, 1]
@@ -0,0 +1,44 @@
+"""
+디스크 임베딩 캐시: 여러 프로세스(여기서는 두 인스턴스)가 같은 파일을 쓸 때 크기/LRU
+"""
+
+import sqlite3
+
+from build_vector_db.embedding_cache import CachedEmbeddings
+from rag_core.fakes import FakeEmbeddings
+
+DIM = 8
+VECTOR_BYTES = DIM * 4
+
+
+def _cache(path, max_entries=10):
+    return CachedEmbeddings(FakeEmbeddings(dim=DIM), "fake", cache_path=path, max_bytes=VECTOR_BYTES * max_entries)
+
+
+def test_size_is_shared_between_instances(tmp_path):
+    path = tmp_path / "embeddings.db"
+    builder, app = _cache(path), _cache(path)
+
+    builder.embed_documents([f"조각 {i}" for i in range(8)])
+    assert app.stats()["bytes"] == 8 * VECTOR_BYTES
+
+    app.embed_documents([f"질문 {i}" for i in range(8)])   # 16개 → 상한 10개 초과 → 9개까지 제거
+    with sqlite3.connect(str(path)) as conn:
+        entries, nbytes = conn.execute("SELECT COUNT(*), SUM(nbytes) FROM embeddings").fetchone()
+    assert entries == 9
+    assert builder.stats()["bytes"] == app.stats()["bytes"] == nbytes
+
+
+def test_hits_do_not_rewrite_recent_access_time(tmp_path):
+    cache = _cache(tmp_path / "embeddings.db")
+    cache.embed_query("수강신청 일정")
+    cache._conn.execute("UPDATE embeddings SET last_access = 0")
+    cache._conn.commit()
+
+    cache.embed_query("수강신청 일정")   # 오래된 항목 → 갱신
+    refreshed = cache._conn.execute("SELECT last_access FROM embeddings").fetchone()[0]
+    assert refreshed > 0
+
+    cache.embed_query("수강신청 일정")   # ACCESS_UPDATE_INTERVAL 안에 다시 조회 → 쓰기 없음
+    assert cache._conn.execute("SELECT last_access FROM embeddings").fetchone()[0] == refreshed
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,125 @@
+"""
+병렬 임베딩 파이프라인 - 가짜 임베딩 + 메모리 Chroma/InMemoryStore로 API 호출 없이 검증
+"""
+
+import math
+import uuid
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.stores import InMemoryStore
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from build_vector_db.embedding_pipeline import EmbeddingPipeline, upsert_vectors
+from rag_core.fakes import FakeEmbeddings
+
+MAX_INPUTS = 4
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    """embed_documents 호출마다 배치 크기 기록, fail_marker가 든 텍스트는 항상 실패"""
+
+    def __init__(self, fail_marker=None):
+        super().__init__()
+        self.batches = []
+        self.fail_marker = fail_marker
+
+    def embed_documents(self, texts):
+        if self.fail_marker and any(self.fail_marker in t for t in texts):
+            raise RuntimeError("가짜 임베딩 실패")
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
+
+def _parents(n, marker=None):
+    parents = []
+    for i in range(n):
+        body = " ".join(f"{i}번 공지의 {j}번째 문장입니다." for j in range(6))
+        if marker and i == 0:
+            body += f" {marker}"
+        parents.append((f"parent-{i}", Document(page_content=body, metadata={"title": f"공지 {i}"})))
+    return parents
+
+
+def _pipeline(embeddings):
+    vectorstore = Chroma(collection_name=f"test_{uuid.uuid4().hex[:8]}", embedding_function=embeddings)
+    pipeline = EmbeddingPipeline(
+        embeddings=embeddings,
+        vectorstore=vectorstore,
+        docstore=InMemoryStore(),
+        child_splitter=RecursiveCharacterTextSplitter(chunk_size=40, chunk_overlap=0),
+        token_counter=len,                 # tiktoken 없이 글자 수로
+        max_inputs_per_request=MAX_INPUTS,
+        max_workers=2,
+        max_retries=1,
+        backoff_base=0,
+    )
+    return pipeline, vectorstore
+
+
+def test_pipeline_batches_and_writes_children():
+    embeddings = CountingEmbeddings()
+    pipeline, vectorstore = _pipeline(embeddings)
+    parents = _parents(5)
+
+    result = pipeline.run(parents)
+
+    assert sorted(result.succeeded_ids) == sorted(pid for pid, _ in parents)
+    assert result.failed_ids == []
+    # 요청 수 = embed_documents 호출 수, 각 요청은 입력 수 한도 이내
+    assert result.n_requests == len(embeddings.batches)
+    assert max(embeddings.batches) <= MAX_INPUTS
+    assert sum(embeddings.batches) == result.n_children
+    assert result.n_requests >= math.ceil(result.n_children / MAX_INPUTS)
+
+    stored = vectorstore.get(include=["metadatas"])
+    assert len(stored["ids"]) == result.n_children
+    assert {md["doc_id"] for md in stored["metadatas"]} == {pid for pid, _ in parents}
+    assert all(pipeline.docstore.mget([pid for pid, _ in parents]))
+
+
+def test_pipeline_reports_failed_parents():
+    embeddings = CountingEmbeddings(fail_marker="FAIL")
+    pipeline, vectorstore = _pipeline(embeddings)
+    parents = _parents(5, marker="FAIL")
+
+    result = pipeline.run(parents)
+
+    assert "parent-0" in result.failed_ids
+    assert "parent-0" not in result.succeeded_ids
+    assert result.n_retries >= 1
+    assert pipeline.docstore.mget(["parent-0"]) == [None]
+    stored = vectorstore.get(include=["metadatas"])
+    assert all(md["doc_id"] not in result.failed_ids for md in stored["metadatas"])
+
+
+class FailingDocStore(InMemoryStore):
+    def mset(self, key_value_pairs):
+        raise RuntimeError("가짜 docstore 실패")
+
+
+def test_pipeline_removes_children_when_docstore_write_fails():
+    pipeline, vectorstore = _pipeline(CountingEmbeddings())
+    pipeline.docstore = FailingDocStore()
+    parents = _parents(3)
+
+    result = pipeline.run(parents)
+
+    assert sorted(result.failed_ids) == sorted(pid for pid, _ in parents)
+    assert result.succeeded_ids == []
+    assert vectorstore.get()["ids"] == []   # 고아 자식 벡터가 남지 않음
+
+
+def test_upsert_vectors_keeps_precomputed_embeddings():
+    embeddings = CountingEmbeddings()
+    vectorstore = Chroma(collection_name=f"test_{uuid.uuid4().hex[:8]}", embedding_function=embeddings)
+    texts = ["수강신청 일정", "장학금 신청"]
+    vectors = embeddings.embed_documents(texts)
+    calls = embeddings.calls
+
+    upsert_vectors(vectorstore, ["a", "b"], vectors, texts, [{"doc_id": "p1"}, {"doc_id": "p2"}])
+
+    assert embeddings.calls == calls   # 다시 임베딩하지 않음
+    hits = vectorstore.similarity_search_by_vector(vectors[0], k=1)
+    assert hits[0].page_content == "수강신청 일정"
+    assert hits[0].metadata["doc_id"] == "p1"
@@ -0,0 +1,166 @@
+"""
+RAGEngine / HTTP(SSE) API / 클라이언트 - 가짜 백엔드(rag_core/fakes.py)로 API 키·인덱스 없이 검증
+"""
+
+import json
+import asyncio
+import threading
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from rag_core.client import RAGClient, iter_sse
+from rag_core.fakes import build_fake_engine
+from rag_core.server import create_app
+
+QUESTION = "수강신청 일정 알려줘"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return build_fake_engine()
+
+
+def _check_answer_events(events):
+    names = [name for name, _ in events]
+    assert names[0] == "meta"
+    assert names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+
+    meta = events[0][1]
+    assert meta["source"] == "llm"
+    assert meta["docs"]
+    answer = "".join(data for name, data in events if name == "token")
+    assert answer.startswith("[테스트 답변]")
+    assert "수강신청" in answer
+
+    done = events[-1][1]
+    assert "first_token" in done["timings"]
+    assert done["context"]["docs"] == len(meta["docs"]) - done["context"]["dropped"]
+    return meta, answer
+
+
+# ---------------- 엔진 ---------------- #
+
+def test_stream_answer_events(engine):
+    meta, answer = _check_answer_events(list(engine.stream_answer(QUESTION)))
+    titles = [doc.metadata["title"] for doc in meta["docs"]]
+    assert "2025학년도 1학기 수강신청 일정 안내" in titles
+
+
+def test_astream_answer_matches_sync(engine):
+    async def collect():
+        return [event async for event in engine.astream_answer(QUESTION)]
+
+    _, async_answer = _check_answer_events(asyncio.run(collect()))
+    _, sync_answer = _check_answer_events(list(engine.stream_answer(QUESTION)))
+    assert async_answer == sync_answer
+
+
+def test_concurrent_identical_questions_share_one_stream(engine):
+    async def collect_all():
+        async def collect():
+            return [event async for event in engine.astream_answer(QUESTION)]
+        return await asyncio.gather(collect(), collect())
+
+    started = engine.flights.started
+    first, second = asyncio.run(collect_all())
+    assert engine.flights.started == started + 1
+    assert [e for e in first if e[0] == "token"] == [e for e in second if e[0] == "token"]
+    assert "coalesced" not in first[0][1]
+    assert second[0][1]["coalesced"] is True
+
+
+def test_semantic_cache_skips_questions_with_history(tmp_path):
+    from rag_core.semantic_cache import SemanticAnswerCache
+
+    engine = build_fake_engine()
+    engine.semantic_cache = SemanticAnswerCache(path=tmp_path / "semantic_cache.db")
+    history = [("user", "장학금 신청 안내해줘"), ("assistant", "장학금 신청은 3월 4일부터입니다.")]
+
+    list(engine.stream_answer(QUESTION, history=history))
+    followup = list(engine.stream_answer(QUESTION, history=history))
+    assert followup[0][1]["source"] == "llm"
+    assert engine.semantic_cache.stats()["hits"] == 0
+
+    list(engine.stream_answer(QUESTION))
+    assert list(engine.stream_answer(QUESTION))[0][1]["source"] == "cache"
+
+
+# ---------------- SSE ---------------- #
+
+def test_iter_sse_parses_events():
+    lines = [
+        "event: meta", 'data: {"a": 1}', "",
+        ": 주석 줄은 무시", "",
+        "event: token", "data: 첫 줄", "data: 둘째 줄", "",
+        "data: 이벤트 이름 없음", "",
+    ]
+    assert list(iter_sse(lines)) == [
+        ("meta", '{"a": 1}'),
+        ("token", "첫 줄\n둘째 줄"),
+        ("message", "이벤트 이름 없음"),
+    ]
+
+
+async def _request(engine, method, path, **kwargs):
+    async with TestClient(TestServer(create_app(engine))) as client:
+        resp = await client.request(method, path, **kwargs)
+        return resp.status, resp.headers.get("Content-Type", ""), await resp.text()
+
+
+def test_answer_route_streams_sse(engine):
+    status, content_type, body = asyncio.run(_request(engine, "POST", "/answer", json={"query": QUESTION}))
+    assert status == 200
+    assert content_type.startswith("text/event-stream")
+
+    events = [(name, json.loads(raw)) for name, raw in iter_sse(body.split("\n"))]
+    events = [(name, data["text"] if name == "token" else data) for name, data in events]
+    meta, _ = _check_answer_events(events)
+    assert {"page_content", "metadata"} <= set(meta["docs"][0])
+
+
+def test_answer_route_requires_query(engine):
+    status, _, _ = asyncio.run(_request(engine, "POST", "/answer", json={}))
+    assert status == 400
+
+
+def test_health_route(engine):
+    status, _, body = asyncio.run(_request(engine, "GET", "/health"))
+    assert status == 200
+    payload = json.loads(body)
+    assert payload["status"] == "ok"
+    assert "single_flight" in payload["stats"]
+
+
+# ---------------- 클라이언트 ---------------- #
+
+@pytest.fixture
+def api_url(engine):
+    """가짜 엔진 서버를 별도 스레드의 이벤트 루프에서 실행 (RAGClient는 동기 requests 사용)"""
+    loop = asyncio.new_event_loop()
+    server = TestServer(create_app(engine), loop=loop)
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start_server())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait(10)
+    yield str(server.make_url("")).rstrip("/")
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    loop.close()
+
+
+def test_client_stream_answer_round_trip(engine, api_url):
+    client = RAGClient(api_url)
+    meta, answer = _check_answer_events(list(client.stream_answer(QUESTION)))
+    assert meta["docs"][0].page_content
+    assert answer == "".join(data for name, data in engine.stream_answer(QUESTION) if name == "token")
+    assert "single_flight" in client.stats()
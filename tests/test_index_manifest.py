@@ -0,0 +1,18 @@
+"""
+인덱스 매니페스트: 전체 재구축에서도 build_version이 이어지는지
+"""
+
+from build_vector_db.index_manifest import load_manifest, new_manifest, save_manifest
+
+
+def test_new_manifest_carries_build_version(tmp_path):
+    path = str(tmp_path / "index_manifest.json")
+    previous = new_manifest("text-embedding-3-small", "hongik")
+    previous["build_version"] = 7
+    save_manifest(previous, path)
+
+    rebuilt = new_manifest("text-embedding-3-small", "hongik", previous=load_manifest(path))
+
+    assert rebuilt["build_version"] == 7
+    assert rebuilt["parents"] == {}
+    assert new_manifest("text-embedding-3-small", "hongik")["build_version"] == 0
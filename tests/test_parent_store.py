@@ -0,0 +1,24 @@
+"""
+부모 문서 저장소 / LRU 캐시
+"""
+
+from langchain_core.documents import Document
+
+from build_vector_db.parent_store import LRUParentCache, SQLiteDocStore
+
+
+def test_lru_cache_returns_copies(tmp_path):
+    store = SQLiteDocStore(tmp_path / "docstore.db")
+    store.mset([("p1", Document(page_content="본문", metadata={"title": "공지"}))])
+    cache = LRUParentCache(store)
+
+    for _ in range(2):   # 첫 조회(miss → 캐시에 넣음), 두 번째 조회(hit)
+        doc = cache.mget(["p1"])[0]
+        doc.metadata["title"] = "바뀐 제목"
+        doc.page_content = "바뀐 본문"
+
+    again = cache.mget(["p1"])[0]
+    assert again.metadata == {"title": "공지"}
+    assert again.page_content == "본문"
+    assert cache.stats()["hits"] == 2
+    store.close()
@@ -0,0 +1,59 @@
+"""
+질문 배치 검색: Chroma 배치 질의 결과가 질문별 단건 검색과 같은지
+"""
+
+import uuid
+import asyncio
+
+import pytest
+from langchain_chroma import Chroma
+
+from build_vector_db.serving_index import chroma_search_batch
+from rag_core.fakes import SAMPLE_DOCUMENTS, FakeEmbeddings
+from rag_core.query_batcher import QueryBatcher
+
+QUESTIONS = ["수강신청 일정", "장학금 신청 기간", "졸업 프로젝트 발표", "자료구조 학점"]
+
+
+def _fake_store():
+    embeddings = FakeEmbeddings()
+    vectorstore = Chroma(collection_name=f"batch_{uuid.uuid4().hex[:8]}", embedding_function=embeddings)
+    vectorstore.add_documents(SAMPLE_DOCUMENTS)
+    return embeddings, vectorstore
+
+
+def _rows(results):
+    return [(doc.page_content, doc.metadata, round(distance, 5)) for doc, distance in results]
+
+
+@pytest.mark.parametrize("filter", [None, {"notice_type": "대학공지"}])
+def test_chroma_search_batch_matches_single_queries(filter):
+    embeddings, vectorstore = _fake_store()
+    vectors = embeddings.embed_documents(QUESTIONS)
+
+    batched = chroma_search_batch(vectorstore, vectors, k=3, filter=filter)
+
+    assert len(batched) == len(QUESTIONS)
+    for vector, results in zip(vectors, batched):
+        single = vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=3, filter=filter)
+        assert _rows(results) == _rows(single)
+        docs = vectorstore.similarity_search_by_vector(vector, k=3, filter=filter)
+        assert [doc.page_content for doc, _ in results] == [doc.page_content for doc in docs]
+
+
+def test_query_batcher_groups_concurrent_chroma_searches():
+    embeddings, vectorstore = _fake_store()
+    vectors = embeddings.embed_documents(QUESTIONS)
+    batcher = QueryBatcher(embeddings, vectorstore=vectorstore)
+
+    async def main():
+        return await asyncio.gather(*[batcher.chroma_search(vector, k=2) for vector in vectors])
+
+    results = asyncio.run(main())
+
+    for vector, result in zip(vectors, results):
+        single = vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=2)
+        assert _rows(result) == _rows(single)
+    stats = batcher.stats()["chroma"]
+    assert stats["batches"] == 1
+    assert stats["items"] == len(QUESTIONS)